@@ -0,0 +1,37 @@
+"""Performance benchmarks of the Goal Tracker application
+
+Run from the top of the source tree, e.g.
+
+    python -m benchmarks.storage --sizes 10 1000 100000
+
+The benchmarks use the installed goaltracker package, or the sources in
+src/ when it is not installed. They never touch the user's data: every run
+works in a temporary data directory.
+"""
+
+import os
+import sys
+import importlib.util
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+
+def load_package():
+    """Make the goaltracker package importable, from src/ if not installed"""
+    if 'goaltracker' in sys.modules:
+        return sys.modules['goaltracker']
+    try:
+        import goaltracker
+        return goaltracker
+    except ImportError:
+        pass
+
+    spec = importlib.util.spec_from_file_location(
+        'goaltracker',
+        os.path.join(SOURCE_DIR, '__init__.py'),
+        submodule_search_locations=[SOURCE_DIR]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules['goaltracker'] = package
+    spec.loader.exec_module(package)
+    return package
@@ -0,0 +1,131 @@
+"""Synthetic datasets in the format of the lists file
+
+    python -m benchmarks.dataset --goals 100000 --steps 3 lists.json
+
+Datasets are generated from a seed, so the same parameters always give the
+same goals, titles and deadlines; only the random IDs differ.
+"""
+
+import json
+import random
+import argparse
+from datetime import date, timedelta
+
+from . import load_package
+
+load_package()
+from goaltracker.core import items, ordering
+
+WORDS = (
+    'plan write review call finish start book read clean fix prepare update '
+    'learn practice send order organize check draft design test ship email '
+    'report budget garden kitchen project chapter meeting client release '
+    'invoice workout habit course recipe trip paper slides notes backup'
+).split()
+
+# Deadlines are spread over this many days around today
+DEADLINE_SPAN_DAYS = 365
+
+
+def make_text(rng, length):
+    """Make a text of about length characters from random words"""
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return ' '.join(words)[:max(length, 1)].capitalize()
+
+
+def make_deadline(rng, density, today):
+    """Make a deadline for an item, or None"""
+    if rng.random() >= density:
+        return None
+    offset = rng.randint(-DEADLINE_SPAN_DAYS // 2, DEADLINE_SPAN_DAYS // 2)
+    return (today + timedelta(days=offset)).isoformat()
+
+
+def generate_lists(goals, lists=1, steps=2.0, deadline_density=0.3, completed_ratio=0.3,
+                   text_length=40, seed=0):
+    """Generate lists holding goals in total, as stored in the lists file
+
+    ``steps`` is the average number of steps per goal; goals get between
+    none and twice as many. ``deadline_density`` and ``completed_ratio`` are
+    the fractions of goals and steps with a deadline and completed.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    max_steps = int(round(steps * 2))
+    data = {}
+
+    for list_index in range(lists):
+        list_id = str(10000 + list_index)
+        # Spread the goals evenly, the first lists taking the remainder
+        count = goals // lists + (1 if list_index < goals % lists else 0)
+        list_goals = []
+        for goal_index in range(count):
+            goal_steps = []
+            for step_index in range(rng.randint(0, max_steps) if max_steps else 0):
+                goal_steps.append({
+                    'text': make_text(rng, text_length),
+                    'completed': rng.random() < completed_ratio,
+                    'deadline': make_deadline(rng, deadline_density, today),
+                    items.ID_KEY: items.new_id(),
+                    ordering.ORDER_KEY: (step_index + 1) * ordering.ORDER_STEP
+                })
+            list_goals.append({
+                'title': make_text(rng, text_length),
+                'completed': rng.random() < completed_ratio,
+                'deadline': make_deadline(rng, deadline_density, today),
+                'steps': goal_steps,
+                items.ID_KEY: items.new_id(),
+                ordering.ORDER_KEY: (goal_index + 1) * ordering.ORDER_STEP
+            })
+        data[list_id] = {'id': list_id, 'name': f"List {list_index + 1}", 'goals': list_goals}
+    return data
+
+
+def write_dataset(path, **parameters):
+    """Generate a dataset and write it as a lists file"""
+    with open(path, 'w') as f:
+        json.dump(generate_lists(**parameters), f, indent=2)
+
+
+def add_arguments(parser):
+    """Add the dataset parameters to an argument parser"""
+    parser.add_argument('--lists', type=int, default=1, help="number of lists (default: 1)")
+    parser.add_argument('--steps', type=float, default=2.0, help="average steps per goal (default: 2)")
+    parser.add_argument('--deadline-density', type=float, default=0.3,
+                        help="fraction of items with a deadline (default: 0.3)")
+    parser.add_argument('--completed-ratio', type=float, default=0.3,
+                        help="fraction of completed items (default: 0.3)")
+    parser.add_argument('--text-length', type=int, default=40,
+                        help="characters per title or step text (default: 40)")
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def dataset_parameters(args):
+    """Get the dataset parameters from parsed arguments, without the size"""
+    return {
+        'lists': args.lists,
+        'steps': args.steps,
+        'deadline_density': args.deadline_density,
+        'completed_ratio': args.completed_ratio,
+        'text_length': args.text_length,
+        'seed': args.seed
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic lists file")
+    parser.add_argument('path')
+    parser.add_argument('--goals', type=int, default=1000, help="number of goals (default: 1000)")
+    add_arguments(parser)
+    args = parser.parse_args(args)
+    write_dataset(args.path, goals=args.goals, **dataset_parameters(args))
+    print(f"Wrote {args.goals} goals to {args.path}")
+
+
+if __name__ == '__main__':
+    main()
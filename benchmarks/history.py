@@ -0,0 +1,253 @@
+"""History of benchmark results and comparison between revisions
+
+Results files are stored in a SQLite database, by the commit they ran on
+and a fingerprint of the machine, so that only numbers from the same
+machine are compared:
+
+    python -m benchmarks.history add storage-20261019-180000.json
+    python -m benchmarks.history list
+    python -m benchmarks.history compare v1.2.1 HEAD
+
+``compare`` pools the measurements of every operation per revision and
+estimates a confidence interval of the ratio of the medians by
+bootstrapping. A slowdown is flagged when the whole interval lies above
+the threshold, so noise alone does not flag anything. The exit status is
+1 when something got slower.
+"""
+
+import os
+import sys
+import json
+import random
+import sqlite3
+import hashlib
+import argparse
+import statistics
+import subprocess
+
+from . import load_package, SOURCE_DIR
+from .results import environment
+
+load_package()
+from goaltracker.core import paths
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    suite TEXT NOT NULL,
+    commit_id TEXT,
+    fingerprint TEXT NOT NULL,
+    created TEXT NOT NULL,
+    environment TEXT NOT NULL,
+    parameters TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    times TEXT NOT NULL,
+    median REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_commit ON runs (commit_id, fingerprint);
+CREATE INDEX IF NOT EXISTS results_by_run ON results (run_id);
+"""
+
+# Environment details that make up the machine fingerprint
+FINGERPRINT_KEYS = ('implementation', 'python', 'system', 'machine', 'processor', 'cpus')
+
+BOOTSTRAP_SAMPLES = 2000
+
+
+def default_database():
+    return os.path.join(paths.cache_dir(), 'benchmarks.sqlite')
+
+
+def fingerprint(environment_data):
+    """Get a short fingerprint of the machine and Python a run used"""
+    details = json.dumps([environment_data.get(key) for key in FINGERPRINT_KEYS])
+    return hashlib.sha1(details.encode()).hexdigest()[:12]
+
+
+def open_database(path):
+    """Open the history database, creating it if needed"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA foreign_keys = ON')
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def add_results(connection, data):
+    """Store the contents of a results file and return the run ID"""
+    environment_data = data['environment']
+    with connection:
+        cursor = connection.execute(
+            'INSERT INTO runs (suite, commit_id, fingerprint, created, environment, parameters) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (
+                data['suite'],
+                environment_data.get('commit'),
+                fingerprint(environment_data),
+                environment_data['created'],
+                json.dumps(environment_data),
+                json.dumps(data['parameters'])
+            )
+        )
+        run_id = cursor.lastrowid
+        connection.executemany(
+            'INSERT INTO results (run_id, name, size, times, median) VALUES (?, ?, ?, ?, ?)',
+            [
+                (run_id, result['name'], result['size'], json.dumps(result['runs']), result['median'])
+                for result in data['results']
+            ]
+        )
+    return run_id
+
+
+def resolve_commit(revision):
+    """Get the full commit ID of a revision, e.g. HEAD, a tag or a prefix"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--verify', f'{revision}^{{commit}}'],
+            cwd=SOURCE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return revision
+
+
+def pooled_times(connection, commit, machine, suite=None):
+    """Get the measurements of a commit on a machine, by (suite, name, size)"""
+    query = (
+        'SELECT runs.suite, results.name, results.size, results.times FROM results '
+        'JOIN runs ON runs.id = results.run_id '
+        'WHERE runs.commit_id LIKE ? AND runs.fingerprint = ?'
+    )
+    parameters = [commit + '%', machine]
+    if suite:
+        query += ' AND runs.suite = ?'
+        parameters.append(suite)
+    pooled = {}
+    for suite_name, name, size, times in connection.execute(query, parameters):
+        pooled.setdefault((suite_name, name, size), []).extend(json.loads(times))
+    return pooled
+
+
+def median_ratio_interval(base, head, confidence, rng):
+    """Estimate a confidence interval of median(head) / median(base) by bootstrapping"""
+    ratios = []
+    for _ in range(BOOTSTRAP_SAMPLES):
+        base_median = statistics.median(rng.choices(base, k=len(base)))
+        head_median = statistics.median(rng.choices(head, k=len(head)))
+        if base_median > 0:
+            ratios.append(head_median / base_median)
+    if not ratios:
+        return float('nan'), float('nan')
+    ratios.sort()
+    tail = (1 - confidence) / 2
+    return ratios[int(tail * (len(ratios) - 1))], ratios[int((1 - tail) * (len(ratios) - 1))]
+
+
+def compare(connection, base_commit, head_commit, machine, threshold=0.05, confidence=0.95, suite=None):
+    """Compare the medians of two commits and return a row per measurement
+
+    Each row is (key, base median, head median, ratio, (low, high), verdict)
+    with verdict 'slower', 'faster' or '' when the difference is within
+    the threshold or not significant.
+    """
+    base = pooled_times(connection, base_commit, machine, suite)
+    head = pooled_times(connection, head_commit, machine, suite)
+    rng = random.Random(0)
+    rows = []
+    for key in sorted(set(base) & set(head)):
+        base_median = statistics.median(base[key])
+        head_median = statistics.median(head[key])
+        ratio = head_median / base_median if base_median else float('nan')
+        low, high = median_ratio_interval(base[key], head[key], confidence, rng)
+        verdict = ''
+        if low > 1 + threshold:
+            verdict = 'slower'
+        elif high < 1 - threshold:
+            verdict = 'faster'
+        rows.append((key, base_median, head_median, ratio, (low, high), verdict))
+    return rows
+
+
+def command_add(connection, args):
+    for path in args.results:
+        with open(path) as f:
+            data = json.load(f)
+        run_id = add_results(connection, data)
+        commit = (data['environment'].get('commit') or 'unknown')[:12]
+        print(f"Added {path} as run {run_id} ({data['suite']} on {commit})")
+    return 0
+
+
+def command_list(connection, args):
+    for run_id, suite, commit, machine, created, count in connection.execute(
+        'SELECT runs.id, suite, commit_id, fingerprint, created, COUNT(results.run_id) FROM runs '
+        'LEFT JOIN results ON results.run_id = runs.id GROUP BY runs.id ORDER BY created'
+    ):
+        print(f"{run_id:>5}  {created}  {suite:<8} {(commit or 'unknown')[:12]:<12}  {machine}  {count} results")
+    return 0
+
+
+def command_compare(connection, args):
+    machine = args.machine or fingerprint(environment())
+    base_commit = resolve_commit(args.base)
+    head_commit = resolve_commit(args.head)
+    rows = compare(
+        connection, base_commit, head_commit, machine,
+        threshold=args.threshold, confidence=args.confidence, suite=args.suite
+    )
+    if not rows:
+        print(f"No measurements of both {args.base} and {args.head} on machine {machine}")
+        return 0
+
+    print(f"{'suite':<8} {'operation':<24} {'size':>9} {'base':>12} {'head':>12} {'change':>8}  interval")
+    slower = 0
+    for (suite, name, size), base_median, head_median, ratio, (low, high), verdict in rows:
+        slower += verdict == 'slower'
+        print(
+            f"{suite:<8} {name:<24} {size:>9} {base_median * 1000:>9.3f} ms {head_median * 1000:>9.3f} ms "
+            f"{(ratio - 1) * 100:>+7.1f}%  [{(low - 1) * 100:+.1f}%, {(high - 1) * 100:+.1f}%]  {verdict}"
+        )
+    if slower:
+        print(f"{slower} measurement{'s' if slower != 1 else ''} got significantly slower")
+    return 1 if slower else 0
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Store and compare benchmark results")
+    parser.add_argument('--database', default=default_database(),
+                        help="history database (default: ~/.cache/goaltracker/benchmarks.sqlite)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="store results files")
+    add.add_argument('results', nargs='+')
+
+    commands.add_parser('list', help="show the stored runs")
+
+    compare_command = commands.add_parser('compare', help="flag slowdowns between two revisions")
+    compare_command.add_argument('base', help="revision to compare against, e.g. a tag")
+    compare_command.add_argument('head', help="revision to check, e.g. HEAD")
+    compare_command.add_argument('--suite', help="only this suite, e.g. storage or ui")
+    compare_command.add_argument('--machine', help="machine fingerprint (default: this machine)")
+    compare_command.add_argument('--threshold', type=float, default=0.05,
+                                 help="smallest relative change to flag (default: 0.05)")
+    compare_command.add_argument('--confidence', type=float, default=0.95,
+                                 help="confidence level of the intervals (default: 0.95)")
+    args = parser.parse_args(args)
+
+    connection = open_database(args.database)
+    try:
+        if args.command == 'add':
+            return command_add(connection, args)
+        if args.command == 'list':
+            return command_list(connection, args)
+        return command_compare(connection, args)
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Leak check of the main window: switch lists thousands of times
+
+    python -m benchmarks.leaks --backend xvfb --switches 5000
+
+Runs the application under a headless display like the UI benchmarks,
+with two lists of --goals goals, and switches between them. Every
+--sample-every switches it collects garbage and samples the goal and step
+widgets alive, the Python wrappers of GObjects and the resident memory.
+After --warmup switches, which fill caches and let the allocator settle,
+these should stay flat; the exit status is 1 when one of them grew more
+than its tolerance.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+from .ui import RESULT_PREFIX, read_rss, start_display, run_in_child, STEP_TIMEOUT
+from .dataset import generate_lists
+
+
+def sample(switches):
+    """Report the objects alive and the memory used, in the child process"""
+    import gc
+    from gi.repository import GObject
+    from goaltracker.widgets import goal, step
+
+    gc.collect()
+    rss, peak = read_rss()
+    print(RESULT_PREFIX + json.dumps({
+        'switches': switches,
+        'goal_widgets': goal.WIDGETS_CREATED.value - goal.WIDGETS_DESTROYED.value,
+        'step_widgets': step.WIDGETS_CREATED.value - step.WIDGETS_DESTROYED.value,
+        'gobjects': sum(1 for obj in gc.get_objects() if isinstance(obj, GObject.Object)),
+        'rss': rss,
+        'peak_rss': peak
+    }), flush=True)
+
+
+def switch_lists(driver, switches, sample_every):
+    """Switch between the first two lists, sampling as it goes"""
+    window = driver.window
+    list_ids = list(window.list_manager.lists)[:2]
+    sample(0)
+    for switch in range(1, switches + 1):
+        window.select_list(list_ids[switch % 2])
+        driver.settle()
+        if switch % sample_every == 0:
+            # Paint once so that the rendering side is part of the sample
+            driver.wait_for_paint(window)
+            sample(switch)
+
+
+def write_data(data_dir, goals):
+    """Write two lists of the same size into data_dir"""
+    first = generate_lists(goals, seed=1)['10000']
+    second = generate_lists(goals, seed=2)['10000']
+    second['id'] = '10001'
+    second['name'] = "Second"
+    first['name'] = "First"
+    app_dir = os.path.join(data_dir, 'goaltracker')
+    os.makedirs(app_dir, exist_ok=True)
+    with open(os.path.join(app_dir, 'lists.json'), 'w') as f:
+        json.dump({'10000': first, '10001': second}, f, indent=2)
+
+
+def find_growth(samples, warmup, gobject_tolerance, rss_tolerance):
+    """Compare the last sample with the first one after warmup
+
+    Returns a message per measurement that grew more than its tolerance.
+    Samples are taken after an even number of switches, so the same list
+    is on screen in both.
+    """
+    settled = [entry for entry in samples if entry['switches'] >= warmup]
+    if len(settled) < 2:
+        return ["Not enough samples after warmup, use more --switches"]
+    first, last = settled[0], settled[-1]
+    problems = []
+    for key in ('goal_widgets', 'step_widgets'):
+        if last[key] > first[key]:
+            problems.append(f"{key.replace('_', ' ')} alive went from {first[key]} to {last[key]}")
+    if last['gobjects'] > first['gobjects'] * (1 + gobject_tolerance):
+        problems.append(f"GObjects alive went from {first['gobjects']} to {last['gobjects']}")
+    if last['rss'] - first['rss'] > rss_tolerance * 1024 * 1024:
+        problems.append(
+            f"resident memory went from {first['rss'] / 1024 / 1024:.1f} MiB "
+            f"to {last['rss'] / 1024 / 1024:.1f} MiB"
+        )
+    return problems
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Check that switching lists does not leak")
+    parser.add_argument('--backend', choices=['xvfb', 'broadway', 'current'], default='xvfb',
+                        help="display to run on (default: xvfb)")
+    parser.add_argument('--switches', type=int, default=2000, help="list switches (default: 2000)")
+    parser.add_argument('--goals', type=int, default=100, help="goals of each list (default: 100)")
+    parser.add_argument('--sample-every', type=int, default=100,
+                        help="switches between samples, kept even (default: 100)")
+    parser.add_argument('--warmup', type=int, default=200,
+                        help="switches before the samples compared (default: 200)")
+    parser.add_argument('--gobject-tolerance', type=float, default=0.01,
+                        help="relative growth of GObjects allowed (default: 0.01)")
+    parser.add_argument('--rss-tolerance', type=float, default=5.0,
+                        help="growth of resident memory allowed in MiB (default: 5)")
+    parser.add_argument('--output', help="also write the samples to this file")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(args)
+    sample_every = args.sample_every + args.sample_every % 2
+
+    if args.child:
+        from .ui import run_application
+        sys.exit(run_application(lambda driver: switch_lists(driver, args.switches, sample_every)))
+
+    server, display_environment = start_display(args.backend)
+    try:
+        measurements = run_in_child(
+            ['benchmarks.leaks', '--child', '--switches', str(args.switches),
+             '--sample-every', str(sample_every)],
+            display_environment,
+            lambda data_dir: write_data(data_dir, args.goals),
+            timeout=STEP_TIMEOUT * (args.switches // sample_every + 2)
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    samples = [measurement for measurement in measurements if 'switches' in measurement]
+
+    print(f"{'switches':>9} {'goal widgets':>13} {'step widgets':>13} {'gobjects':>9} {'rss':>12}")
+    for entry in samples:
+        print(
+            f"{entry['switches']:>9} {entry['goal_widgets']:>13} {entry['step_widgets']:>13} "
+            f"{entry['gobjects']:>9} {entry['rss'] / 1024 / 1024:>8.1f} MiB"
+        )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'parameters': vars(args), 'samples': samples}, f, indent=2)
+        print(f"Samples written to {args.output}")
+
+    problems = find_growth(samples, args.warmup, args.gobject_tolerance, args.rss_tolerance)
+    for problem in problems:
+        print(f"Leak: {problem}")
+    if not problems:
+        print("No growth after warmup")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Replay of recorded sessions, headless or in the window
+
+Record a session with GOALTRACKER_RECORD=1, then replay it against a copy
+of the data it started with:
+
+    python -m benchmarks.replay ~/.cache/goaltracker/actions-20261019-180000.jsonl
+    python -m benchmarks.replay --ui --backend xvfb actions.jsonl
+
+Headless, the actions go through the list manager only, which profiles
+storage. With --ui they are replayed in the application under a headless
+display like the UI benchmarks, completing goals and steps through their
+check buttons. Each action is timed and compared with the time it took
+when it was recorded.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+from . import load_package
+from .results import summarize, write_results, print_result
+
+load_package()
+from goaltracker.core import ListManager
+from goaltracker.core.replay import Replayer, read_recording
+
+
+def copy_snapshot(header, data_dir):
+    """Copy the data a recording started with into data_dir"""
+    os.makedirs(data_dir, exist_ok=True)
+    for name in os.listdir(header['snapshot']):
+        shutil.copy2(os.path.join(header['snapshot'], name), data_dir)
+
+
+def read_auto_sort(data_dir):
+    """Check whether completed items were sorted last in the snapshot"""
+    try:
+        with open(os.path.join(data_dir, 'settings.json')) as f:
+            return bool(json.load(f).get('auto_sort_items'))
+    except (OSError, ValueError):
+        return False
+
+
+def replay_headless(header, actions):
+    """Replay the actions on the list manager and get the seconds each took"""
+    data_dir = tempfile.mkdtemp(prefix='goaltracker-replay-')
+    try:
+        copy_snapshot(header, data_dir)
+        list_manager = ListManager(data_dir)
+        list_manager.load_lists()
+        replayer = Replayer(list_manager, read_auto_sort(data_dir))
+        measurements = []
+        for entry in actions:
+            start = time.perf_counter()
+            replayer.apply(entry)
+            measurements.append({'name': entry['action'], 'seconds': time.perf_counter() - start})
+        return measurements
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def perform(window, replayer, entry):
+    """Carry out a recorded action in the window the way the user did"""
+    action = entry['action']
+    if action == 'select_list':
+        window.select_list(replayer.resolve_list(entry['list']))
+        return
+    if action == 'undo':
+        window.undo()
+        return
+    if action == 'redo':
+        window.redo()
+        return
+
+    if action in ('toggle_goal', 'toggle_step'):
+        list_id = replayer.resolve_list(entry['list'])
+        current_list = getattr(window, 'current_list', None)
+        if current_list is None or current_list['id'] != list_id:
+            window.select_list(list_id)
+        goal = replayer.find_goal(list_id, entry['goal'])
+        widget = window.goal_widgets.get(id(goal))
+        if widget is not None and action == 'toggle_step':
+            widget = widget.step_widgets.get(id(replayer.find_step(goal, entry['step'])))
+        if widget is not None:
+            widget.check.set_active(entry['completed'])
+            return
+
+    # Other actions go through dialogs, so apply them to the data and let
+    # the window catch up like it does after undo
+    window.apply_list_changes(replayer.apply(entry))
+
+
+def replay_in_window(driver, path):
+    """Replay a recording in the window, in the child process"""
+    header, actions = read_recording(path)
+    window = driver.window
+    replayer = Replayer(window.list_manager, window.settings.get('auto_sort_items'))
+    for entry in actions:
+        driver.measure(entry['action'], lambda: perform(window, replayer, entry))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded session")
+    parser.add_argument('recording')
+    parser.add_argument('--ui', action='store_true', help="replay in the application window")
+    parser.add_argument('--backend', choices=['xvfb', 'broadway', 'current'], default='xvfb',
+                        help="display for --ui (default: xvfb)")
+    parser.add_argument('--output', help="also write the results to this file")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(args)
+
+    if args.child:
+        from .ui import run_application
+        sys.exit(run_application(lambda driver: replay_in_window(driver, args.recording)))
+
+    header, actions = read_recording(args.recording)
+    if args.ui:
+        from .ui import start_display, run_in_child, STEP_TIMEOUT
+        server, display_environment = start_display(args.backend)
+        try:
+            measurements = run_in_child(
+                ['benchmarks.replay', '--child', os.path.abspath(args.recording)],
+                display_environment,
+                lambda data_dir: copy_snapshot(header, os.path.join(data_dir, 'goaltracker')),
+                timeout=STEP_TIMEOUT * (len(actions) + 2)
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        measurements = [measurement for measurement in measurements if measurement['name'] != 'cold_start']
+    else:
+        measurements = replay_headless(header, actions)
+
+    recorded = {}
+    for entry in actions:
+        recorded.setdefault(entry['action'], []).append(entry['duration_ms'] / 1000)
+    by_name = {}
+    for measurement in measurements:
+        by_name.setdefault(measurement['name'], []).append(measurement['seconds'])
+
+    print(f"{'action':<24} {'count':>9} {'median':>14} {'min':>14}")
+    results = []
+    for name, times in by_name.items():
+        results.append(summarize(
+            name, len(times), times, recorded_median=statistics.median(recorded.get(name) or [0.0])
+        ))
+        print_result(results[-1])
+        print(f"{'':<24} {'':>9} {results[-1]['recorded_median'] * 1000:>11.3f} ms recorded")
+
+    if args.output:
+        write_results(args.output, 'replay', {
+            'recording': os.path.abspath(args.recording), 'ui': args.ui, 'backend': args.backend
+        }, results)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
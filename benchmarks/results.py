@@ -0,0 +1,106 @@
+"""Timing of benchmark runs and the structured results file
+
+Results are JSON, so runs on different revisions can be compared:
+
+    {
+      "suite": "storage",
+      "environment": {"created": ..., "commit": ..., "python": ..., ...},
+      "parameters": {...},
+      "results": [{"name": ..., "size": ..., "runs": [seconds, ...],
+                   "min": ..., "median": ..., "mean": ..., "stdev": ...}, ...]
+    }
+"""
+
+import os
+import gc
+import json
+import time
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+
+from . import SOURCE_DIR
+
+
+def measure(func, setup=None, repeat=5, budget=10.0):
+    """Time calls of func and return the seconds each took
+
+    setup, if given, is called untimed before every call. Stops after
+    repeat calls, or earlier once budget seconds were spent, but always
+    makes at least one.
+    """
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat:
+        if setup is not None:
+            setup()
+        # Keep collections of earlier garbage out of the measurement
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+        if time.perf_counter() - started > budget:
+            break
+    return times
+
+
+def summarize(name, size, times, **extra):
+    """Make the result entry of a measured operation"""
+    return {
+        'name': name,
+        'size': size,
+        'runs': times,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        **extra
+    }
+
+
+def git_commit():
+    """Get the commit of the source tree, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=SOURCE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """Describe the revision and machine the benchmarks ran on"""
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'system': platform.system(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count()
+    }
+
+
+def write_results(path, suite, parameters, results):
+    """Write benchmark results and return the path"""
+    if path is None:
+        path = f"{suite}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, 'w') as f:
+        json.dump({
+            'suite': suite,
+            'environment': environment(),
+            'parameters': parameters,
+            'results': results
+        }, f, indent=2)
+    return path
+
+
+def print_result(result):
+    """Print a result entry as a line of a table"""
+    print(
+        f"{result['name']:<24} {result['size']:>9} "
+        f"{result['median'] * 1000:>11.3f} ms {result['min'] * 1000:>11.3f} ms  x{len(result['runs'])}"
+    )
@@ -0,0 +1,90 @@
+"""Benchmarks of the list manager's storage operations
+
+    python -m benchmarks.storage --sizes 10 1000 100000 --steps 3
+
+For every size a dataset is generated into a temporary data directory and
+each operation is timed on it. Every mutating operation writes the whole
+lists file, as it does in the application.
+"""
+
+import os
+import shutil
+import argparse
+import tempfile
+
+from . import load_package
+from .dataset import write_dataset, add_arguments, dataset_parameters
+from .results import measure, summarize, write_results, print_result
+
+load_package()
+from goaltracker.core import ListManager
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+
+def new_goal():
+    return {'title': "Benchmark goal", 'completed': False, 'deadline': None, 'steps': []}
+
+
+def benchmark_size(size, parameters, repeat, budget):
+    """Time the storage operations on a generated dataset of size goals"""
+    data_dir = tempfile.mkdtemp(prefix='goaltracker-bench-')
+    try:
+        lists_file = os.path.join(data_dir, 'lists.json')
+        write_dataset(lists_file, goals=size, **parameters)
+        file_size = os.path.getsize(lists_file)
+
+        list_manager = ListManager(data_dir)
+        list_manager.load_lists()
+        list_id = next(iter(list_manager.lists))
+        backups = []
+
+        def move_first_to_last():
+            last = len(list_manager.lists[list_id]['goals']) - 1
+            list_manager.move_goal(list_id, 0, last)
+
+        operations = [
+            ('load_lists', list_manager.load_lists),
+            ('save_lists', list_manager.save_lists),
+            ('add_goal_to_list', lambda: list_manager.add_goal_to_list(list_id, new_goal())),
+            ('move_goal', move_first_to_last),
+            ('remove_goal_from_list', lambda: list_manager.remove_goal_from_list(list_id, 0)),
+            ('backup_lists', lambda: backups.append(list_manager.backup_lists())),
+            ('restore_from_backup', lambda: list_manager.restore_from_backup(backups[-1]))
+        ]
+
+        results = []
+        for name, operation in operations:
+            times = measure(operation, repeat=repeat, budget=budget)
+            results.append(summarize(name, size, times, file_size=file_size))
+            print_result(results[-1])
+        return results
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark the storage of the lists")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="numbers of goals to benchmark with (default: 10 to 100000)")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per operation (default: 5)")
+    parser.add_argument('--budget', type=float, default=10.0,
+                        help="seconds after which an operation is not run again (default: 10)")
+    parser.add_argument('--output', help="results file (default: storage-<timestamp>.json)")
+    add_arguments(parser)
+    args = parser.parse_args(args)
+
+    parameters = dataset_parameters(args)
+    print(f"{'operation':<24} {'goals':>9} {'median':>14} {'min':>14}")
+    results = []
+    for size in args.sizes:
+        results.extend(benchmark_size(size, parameters, args.repeat, args.budget))
+
+    path = write_results(args.output, 'storage', {
+        **parameters, 'sizes': args.sizes, 'repeat': args.repeat, 'budget': args.budget
+    }, results)
+    print(f"Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
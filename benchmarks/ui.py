@@ -0,0 +1,449 @@
+"""Benchmarks of the main window under a headless display
+
+    python -m benchmarks.ui --backend xvfb
+    python -m benchmarks.ui --backend broadway --scenarios select_list toggle_goals
+
+Every scenario runs in a fresh process with generated data: a small first
+list and a large one of --goals goals. The harness starts Xvfb or the GTK
+Broadway server, or uses the current display, and reports for every
+scenario the wall time until the change is painted, the frames dropped on
+the way and the resident memory of the process.
+
+Frames are counted with a tick callback, which keeps the frame clock
+running: every frame interval that passed without a frame while the main
+loop was busy counts as a dropped frame.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import subprocess
+
+from . import load_package
+from .dataset import generate_lists
+from .results import summarize, write_results, print_result
+
+RESULT_PREFIX = 'RESULT '
+
+# Expected time between frames at 60 Hz
+FRAME_INTERVAL = 1 / 60
+
+# Longest time a step may take before the scenario is given up
+STEP_TIMEOUT = 60.0
+
+SCENARIOS = {}
+
+
+def scenario(func):
+    """Register a scenario under the name of its function"""
+    SCENARIOS[func.__name__] = func
+    return func
+
+
+def read_rss():
+    """Get the current and peak resident memory of the process in bytes"""
+    rss = peak = 0
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss = int(line.split()[1]) * 1024
+                elif line.startswith('VmHWM:'):
+                    peak = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return rss, peak
+
+
+class WindowDriver:
+    """Runs the steps of a scenario on the main window, in the child process
+
+    Steps run from inside a main loop callback and iterate the loop
+    themselves until the window was painted, so scenarios read as plain
+    sequential code.
+    """
+
+    def __init__(self, window):
+        from gi.repository import GLib
+        self.GLib = GLib
+        self.window = window
+        self.ticks = []
+        self.tick_id = window.add_tick_callback(self.on_tick)
+
+    def on_tick(self, widget, frame_clock):
+        self.ticks.append(time.perf_counter())
+        return self.GLib.SOURCE_CONTINUE
+
+    def iterate_until(self, predicate):
+        """Run the main loop until predicate is true"""
+        context = self.GLib.MainContext.default()
+        deadline = time.perf_counter() + STEP_TIMEOUT
+        while not predicate():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("The window did not respond in time")
+            context.iteration(True)
+
+    def settle(self):
+        """Run the main loop until there is nothing left to do"""
+        context = self.GLib.MainContext.default()
+        while context.pending():
+            context.iteration(False)
+
+    def wait_for_paint(self, widget):
+        """Run the main loop until the window of widget painted a frame"""
+        painted = []
+        window = widget.get_root() or widget
+
+        def connect_clock(*args):
+            clock = window.get_frame_clock()
+            handler = clock.connect('after-paint', lambda c: painted.append(True))
+            painted_handlers.append((clock, handler))
+
+        painted_handlers = []
+        if window.get_frame_clock() is None:
+            realize_handler = window.connect('realize', connect_clock)
+            self.iterate_until(lambda: painted_handlers)
+            window.disconnect(realize_handler)
+        else:
+            connect_clock()
+        window.queue_draw()
+        self.iterate_until(lambda: painted)
+        for clock, handler in painted_handlers:
+            clock.disconnect(handler)
+
+    def frames_dropped(self, start, end):
+        """Count the frames missed between start and end"""
+        ticks = [tick for tick in self.ticks if start <= tick <= end]
+        earlier = [tick for tick in self.ticks if tick < start]
+        if earlier:
+            ticks.insert(0, earlier[-1])
+        dropped = 0
+        for previous, tick in zip(ticks, ticks[1:]):
+            dropped += max(0, round((tick - previous) / FRAME_INTERVAL) - 1)
+        return dropped
+
+    def measure(self, name, action, widget=None):
+        """Run action and report the time until widget's window was painted"""
+        self.settle()
+        start = time.perf_counter()
+        result = action()
+        self.wait_for_paint(widget or result or self.window)
+        end = time.perf_counter()
+        rss, peak = read_rss()
+        report(name, end - start, self.frames_dropped(start, end), rss, peak)
+        return result
+
+
+def report(name, seconds, frames_dropped, rss, peak_rss):
+    """Pass a measurement to the parent process"""
+    print(RESULT_PREFIX + json.dumps({
+        'name': name,
+        'seconds': seconds,
+        'frames_dropped': frames_dropped,
+        'rss': rss,
+        'peak_rss': peak_rss
+    }), flush=True)
+
+
+def large_list_id(window):
+    return list(window.list_manager.lists)[1]
+
+
+@scenario
+def select_list(driver, repeat):
+    """Switch to the large list and back"""
+    window = driver.window
+    small_id, large_id = list(window.list_manager.lists)[:2]
+    for _ in range(repeat):
+        driver.measure('select_list', lambda: window.select_list(large_id))
+        window.select_list(small_id)
+
+
+@scenario
+def toggle_goals(driver, repeat):
+    """Complete goals of the large list with completed goals sorted last"""
+    window = driver.window
+    window.settings.set('auto_sort_items', True)
+    window.select_list(large_list_id(window))
+    driver.wait_for_paint(window)
+    goals = list(window.current_list['goals'])
+    for goal in goals[:repeat]:
+        widget = window.goal_widgets[id(goal)]
+        driver.measure('toggle_goal', lambda: widget.check.set_active(not widget.check.get_active()))
+
+
+@scenario
+def add_steps(driver, repeat):
+    """Add steps to goals of the large list through the step dialog"""
+    from gi.repository import Gtk
+    from goaltracker.dialogs import GoalDialog
+
+    window = driver.window
+    window.select_list(large_list_id(window))
+    driver.wait_for_paint(window)
+    goals = list(window.current_list['goals'])
+    for goal in goals[:repeat]:
+        widget = window.goal_widgets[id(goal)]
+
+        def add_step():
+            dialog = GoalDialog(window, "Add Step", "")
+            dialog.connect('response', widget.on_add_step_response)
+            dialog.entry.set_text("Benchmark step")
+            dialog.emit('response', Gtk.ResponseType.OK)
+            return widget
+
+        driver.measure('add_step', add_step)
+
+
+@scenario
+def goal_dialog(driver, repeat):
+    """Open and close the goal dialog"""
+    from goaltracker.dialogs import GoalDialog
+
+    for _ in range(repeat):
+        def open_dialog():
+            dialog = GoalDialog(driver.window, "Add New Goal", "")
+            dialog.present()
+            return dialog
+        driver.measure('goal_dialog', open_dialog).destroy()
+
+
+@scenario
+def settings_dialog(driver, repeat):
+    """Open and close the settings dialog"""
+    from goaltracker.dialogs import SettingsDialog
+
+    for _ in range(repeat):
+        def open_dialog():
+            dialog = SettingsDialog(driver.window, driver.window.settings)
+            dialog.present()
+            return dialog
+        driver.measure('settings_dialog', open_dialog).destroy()
+
+
+
+def run_child(name, repeat):
+    """Run a scenario, in the child process"""
+    if name == 'cold_start':
+        return run_application(None)
+    return run_application(lambda driver: SCENARIOS[name](driver, repeat))
+
+
+def run_application(scenario_func):
+    """Start the application and call scenario_func with a driver of its window
+
+    Reports the cold start either way; with scenario_func None the
+    application quits after the first frame.
+    """
+    load_package()
+    from goaltracker import startup
+    import gi
+    gi.require_version('Gtk', '4.0')
+    gi.require_version('Adw', '1')
+    gi.require_version('Granite', '7.0')
+    from gi.repository import Gio, GLib
+    from goaltracker.application import GoalApplication
+
+    app = GoalApplication()
+    # Never hand over to an instance the user is running
+    app.set_flags(app.get_flags() | Gio.ApplicationFlags.NON_UNIQUE)
+    failures = []
+
+    def run_scenario(window, driver):
+        try:
+            # Let the work deferred by startup finish first
+            driver.iterate_until(lambda: window.startup_done)
+            driver.settle()
+            scenario_func(driver)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            failures.append(e)
+        app.quit()
+        return GLib.SOURCE_REMOVE
+
+    def on_first_frame(clock, window, handler):
+        clock.disconnect(handler[0])
+        origin = startup.interpreter_start_time() or startup.START_TIME
+        rss, peak = read_rss()
+        report('cold_start', time.perf_counter() - origin, 0, rss, peak)
+        if scenario_func is None:
+            app.quit()
+        else:
+            GLib.idle_add(run_scenario, window, WindowDriver(window))
+
+    def on_activated(app):
+        window = app.get_active_window()
+        handler = []
+
+        def connect_clock(*args):
+            handler.append(window.get_frame_clock().connect('after-paint', on_first_frame, window, handler))
+
+        if window.get_frame_clock() is None:
+            window.connect('realize', connect_clock)
+        else:
+            connect_clock()
+
+    app.connect_after('activate', on_activated)
+    app.run([sys.argv[0]])
+    return 1 if failures else 0
+
+
+def write_data(data_dir, goals):
+    """Write a small first list and a large second one into data_dir"""
+    small = generate_lists(20, seed=1)['10000']
+    large = generate_lists(goals, seed=2)['10000']
+    large['id'] = '10001'
+    large['name'] = "Large"
+    small['name'] = "Small"
+    app_dir = os.path.join(data_dir, 'goaltracker')
+    os.makedirs(app_dir, exist_ok=True)
+    with open(os.path.join(app_dir, 'lists.json'), 'w') as f:
+        json.dump({'10000': small, '10001': large}, f, indent=2)
+
+
+def find_display_number():
+    """Find an X display number nobody uses"""
+    for number in range(90, 200):
+        if not os.path.exists(f'/tmp/.X11-unix/X{number}') and not os.path.exists(f'/tmp/.X{number}-lock'):
+            return number
+    raise RuntimeError("No free display number")
+
+
+def is_listening(port):
+    """Check whether a server accepts connections on a local port"""
+    with socket.socket() as connection:
+        return connection.connect_ex(('127.0.0.1', port)) == 0
+
+
+def start_display(backend):
+    """Start a headless display server and return it with the environment to use"""
+    if backend == 'current':
+        return None, {}
+
+    number = find_display_number()
+    if backend == 'xvfb':
+        command = ['Xvfb', f':{number}', '-screen', '0', '1280x1024x24', '-nolisten', 'tcp']
+        environment = {'DISPLAY': f':{number}', 'GDK_BACKEND': 'x11'}
+        ready = lambda: os.path.exists(f'/tmp/.X11-unix/X{number}')
+    else:
+        command = ['gtk4-broadwayd', f':{number}']
+        environment = {'BROADWAY_DISPLAY': f':{number}', 'GDK_BACKEND': 'broadway'}
+        # The server listens on port 8080 plus the display number
+        ready = lambda: is_listening(8080 + number)
+
+    if shutil.which(command[0]) is None:
+        raise RuntimeError(f"{command[0]} is not installed")
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    started = time.perf_counter()
+    while not ready():
+        if server.poll() is not None or time.perf_counter() - started > 10:
+            server.kill()
+            raise RuntimeError(f"{command[0]} did not start")
+        time.sleep(0.05)
+    return server, environment
+
+
+def run_scenario(name, repeat, display_environment, goals):
+    """Run a scenario in a fresh process with fresh data and get its measurements"""
+    return run_in_child(
+        ['benchmarks.ui', '--child', name, '--repeat', str(repeat)],
+        display_environment,
+        lambda data_dir: write_data(data_dir, goals),
+        timeout=STEP_TIMEOUT * (repeat + 2)
+    )
+
+
+def run_in_child(module_args, display_environment, prepare_data, timeout):
+    """Run a module in a fresh process and get its measurements
+
+    prepare_data is called with the XDG data directory of the process, to
+    write the lists it starts with.
+    """
+    home = tempfile.mkdtemp(prefix='goaltracker-ui-bench-')
+    try:
+        environment = dict(os.environ)
+        environment.update(display_environment)
+        environment.update({
+            'XDG_DATA_HOME': os.path.join(home, 'data'),
+            'XDG_CACHE_HOME': os.path.join(home, 'cache'),
+            'XDG_CONFIG_HOME': os.path.join(home, 'config'),
+            'GSETTINGS_BACKEND': 'memory',
+            'NO_AT_BRIDGE': '1'
+        })
+        prepare_data(environment['XDG_DATA_HOME'])
+        process = subprocess.run(
+            [sys.executable, '-m'] + module_args,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=environment, capture_output=True, text=True, timeout=timeout
+        )
+        measurements = [
+            json.loads(line[len(RESULT_PREFIX):])
+            for line in process.stdout.splitlines()
+            if line.startswith(RESULT_PREFIX)
+        ]
+        if process.returncode != 0:
+            print(process.stderr, file=sys.stderr)
+            raise RuntimeError(f"{' '.join(module_args)} failed")
+        return measurements
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark the main window under a headless display")
+    parser.add_argument('--backend', choices=['xvfb', 'broadway', 'current'], default='xvfb',
+                        help="display to run on (default: xvfb)")
+    parser.add_argument('--scenarios', nargs='+', choices=['cold_start'] + list(SCENARIOS),
+                        default=['cold_start'] + list(SCENARIOS))
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="measurements per scenario, processes for cold_start (default: 5)")
+    parser.add_argument('--goals', type=int, default=5000, help="goals of the large list (default: 5000)")
+    parser.add_argument('--output', help="results file (default: ui-<timestamp>.json)")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(args)
+
+    if args.child:
+        sys.exit(run_child(args.child, args.repeat))
+
+    server, display_environment = start_display(args.backend)
+    results = []
+    try:
+        print(f"{'scenario':<24} {'goals':>9} {'median':>14} {'min':>14}")
+        for name in args.scenarios:
+            runs = 1 if name != 'cold_start' else args.repeat
+            measurements = []
+            for _ in range(runs):
+                measurements.extend(
+                    measurement for measurement in run_scenario(name, args.repeat, display_environment, args.goals)
+                    if (measurement['name'] == 'cold_start') == (name == 'cold_start')
+                )
+            by_name = {}
+            for measurement in measurements:
+                by_name.setdefault(measurement['name'], []).append(measurement)
+            for measurement_name, entries in by_name.items():
+                results.append(summarize(
+                    measurement_name, args.goals, [entry['seconds'] for entry in entries],
+                    frames_dropped=[entry['frames_dropped'] for entry in entries],
+                    rss=max(entry['rss'] for entry in entries),
+                    peak_rss=max(entry['peak_rss'] for entry in entries)
+                ))
+                print_result(results[-1])
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    path = write_results(args.output, 'ui', {
+        'backend': args.backend, 'goals': args.goals, 'repeat': args.repeat
+    }, results)
+    print(f"Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,23 @@
 #!/usr/bin/env python3
 
 import sys
-import gi
 
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
-gi.require_version('Granite', '7.0')
-
-try:
-    from goaltracker import main
-    sys.exit(main())
-except Exception as e:
-    import traceback
-    error_msg = traceback.format_exc()
-    print(f"Fatal error: {error_msg}", file=sys.stderr)
-    sys.exit(1)
\ No newline at end of file
+# Guarded since import worker processes load this module again
+if __name__ == '__main__':
+    try:
+        from goaltracker import startup
+        sys.argv[1:] = startup.configure(sys.argv[1:])
+        
+        from goaltracker.cli import is_cli_invocation
+        if is_cli_invocation(sys.argv[1:]):
+            # Commands work on the data directly, without loading GTK
+            from goaltracker.cli import main as cli_main
+            sys.exit(cli_main(sys.argv[1:]))
+        
+        from goaltracker import main
+        sys.exit(main())
+    except Exception as e:
+        import traceback
+        error_msg = traceback.format_exc()
+        print(f"Fatal error: {error_msg}", file=sys.stderr)
+        sys.exit(1)
\ No newline at end of file
@@ -1,22 +1,35 @@
 """
 Goal Tracker - A GTK4 application for tracking goals and tasks
+
+The user interface is only loaded by main(), so the GTK-free core package
+can be imported without GTK.
 """
 
-import gi
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
-gi.require_version('Granite', '7.0')
+import sys
 
+from . import startup
 from .config import APP_NAME, APP_VERSION, APP_ID
-from .application import GoalApplication
 
 def main():
     """Start the application"""
     try:
+        with startup.phase('gi-import'):
+            import gi
+            gi.require_version('Gtk', '4.0')
+            gi.require_version('Adw', '1')
+            gi.require_version('Granite', '7.0')
+            # Load the typelibs here so this phase times them, they are
+            # most of the cost. The modules are used from their own imports.
+            import gi.repository.Gtk  # noqa: F401
+            import gi.repository.Adw  # noqa: F401
+            import gi.repository.Granite  # noqa: F401
+        
+        with startup.phase('application-import'):
+            from .application import GoalApplication
         app = GoalApplication()
         return app.run()
     except Exception as e:
         import traceback
         error_msg = traceback.format_exc()
         print(f"Fatal error: {error_msg}", file=sys.stderr)
-        return 1
\ No newline at end of file
+        return 1
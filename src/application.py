@@ -1,4 +1,5 @@
 import os
+import signal
 import gi
 
 gi.require_version('Gtk', '4.0')
@@ -7,8 +8,9 @@ gi.require_version('Granite', '7.0')
 
 from gi.repository import Gtk, GLib, Gio, Adw, Gdk, Granite
 from .window import GoalWindow
-from .dialogs import AboutDialog, SettingsDialog, ListDialog, GoalDialog
 from .config import APP_ID, APP_NAME
+from .core import metrics
+from . import startup
 
 class GoalApplication(Adw.Application):
     """The main application class"""
@@ -23,6 +25,11 @@ class GoalApplication(Adw.Application):
         
     def do_startup(self):
         """Initialize the application on startup"""
+        with startup.phase('do-startup'):
+            self.initialize()
+
+    def initialize(self):
+        """Initialize GTK, actions and resources"""
         # Initialize Granite
         Granite.init()
         
@@ -32,6 +39,15 @@ class GoalApplication(Adw.Application):
         # Set up actions
         self.setup_actions()
         
+        with startup.phase('resources'):
+            self.load_resources()
+            
+        # Set up style manager
+        style_manager = Adw.StyleManager.get_default()
+        style_manager.set_color_scheme(Adw.ColorScheme.PREFER_LIGHT)
+
+    def load_resources(self):
+        """Load the GResource bundle and the stylesheet in it"""
         try:
             # Load GResource file
             resource_path = '/usr/share/goaltracker/resources.gresource'
@@ -56,12 +72,9 @@ class GoalApplication(Adw.Application):
             print(f"Error loading resources: {e}")
             import traceback
             traceback.print_exc()
-            
-        # Set up style manager
-        style_manager = Adw.StyleManager.get_default()
-        style_manager.set_color_scheme(Adw.ColorScheme.PREFER_LIGHT)
-        
-        # Set up application icon
+
+    def setup_icon_theme(self):
+        """Make the icons installed with the application available"""
         icon_theme = Gtk.IconTheme.get_for_display(Gdk.Display.get_default())
         icon_theme.add_search_path('/usr/share/icons')
 
@@ -69,7 +82,10 @@ class GoalApplication(Adw.Application):
         """Create and show the main window when the application is activated"""
         win = self.get_active_window()
         if not win:
-            win = GoalWindow(application=self)
+            with startup.phase('window'):
+                win = GoalWindow(application=self)
+            # Rescanning the icon theme can wait until the window is shown
+            win.run_after_first_frame(self.setup_icon_theme)
         win.present()
 
     def setup_actions(self):
@@ -103,15 +119,45 @@ class GoalApplication(Adw.Application):
             self.add_action(new_goal_action)
             self.set_accels_for_action("app.new-goal", ["<Control>g"])
             
+            # Undo and redo actions
+            undo_action = Gio.SimpleAction.new("undo", None)
+            undo_action.connect("activate", self.on_undo_action)
+            self.add_action(undo_action)
+            self.set_accels_for_action("app.undo", ["<Control>z"])
+            
+            redo_action = Gio.SimpleAction.new("redo", None)
+            redo_action.connect("activate", self.on_redo_action)
+            self.add_action(redo_action)
+            self.set_accels_for_action("app.redo", ["<Control><Shift>z", "<Control>y"])
+            
+            # Import action
+            import_action = Gio.SimpleAction.new("import", None)
+            import_action.connect("activate", self.on_import_action)
+            self.add_action(import_action)
+            self.set_accels_for_action("app.import", ["<Control>i"])
+            
+            # Export action
+            export_action = Gio.SimpleAction.new("export", None)
+            export_action.connect("activate", self.on_export_action)
+            self.add_action(export_action)
+            self.set_accels_for_action("app.export", ["<Control>e"])
+            
             # Backup action
             backup_action = Gio.SimpleAction.new("backup", None)
             backup_action.connect("activate", self.on_backup_action)
             self.add_action(backup_action)
+            
+            # Metrics dump, for `gapplication action` or SIGUSR1
+            dump_metrics_action = Gio.SimpleAction.new("dump-metrics", None)
+            dump_metrics_action.connect("activate", self.on_dump_metrics_action)
+            self.add_action(dump_metrics_action)
+            GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGUSR1, self.on_dump_metrics_signal)
 
     def on_about_action(self, action, param):
             """Handle about action"""
             window = self.get_active_window()
             if window:
+                from .dialogs import AboutDialog
                 dialog = AboutDialog(window)
                 dialog.connect('response', lambda d, r: d.destroy())
                 dialog.present()
@@ -120,6 +166,7 @@ class GoalApplication(Adw.Application):
             """Handle settings action"""
             window = self.get_active_window()
             if window:
+                from .dialogs import SettingsDialog
                 dialog = SettingsDialog(window, window.settings)
                 dialog.connect('response', lambda d, r: d.destroy())
                 dialog.present()
@@ -128,6 +175,7 @@ class GoalApplication(Adw.Application):
             """Handle new list action"""
             window = self.get_active_window()
             if window:
+                from .dialogs import ListDialog
                 dialog = ListDialog(window, "Add New List", "")
                 dialog.connect('response', window.on_add_list_response)
                 dialog.present()
@@ -136,10 +184,35 @@ class GoalApplication(Adw.Application):
             """Handle new goal action"""
             window = self.get_active_window()
             if window and window.add_goal_button.get_sensitive():
+                from .dialogs import GoalDialog
                 dialog = GoalDialog(window, "Add New Goal", "")
                 dialog.connect('response', window.on_add_goal_response)
                 dialog.present()
 
+    def on_undo_action(self, action, param):
+            """Handle undo action"""
+            window = self.get_active_window()
+            if window:
+                window.undo()
+
+    def on_redo_action(self, action, param):
+            """Handle redo action"""
+            window = self.get_active_window()
+            if window:
+                window.redo()
+
+    def on_import_action(self, action, param):
+            """Handle import action"""
+            window = self.get_active_window()
+            if window:
+                window.on_import_clicked(None)
+
+    def on_export_action(self, action, param):
+            """Handle export action"""
+            window = self.get_active_window()
+            if window:
+                window.on_export_clicked(None)
+
     def on_backup_action(self, action, param):
             """Handle backup action"""
             window = self.get_active_window()
@@ -150,6 +223,17 @@ class GoalApplication(Adw.Application):
                 toast.set_timeout(3)
                 window.add_toast(toast)
 
+    def on_dump_metrics_action(self, action, param):
+            """Handle dump metrics action"""
+            path = metrics.write_metrics()
+            if path:
+                print(f"Metrics written to {path}")
+
+    def on_dump_metrics_signal(self):
+            """Dump the metrics when the process gets SIGUSR1"""
+            self.activate_action("dump-metrics", None)
+            return GLib.SOURCE_CONTINUE
+
     def setup_data_directories(self):
         """Set up necessary data directories for the application"""
         app_name = "goaltracker"
@@ -0,0 +1,341 @@
+"""Command line interface for scripting goals
+
+Works directly on the core package, so commands run without loading GTK:
+
+    goaltracker add --list Work "Ship release" --due 2026-11-01
+    goaltracker ls --overdue
+    goaltracker done <id>
+    goaltracker stats
+    goaltracker archive --search invoice
+"""
+
+import sys
+import json
+import argparse
+from datetime import date, timedelta
+
+from .config import APP_NAME, APP_VERSION
+from .core import ListManager, Settings, model, ordering
+
+COMMANDS = ('add', 'ls', 'done', 'undone', 'rm', 'lists', 'stats', 'archive', 'import', 'export')
+
+# Commands that only read the lists, which never write the lists file
+READ_ONLY_COMMANDS = ('ls', 'lists', 'stats', 'export')
+
+# Shortest ID prefix accepted to refer to a goal
+MIN_ID_PREFIX = 4
+
+
+class CliError(Exception):
+    """An error to report to the user, without a traceback"""
+
+
+def is_cli_invocation(args):
+    """Check whether command line arguments ask for the command line interface"""
+    return bool(args) and (args[0] in COMMANDS or args[0] in ('-h', '--help', '--version'))
+
+
+def parse_due(value):
+    """Parse a deadline given as YYYY-MM-DD, today, tomorrow or +N days"""
+    today = date.today()
+    if value == 'today':
+        return today.isoformat()
+    if value == 'tomorrow':
+        return (today + timedelta(days=1)).isoformat()
+    if value.startswith('+') and value.rstrip('d')[1:].isdigit():
+        return (today + timedelta(days=int(value.rstrip('d')[1:]))).isoformat()
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', use YYYY-MM-DD, today, tomorrow or +N")
+
+
+def find_list(list_manager, name):
+    """Get the ID of a list by name, or of the first list if name is None"""
+    if name is None:
+        if not list_manager.lists:
+            raise CliError("There are no lists yet, add one with --list NAME --create")
+        return next(iter(list_manager.lists))
+    for list_id, list_data in list_manager.lists.items():
+        if list_data['name'].casefold() == name.casefold() or list_id == name:
+            return list_id
+    return None
+
+
+def find_goal(list_manager, goal_id):
+    """Get the list ID and goal for a goal ID or a unique prefix of one"""
+    if len(goal_id) < MIN_ID_PREFIX:
+        raise CliError(f"Goal ID '{goal_id}' is too short, use at least {MIN_ID_PREFIX} characters")
+    matches = [
+        (list_id, goal)
+        for list_id, list_data in list_manager.lists.items()
+        for goal in list_data['goals']
+        if goal.get('id', '').startswith(goal_id)
+    ]
+    if not matches:
+        raise CliError(f"No goal with ID '{goal_id}'")
+    if len(matches) > 1:
+        raise CliError(f"Goal ID '{goal_id}' is ambiguous")
+    return matches[0]
+
+
+def format_goal(goal, list_name, show_steps):
+    """Format a goal as a line of text, with its steps below"""
+    line = f"{goal.get('id', '')}  [{'x' if goal.get('completed') else ' '}] {goal['title']}"
+    if goal.get('deadline'):
+        line += f"  due {goal['deadline']}"
+    line += f"  ({list_name})"
+    if show_steps:
+        for step in ordering.sorted_items(goal.get('steps', [])):
+            line += f"\n{' ' * 14}[{'x' if step.get('completed') else ' '}] {step['text']}"
+            if step.get('deadline'):
+                line += f"  due {step['deadline']}"
+    return line
+
+
+def command_add(list_manager, args):
+    list_id = find_list(list_manager, args.list)
+    if list_id is None and not args.create:
+        raise CliError(f"No list named '{args.list}', use --create to add it")
+
+    goal = model.Goal({
+        'title': args.title,
+        'completed': False,
+        'deadline': args.due,
+        'steps': [model.Step(text=text, completed=False, deadline=None) for text in args.step]
+    })
+    # One write for a new list with its first goal
+    with list_manager.batch():
+        if list_id is None:
+            list_id = list_manager.add_list(args.list)
+        list_manager.add_goals_to_list(list_id, [goal])
+    print(goal['id'])
+
+
+def command_ls(list_manager, args):
+    if args.list is not None:
+        list_id = find_list(list_manager, args.list)
+        if list_id is None:
+            raise CliError(f"No list named '{args.list}'")
+        list_ids = [list_id]
+    else:
+        list_ids = list(list_manager.lists)
+
+    overdue = list_manager.overdue_goals() if args.overdue else None
+    goals = []
+    for list_id in list_ids:
+        list_data = list_manager.lists[list_id]
+        if overdue is not None and list_id not in overdue:
+            continue
+        for goal in ordering.sorted_items(overdue[list_id] if overdue is not None else list_data['goals']):
+            if not args.all and goal.get('completed'):
+                continue
+            goals.append((list_data, goal))
+
+    if args.json:
+        print(json.dumps([
+            {**goal, 'list': list_data['name'], 'list_id': list_data['id']}
+            for list_data, goal in goals
+        ], indent=2, default=model.to_json))
+    else:
+        for list_data, goal in goals:
+            print(format_goal(goal, list_data['name'], args.steps))
+
+
+def command_set_completed(list_manager, args, completed):
+    with list_manager.batch():
+        for goal_id in args.ids:
+            list_id, goal = find_goal(list_manager, goal_id)
+            list_manager.update_goal(list_id, goal, completed=completed)
+
+
+def command_rm(list_manager, args):
+    with list_manager.batch():
+        for goal_id in args.ids:
+            list_id, goal = find_goal(list_manager, goal_id)
+            list_manager.remove_goal(list_id, goal)
+
+
+def command_lists(list_manager, args):
+    counts = list_manager.goal_counts()
+    for list_id, list_data in list_manager.lists.items():
+        completed, total = counts[list_id]
+        print(f"{list_id}  {list_data['name']}  {completed}/{total}")
+
+
+def command_stats(list_manager, args):
+    summary = list_manager.completions.summarize(days=args.days, weeks=args.weeks)
+    summary.update(list_manager.count_due(days=args.due_days))
+    if args.json:
+        print(json.dumps(summary, indent=2, default=str))
+        return
+    goals, steps = summary['total']
+    print(f"Completed: {goals} goals, {steps} steps")
+    print(f"Streak: {summary['current_streak']} days, longest {summary['longest_streak']}")
+    print(f"Open: {summary['overdue']} overdue, {summary['due_soon']} due in the next {args.due_days} days")
+    if summary['with_deadline']:
+        print(
+            f"On time: {summary['on_time']} of {summary['with_deadline']}, "
+            f"{summary['average_margin']:+.1f} days before the deadline on average"
+        )
+    for title, rows in (("Days", summary['days']), ("Weeks", summary['weeks'])):
+        print(f"\n{title}:")
+        for day, goals, steps in rows:
+            print(f"  {day.isoformat()}  {goals:>4} goals  {steps:>4} steps")
+
+
+def command_archive(list_manager, args):
+    if args.search is not None:
+        for list_id, list_data in list_manager.lists.items():
+            for goal in list_manager.archive.search(list_id, args.search, limit=args.limit):
+                print(format_goal(goal, list_data['name'], False))
+        return
+
+    if args.days is None:
+        args.days = Settings().get('archive_after_days')
+        if not args.days:
+            raise CliError("Archiving is turned off in the settings, pass --days")
+    count = list_manager.archive_completed(args.days)
+    print(f"Archived {count} goal{'s' if count != 1 else ''}")
+    for list_id, list_data in list_manager.lists.items():
+        print(f"{list_id}  {list_data['name']}  {list_manager.archive.count(list_id)} archived")
+
+
+def command_import(list_manager, args):
+    from .core.importer import BulkImporter
+
+    list_id = find_list(list_manager, args.list) if args.list else None
+    if args.list and list_id is None:
+        if not args.create:
+            raise CliError(f"No list named '{args.list}', use --create to add it")
+        list_id = list_manager.add_list(args.list)
+    importer = BulkImporter(list_manager)
+    result = importer.commit(importer.read(args.path), list_id)
+    for error in result.errors:
+        print(f"Skipped: {error}", file=sys.stderr)
+    print(result.summary())
+
+
+def command_export(list_manager, args):
+    from .core.exporter import Exporter, FORMATS, ICalendarFormat, format_for_path
+
+    exporter = Exporter(list_manager)
+    export_format = FORMATS[args.format]() if args.format else None
+    if args.deadline_events:
+        if export_format is None and not args.directory:
+            export_format = format_for_path(args.path)
+        if not isinstance(export_format, ICalendarFormat):
+            raise CliError("--deadline-events needs the iCalendar format")
+        export_format.deadline_events = True
+    list_ids = None
+    if args.list:
+        list_id = find_list(list_manager, args.list)
+        if list_id is None:
+            raise CliError(f"No list named '{args.list}'")
+        list_ids = [list_id]
+
+    if args.directory:
+        if export_format is None:
+            raise CliError("Exporting to a directory needs --format")
+        print(exporter.export_to_directory(args.path, export_format, list_ids, force=args.force).summary())
+    elif exporter.export_to_file(args.path, list_ids, export_format, force=args.force):
+        print(f"Exported to {args.path}")
+    else:
+        print(f"{args.path} is up to date")
+
+
+def create_parser():
+    """Create the argument parser with a subcommand per command"""
+    parser = argparse.ArgumentParser(
+        prog='goaltracker',
+        description=f"{APP_NAME}. Run without arguments to open the application."
+    )
+    parser.add_argument('--version', action='version', version=f"{APP_NAME} {APP_VERSION}")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="add a goal")
+    add.add_argument('title')
+    add.add_argument('--list', help="list to add to, by name (default: the first list)")
+    add.add_argument('--create', action='store_true', help="create the list if it does not exist")
+    add.add_argument('--due', type=parse_due, help="deadline: YYYY-MM-DD, today, tomorrow or +N")
+    add.add_argument('--step', action='append', default=[], help="add a step, may be repeated")
+
+    ls = commands.add_parser('ls', help="list goals that are not completed")
+    ls.add_argument('--list', help="only goals of this list")
+    ls.add_argument('--overdue', action='store_true', help="only goals past their deadline")
+    ls.add_argument('--all', action='store_true', help="include completed goals")
+    ls.add_argument('--steps', action='store_true', help="show steps below their goal")
+    ls.add_argument('--json', action='store_true', help="print JSON for scripts")
+
+    for name, help_text in (
+        ('done', "mark goals as completed"),
+        ('undone', "mark goals as not completed"),
+        ('rm', "delete goals with their steps")
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('ids', nargs='+', metavar='id', help="goal ID or a unique prefix of it")
+
+    commands.add_parser('lists', help="show the lists with their completed and total goals")
+
+    stats = commands.add_parser('stats', help="show goals and steps completed per day and week")
+    stats.add_argument('--days', type=int, default=14, help="days to show (default: 14)")
+    stats.add_argument('--weeks', type=int, default=12, help="weeks to show (default: 12)")
+    stats.add_argument('--due-days', type=int, default=7, help="days counted as due soon (default: 7)")
+    stats.add_argument('--json', action='store_true', help="print JSON for scripts")
+
+    archive = commands.add_parser('archive', help="archive old completed goals, or search the archive")
+    archive.add_argument('--days', type=int, help="archive goals completed this many days ago (default: setting)")
+    archive.add_argument('--search', metavar='text', help="show archived goals containing text instead")
+    archive.add_argument('--limit', type=int, default=50, help="most goals shown per list (default: 50)")
+
+    import_command = commands.add_parser('import', help="import goals from CSV, todo.txt, Markdown or JSON")
+    import_command.add_argument('path')
+    import_command.add_argument('--list', help="list for goals that do not name one")
+    import_command.add_argument('--create', action='store_true', help="create the list if it does not exist")
+
+    export = commands.add_parser('export', help="export to Markdown, CSV, HTML or iCalendar")
+    export.add_argument('path')
+    export.add_argument('--list', help="only this list (default: all lists)")
+    export.add_argument('--format', choices=['markdown', 'csv', 'html', 'ics'],
+                        help="format (default: from the file extension)")
+    export.add_argument('--directory', action='store_true', help="write a file per list into path")
+    export.add_argument('--deadline-events', action='store_true',
+                        help="iCalendar only: also add deadlines as all-day events")
+    export.add_argument('--force', action='store_true', help="write even if nothing changed")
+    return parser
+
+
+def main(args=None):
+    """Run a command and return the exit status"""
+    args = create_parser().parse_args(args)
+    read_only = args.command in READ_ONLY_COMMANDS or (args.command == 'archive' and args.search is not None)
+
+    try:
+        list_manager = ListManager()
+        list_manager.load_lists(write=not read_only)
+
+        if args.command == 'add':
+            command_add(list_manager, args)
+        elif args.command == 'ls':
+            command_ls(list_manager, args)
+        elif args.command in ('done', 'undone'):
+            command_set_completed(list_manager, args, args.command == 'done')
+        elif args.command == 'rm':
+            command_rm(list_manager, args)
+        elif args.command == 'lists':
+            command_lists(list_manager, args)
+        elif args.command == 'stats':
+            command_stats(list_manager, args)
+        elif args.command == 'archive':
+            command_archive(list_manager, args)
+        elif args.command == 'import':
+            command_import(list_manager, args)
+        elif args.command == 'export':
+            command_export(list_manager, args)
+    except json.JSONDecodeError as e:
+        print(f"goaltracker: The lists file is corrupted: {e}", file=sys.stderr)
+        return 1
+    except (CliError, ValueError, OSError) as e:
+        print(f"goaltracker: {e}", file=sys.stderr)
+        return 1
+    return 0
@@ -4,4 +4,8 @@ Configuration constants for the Goal Tracker application
 
 APP_NAME = "Goal Tracker"
 APP_VERSION = "1.2.1"
-APP_ID = "io.github.alexxisaapps.elementary_goal_tracker"
\ No newline at end of file
+APP_ID = "io.github.alexxisaapps.elementary_goal_tracker"
+
+# Time from start to the first frame of the window that startup should stay
+# within; slower starts are reported on the console
+FIRST_FRAME_BUDGET_MS = 400
\ No newline at end of file
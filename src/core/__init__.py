@@ -0,0 +1,11 @@
+"""Storage, model and quote logic of the Goal Tracker application
+
+Pure Python without GTK, so scripts and tools can work on the data without
+loading the user interface.
+"""
+
+from .settings import Settings
+from .list_manager import ListManager, StorageConflict
+from .daily_quote import DailyQuote
+
+__all__ = ['Settings', 'ListManager', 'StorageConflict', 'DailyQuote']
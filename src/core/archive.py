@@ -0,0 +1,178 @@
+"""Archive of old completed goals, kept out of the lists file
+
+Lists that are used for years collect thousands of completed goals that
+nobody looks at, yet every one of them would be loaded, shown and written
+again on every save. Once the archive_after_days setting is turned on,
+completed goals older than that are moved to compressed files instead:
+
+    archive/index.json                  chunks of every list, oldest first
+    archive/<list ID>-<n>.jsonl.gz      up to CHUNK_SIZE goals, a JSON line each
+
+Each chunk holds goals ordered by the day they were completed. Archiving
+fills up the last chunk of a list before starting a new one, so only the
+last chunk and chunks goals were restored from hold fewer than CHUNK_SIZE
+goals. The index keeps the number of goals of every chunk, so the archive is counted and
+paged through newest first while decompressing only the chunks a page
+needs. Searching reads the chunks until enough goals matched.
+"""
+
+import os
+import gzip
+import json
+
+from . import model
+
+CHUNK_SIZE = 500
+PAGE_SIZE = 50
+
+# Day a goal was last completed, set by ListManager.update_goal
+COMPLETED_ON_KEY = 'completed_on'
+
+
+class Archive:
+    """Completed goals moved out of the lists, in compressed chunks per list"""
+
+    def __init__(self, data_dir):
+        self.archive_dir = os.path.join(data_dir, 'archive')
+        self.index_file = os.path.join(self.archive_dir, 'index.json')
+        # Archived goals by list ID, read from the index on first use so
+        # switching lists does not read the index again
+        self.counts = None
+
+    def read_index(self):
+        """Get the chunks of every list as {list ID: [{'file', 'count'}]}"""
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error reading the archive index: {e}")
+            return {}
+
+    def write_index(self, index):
+        temp_file = f'{self.index_file}.{os.getpid()}.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(temp_file, self.index_file)
+        self.counts = None
+
+    def count(self, list_id):
+        """Get the number of archived goals of a list"""
+        if self.counts is None:
+            self.counts = {
+                chunks_list_id: sum(chunk['count'] for chunk in chunks)
+                for chunks_list_id, chunks in self.read_index().items()
+            }
+        return self.counts.get(list_id, 0)
+
+    def load_chunk(self, name):
+        """Get the goals of a chunk, oldest first, raising if it cannot be read"""
+        with gzip.open(os.path.join(self.archive_dir, name), 'rt', encoding='utf-8') as f:
+            return [model.Goal.from_json(json.loads(line)) for line in f if line.strip()]
+
+    def read_chunk(self, name):
+        """Get the goals of a chunk, oldest first, or none if it cannot be read"""
+        try:
+            return self.load_chunk(name)
+        except (OSError, EOFError, json.JSONDecodeError) as e:
+            print(f"Error reading archived goals from {name}: {e}")
+            return []
+
+    def write_chunk(self, name, goals):
+        temp_file = os.path.join(self.archive_dir, f'{name}.{os.getpid()}.tmp')
+        with gzip.open(temp_file, 'wt', encoding='utf-8') as f:
+            for goal in goals:
+                f.write(json.dumps(goal.to_json()) + '\n')
+        os.replace(temp_file, os.path.join(self.archive_dir, name))
+
+    def add(self, list_id, goals):
+        """Archive goals of a list
+
+        Raises OSError if they could not be written, in which case they
+        should stay in the list.
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        index = self.read_index()
+        chunks = index.setdefault(list_id, [])
+        number = max((int(chunk['file'].rsplit('-', 1)[1].split('.')[0]) for chunk in chunks), default=0)
+        
+        # The goals of a last chunk with room left are written again with
+        # the new ones, to a new file so the index never points to a chunk
+        # with other goals than it counts
+        replaced = None
+        if chunks and chunks[-1]['count'] < CHUNK_SIZE:
+            try:
+                goals = self.load_chunk(chunks[-1]['file']) + list(goals)
+                replaced = chunks.pop()['file']
+            except (OSError, EOFError, json.JSONDecodeError) as e:
+                print(f"Error reading archived goals from {chunks[-1]['file']}, starting a new chunk: {e}")
+        
+        goals = sorted(goals, key=lambda goal: goal.get(COMPLETED_ON_KEY) or '')
+        for start in range(0, len(goals), CHUNK_SIZE):
+            number += 1
+            name = f'{list_id}-{number}.jsonl.gz'
+            self.write_chunk(name, goals[start:start + CHUNK_SIZE])
+            chunks.append({'file': name, 'count': len(goals[start:start + CHUNK_SIZE])})
+        self.write_index(index)
+        
+        if replaced is not None:
+            try:
+                os.remove(os.path.join(self.archive_dir, replaced))
+            except OSError as e:
+                print(f"Error removing archived goals file {replaced}: {e}")
+
+    def newest_first(self, list_id):
+        """Go through the chunks of a list from the newest, as (chunk, goals)"""
+        for chunk in reversed(self.read_index().get(list_id, [])):
+            yield chunk, reversed(self.read_chunk(chunk['file']))
+
+    def page(self, list_id, offset=0, limit=PAGE_SIZE):
+        """Get archived goals of a list, most recently completed first"""
+        goals = []
+        for chunk in reversed(self.read_index().get(list_id, [])):
+            if offset >= chunk['count']:
+                # Skipped without decompressing it
+                offset -= chunk['count']
+                continue
+            chunk_goals = self.read_chunk(chunk['file'])[::-1]
+            goals.extend(chunk_goals[offset:offset + limit - len(goals)])
+            offset = 0
+            if len(goals) >= limit:
+                break
+        return goals
+
+    def search(self, list_id, text, limit=PAGE_SIZE):
+        """Find archived goals of a list whose title or steps contain text"""
+        text = text.casefold()
+        found = []
+        for _, goals in self.newest_first(list_id):
+            for goal in goals:
+                if text in goal.get('title', '').casefold() or any(
+                    text in step.get('text', '').casefold() for step in goal.get('steps', [])
+                ):
+                    found.append(goal)
+                    if len(found) >= limit:
+                        return found
+        return found
+
+    def remove(self, list_id, goal_id):
+        """Take a goal out of the archive and return it, or None if it is not there"""
+        index = self.read_index()
+        chunks = index.get(list_id, [])
+        for chunk in reversed(chunks):
+            goals = self.read_chunk(chunk['file'])
+            kept = [goal for goal in goals if goal.get('id') != goal_id]
+            if len(kept) == len(goals):
+                continue
+
+            if kept:
+                self.write_chunk(chunk['file'], kept)
+                chunk['count'] = len(kept)
+            else:
+                chunks.remove(chunk)
+            self.write_index(index)
+            if not kept:
+                os.remove(os.path.join(self.archive_dir, chunk['file']))
+            return next(goal for goal in goals if goal.get('id') == goal_id)
+        return None
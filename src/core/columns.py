@@ -0,0 +1,261 @@
+"""Columnar copy of the goals and steps for deadline queries
+
+Finding what is overdue or due soon means walking every list, goal and
+step. With NumPy installed, the list manager can also keep the fields such
+queries need in one array per field, with a row per goal and step:
+
+    list       code of the list the item is in, see ``list_ids``
+    parent     row of the goal of a step, -1 for goals
+    completed  whether the item is completed
+    deadline   date ordinal of the deadline, 0 without one
+
+The rows are kept in sync from the operations the list manager records for
+undo, so a change costs a few array writes. Removed items leave dead rows
+behind, which are compacted away once they make up half of the store.
+
+The store is built the first time a query needs it, and only then is
+NumPy imported, so the cli and the first frame of the window do not pay for
+it. NumPy is optional: without it load_numpy() returns False, the list
+manager keeps no store and callers fall back to walking the lists.
+"""
+
+# Set by load_numpy()
+numpy = None
+
+INITIAL_CAPACITY = 1024
+
+# Dtype of every column
+COLUMNS = {
+    'list': 'int32',
+    'parent': 'int32',
+    'completed': 'bool',
+    'deadline': 'int32',
+    'alive': 'bool'
+}
+
+
+def load_numpy():
+    """Import NumPy on first use, returning whether it is available"""
+    global numpy
+    if numpy is None:
+        try:
+            import numpy as module
+        except ImportError:  # Optional, queries walk the lists without it
+            return False
+        numpy = module
+    return True
+
+
+class ColumnStore:
+    """Arrays of the fields of every goal and step, a row per item"""
+
+    def __init__(self):
+        self.list_ids = []
+        self.list_codes = {}
+        self.clear()
+
+    def clear(self):
+        """Drop every row"""
+        self.arrays = {name: numpy.zeros(INITIAL_CAPACITY, dtype) for name, dtype in COLUMNS.items()}
+        self.items = []
+        self.size = 0
+        self.dead = 0
+
+    def column(self, name):
+        """Get a column, trimmed to the rows in use"""
+        return self.arrays[name][:self.size]
+
+    def list_code(self, list_id):
+        """Get the code a list is stored as in the list column"""
+        code = self.list_codes.get(list_id)
+        if code is None:
+            code = self.list_codes[list_id] = len(self.list_ids)
+            self.list_ids.append(list_id)
+        return code
+
+    def rebuild(self, lists):
+        """Fill the store from scratch from every list
+
+        The columns are gathered in Python lists and converted at once,
+        which is much faster than writing rows one by one.
+        """
+        self.clear()
+        values = {name: [] for name in COLUMNS}
+        for list_id, list_data in lists.items():
+            list_code = self.list_code(list_id)
+            for goal in list_data.get('goals', []):
+                parent = len(self.items)
+                for item in [goal] + goal.get('steps', []):
+                    item.column_row = len(self.items)
+                    self.items.append(item)
+                    values['list'].append(list_code)
+                    values['parent'].append(-1 if item is goal else parent)
+                    values['completed'].append(bool(item.get('completed')))
+                    values['deadline'].append(item.deadline_ordinal or 0)
+
+        self.size = len(self.items)
+        capacity = max(INITIAL_CAPACITY, self.size * 2)
+        for name, dtype in COLUMNS.items():
+            array = numpy.zeros(capacity, dtype)
+            if name == 'alive':
+                array[:self.size] = True
+            else:
+                array[:self.size] = values[name]
+            self.arrays[name] = array
+
+    def row_of(self, item):
+        """Get the row of an item, or None if it is not in the store"""
+        row = getattr(item, 'column_row', None)
+        if row is not None and row < self.size and self.items[row] is item:
+            return row
+        return None
+
+    def add_row(self, item, list_code, parent):
+        if self.size == len(self.arrays['alive']):
+            capacity = self.size * 2
+            for name, array in self.arrays.items():
+                grown = numpy.zeros(capacity, array.dtype)
+                grown[:self.size] = array[:self.size]
+                self.arrays[name] = grown
+        row = self.size
+        self.size += 1
+        self.items.append(item)
+        item.column_row = row
+        self.arrays['list'][row] = list_code
+        self.arrays['parent'][row] = parent
+        self.arrays['alive'][row] = True
+        self.update_row(row, item)
+        return row
+
+    def update_row(self, row, item):
+        """Copy the fields of an item into its row"""
+        self.arrays['completed'][row] = bool(item.get('completed'))
+        self.arrays['deadline'][row] = item.deadline_ordinal or 0
+
+    def add_goal(self, list_id, goal):
+        """Add a goal with its steps, or update it if it is stored already"""
+        row = self.row_of(goal)
+        if row is not None:
+            self.update_row(row, goal)
+            return
+        list_code = self.list_code(list_id)
+        row = self.add_row(goal, list_code, -1)
+        for step in goal.get('steps', []):
+            self.add_row(step, list_code, row)
+
+    def add_step(self, list_id, goal, step):
+        """Add a step of a stored goal"""
+        parent = self.row_of(goal)
+        if parent is None:
+            self.add_goal(list_id, goal)
+        elif self.row_of(step) is None:
+            self.add_row(step, self.arrays['list'][parent], parent)
+
+    def discard(self, item):
+        """Remove an item, with its steps if it is a goal"""
+        row = self.row_of(item)
+        if row is None:
+            return
+        self.discard_row(row)
+        for step in item.get('steps', ()):
+            step_row = self.row_of(step)
+            if step_row is not None:
+                self.discard_row(step_row)
+        if self.dead > INITIAL_CAPACITY and self.dead * 2 > self.size:
+            self.compact()
+
+    def discard_row(self, row):
+        item = self.items[row]
+        item.column_row = None
+        self.items[row] = None
+        self.arrays['alive'][row] = False
+        self.dead += 1
+
+    def compact(self):
+        """Drop the dead rows, renumbering the ones left"""
+        alive = numpy.flatnonzero(self.column('alive'))
+        renumber = numpy.full(self.size, -1, 'int32')
+        renumber[alive] = numpy.arange(len(alive), dtype='int32')
+        parent = self.column('parent')[alive]
+        has_parent = parent >= 0
+        parent[has_parent] = renumber[parent[has_parent]]
+        for name, array in self.arrays.items():
+            array[:len(alive)] = parent if name == 'parent' else array[alive]
+        self.items = [self.items[row] for row in alive.tolist()]
+        for row, item in enumerate(self.items):
+            item.column_row = row
+        self.size = len(alive)
+        self.dead = 0
+
+    def apply(self, operations, lists):
+        """Update the rows from operations reverting changes just made
+
+        These are the operations ListManager records for undo, or the
+        inverse a replay returns, so 'remove' means the item was added.
+        """
+        for operation in operations:
+            kind, list_id = operation[0], operation[1]
+            if kind == 'remove_list':
+                for goal in lists[list_id].get('goals', []):
+                    self.add_goal(list_id, goal)
+            elif kind == 'insert_list':
+                for goal in operation[2].get('goals', []):
+                    self.discard(goal)
+            elif kind == 'set':
+                _, _, goal, item, key, old_value = operation
+                if goal is None:
+                    continue
+                if key == 'steps':
+                    for step in old_value if isinstance(old_value, list) else ():
+                        self.discard(step)
+                    for step in goal.get('steps', []):
+                        self.add_step(list_id, goal, step)
+                row = self.row_of(item)
+                if row is not None:
+                    self.update_row(row, item)
+            elif kind in ('remove', 'remove_many'):
+                goal, added = operation[2], operation[4]
+                for item in added if kind == 'remove_many' else (added,):
+                    if goal is None:
+                        self.add_goal(list_id, item)
+                    else:
+                        self.add_step(list_id, goal, item)
+            else:
+                removed = operation[4]
+                for item in removed if kind == 'insert_many' else (removed,):
+                    self.discard(item)
+
+    def open_due_between(self, start, end):
+        """Select the rows not completed that are due from start to end
+
+        start and end are date ordinals, both included.
+        """
+        deadline = self.column('deadline')
+        return (
+            (deadline >= start) & (deadline <= end) & ~self.column('completed') & self.column('alive')
+        )
+
+    def overdue(self, today):
+        """Select the rows not completed whose deadline was before today"""
+        return self.open_due_between(1, today.toordinal() - 1)
+
+    def overdue_counts(self, today):
+        """Get the number of overdue goals and steps of every list with any, by list ID"""
+        counts = numpy.bincount(self.column('list')[self.overdue(today)], minlength=len(self.list_ids))
+        return {self.list_ids[code]: int(counts[code]) for code in numpy.flatnonzero(counts).tolist()}
+
+    def overdue_goals(self, today):
+        """Get the overdue goals of every list with any, by list ID"""
+        rows = numpy.flatnonzero(self.overdue(today) & (self.column('parent') < 0))
+        goals = {}
+        for row, code in zip(rows.tolist(), self.column('list')[rows].tolist()):
+            goals.setdefault(self.list_ids[code], []).append(self.items[row])
+        return goals
+
+    def count_due(self, today, days):
+        """Count the goals and steps overdue and due in the next days"""
+        ordinal = today.toordinal()
+        return {
+            'overdue': int(self.overdue(today).sum()),
+            'due_soon': int(self.open_due_between(ordinal, ordinal + days - 1).sum())
+        }
@@ -0,0 +1,236 @@
+"""Log of completed goals and steps, and statistics over it
+
+Every time the user completes or reopens a goal or step, a fixed-width
+record is appended to completions.bin in the data directory:
+
+    time       seconds since the epoch, float64
+    item       ID of the goal or step as a number, uint64
+    day        local date ordinal of the event, int32
+    deadline   date ordinal of the deadline of the item, 0 without one
+    kind       KIND_GOAL or KIND_STEP, uint8
+    completed  1 when completed, 0 when reopened, uint8
+
+after an 8 byte header. The file is only ever appended to, so it stays
+intact if the application stops in the middle of a write; a partial last
+record is ignored.
+
+With NumPy the log is memory-mapped and the statistics are computed on
+whole columns at once, which keeps years of history fast to summarize.
+Without it the records are unpacked and summarized in pure Python. NumPy
+is only imported when statistics are asked for, so logging a completion
+and starting the application or cli do not pay for it.
+"""
+
+import importlib.util
+import os
+import struct
+import time
+from datetime import date
+
+MAGIC = b'GTCOMPL1'
+RECORD = struct.Struct('<dQiiBB6x')
+
+KIND_GOAL = 0
+KIND_STEP = 1
+
+
+def record_dtype():
+    """Get the NumPy dtype matching RECORD"""
+    import numpy
+    return numpy.dtype([
+        ('time', '<f8'), ('item', '<u8'), ('day', '<i4'), ('deadline', '<i4'),
+        ('kind', 'u1'), ('completed', 'u1'), ('padding', 'V6')
+    ])
+
+
+def item_number(item_id):
+    """Get the number a hexadecimal goal or step ID is logged as"""
+    try:
+        return int(item_id, 16) & 0xFFFFFFFFFFFFFFFF
+    except (TypeError, ValueError):
+        return 0
+
+
+class CompletionLog:
+    """Append-only log of completions, kept in completions.bin"""
+
+    def __init__(self, data_dir):
+        self.path = os.path.join(data_dir, 'completions.bin')
+
+    def append(self, item, completed, kind=KIND_GOAL):
+        """Log that a goal or step was completed or reopened just now"""
+        now = time.time()
+        record = RECORD.pack(
+            now,
+            item_number(item.get('id')),
+            date.fromtimestamp(now).toordinal(),
+            item.deadline_ordinal or 0,
+            kind,
+            1 if completed else 0
+        )
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'ab') as f:
+                if f.tell() == 0:
+                    f.write(MAGIC)
+                f.write(record)
+        except OSError as e:
+            print(f"Error logging completion: {e}")
+
+    def count(self):
+        """Get the number of complete records in the log"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        return max(size - len(MAGIC), 0) // RECORD.size
+
+    def read_array(self):
+        """Memory-map the records as a NumPy structured array"""
+        import numpy
+        count = self.count()
+        if count == 0:
+            return numpy.zeros(0, record_dtype())
+        return numpy.memmap(self.path, dtype=record_dtype(), mode='r', offset=len(MAGIC), shape=(count,))
+
+    def read_rows(self):
+        """Get the records as tuples, in the order of the fields"""
+        count = self.count()
+        if count == 0:
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(len(MAGIC))
+            data = f.read(count * RECORD.size)
+        return list(RECORD.iter_unpack(data))
+
+    def summarize(self, today=None, days=14, weeks=12):
+        """Get the statistics shown in the statistics dialog
+
+        Only the last event of every goal and step counts, so something
+        completed and reopened again is not counted, and something
+        completed twice counts on the day of the last time. Returns a dict
+        with:
+
+            days            (date, goals, steps) of the last `days` days
+            weeks           (Monday, goals, steps) of the last `weeks` weeks
+            total           (goals, steps) completed ever
+            current_streak  days in a row up to today or yesterday with a completion
+            longest_streak  most days in a row with a completion
+            with_deadline   completions of items that had a deadline
+            on_time         those completed on or before the deadline
+            average_margin  mean days completed before the deadline, negative
+                            when late, or None without deadlines
+        """
+        today = (today or date.today()).toordinal()
+        if importlib.util.find_spec('numpy') is None:
+            # Optional, statistics are computed in Python without it
+            return summarize_rows(self.read_rows(), today, days, weeks)
+        return summarize_array(self.read_array(), today, days, weeks)
+
+
+def monday(ordinal):
+    """Get the ordinal of the Monday of the week of a date ordinal"""
+    # Ordinal 1, January 1st of year 1, was a Monday
+    return ordinal - (ordinal - 1) % 7
+
+
+def streaks(completion_days, today):
+    """Get the current and longest streaks from sorted distinct day ordinals"""
+    current = longest = run = 0
+    previous = None
+    for day in completion_days:
+        run = run + 1 if previous == day - 1 else 1
+        longest = max(longest, run)
+        previous = day
+    if previous is not None and previous >= today - 1:
+        current = run
+    return current, longest
+
+
+def summarize_array(records, today, days, weeks):
+    """Compute the statistics from the memory-mapped records"""
+    import numpy
+    # Last event of every item: first occurrence in the reversed log
+    _, last = numpy.unique(records['item'][::-1], return_index=True)
+    last = len(records) - 1 - last
+    last = last[records['completed'][last] == 1]
+    day = records['day'][last].astype('int64')
+    deadline = records['deadline'][last].astype('int64')
+    is_goal = records['kind'][last] == KIND_GOAL
+
+    first_day = today - days + 1
+    recent = day >= first_day
+    goals_by_day = numpy.bincount(day[recent & is_goal] - first_day, minlength=days)[:days]
+    steps_by_day = numpy.bincount(day[recent & ~is_goal] - first_day, minlength=days)[:days]
+
+    first_week = monday(today) - 7 * (weeks - 1)
+    week = (day - first_week) // 7
+    in_weeks = week >= 0
+    goals_by_week = numpy.bincount(week[in_weeks & is_goal], minlength=weeks)[:weeks]
+    steps_by_week = numpy.bincount(week[in_weeks & ~is_goal], minlength=weeks)[:weeks]
+
+    # Runs of consecutive days, split where the gap is more than a day
+    completion_days = numpy.unique(day)
+    current = longest = 0
+    if len(completion_days):
+        starts = numpy.flatnonzero(numpy.diff(completion_days) != 1) + 1
+        bounds = numpy.concatenate(([0], starts, [len(completion_days)]))
+        runs = numpy.diff(bounds)
+        longest = int(runs.max())
+        if completion_days[-1] >= today - 1:
+            current = int(runs[-1])
+
+    margin = (deadline - day)[deadline > 0]
+    return {
+        'days': [
+            (date.fromordinal(first_day + index), int(goals_by_day[index]), int(steps_by_day[index]))
+            for index in range(days)
+        ],
+        'weeks': [
+            (date.fromordinal(first_week + 7 * index), int(goals_by_week[index]), int(steps_by_week[index]))
+            for index in range(weeks)
+        ],
+        'total': (int(is_goal.sum()), int((~is_goal).sum())),
+        'current_streak': current,
+        'longest_streak': longest,
+        'with_deadline': len(margin),
+        'on_time': int((margin >= 0).sum()),
+        'average_margin': float(margin.mean()) if len(margin) else None
+    }
+
+
+def summarize_rows(rows, today, days, weeks):
+    """Compute the statistics from unpacked records, without NumPy"""
+    last = {}
+    for row in rows:
+        last[row[1]] = row
+    done = [row for row in last.values() if row[5] == 1]
+
+    first_day = today - days + 1
+    first_week = monday(today) - 7 * (weeks - 1)
+    by_day = [[0, 0] for _ in range(days)]
+    by_week = [[0, 0] for _ in range(weeks)]
+    total = [0, 0]
+    margins = []
+    for _, _, day, deadline, kind, _ in done:
+        column = 0 if kind == KIND_GOAL else 1
+        total[column] += 1
+        if first_day <= day <= today:
+            by_day[day - first_day][column] += 1
+        week = (day - first_week) // 7
+        if 0 <= week < weeks:
+            by_week[week][column] += 1
+        if deadline > 0:
+            margins.append(deadline - day)
+
+    current, longest = streaks(sorted({row[2] for row in done}), today)
+    return {
+        'days': [(date.fromordinal(first_day + index), *counts) for index, counts in enumerate(by_day)],
+        'weeks': [(date.fromordinal(first_week + 7 * index), *counts) for index, counts in enumerate(by_week)],
+        'total': tuple(total),
+        'current_streak': current,
+        'longest_streak': longest,
+        'with_deadline': len(margins),
+        'on_time': sum(1 for margin in margins if margin >= 0),
+        'average_margin': sum(margins) / len(margins) if margins else None
+    }
@@ -2,14 +2,16 @@ import os
 import json
 import random
 from datetime import datetime
-from gi.repository import GLib
+
+from . import metrics, paths
+
+QUOTE_FILE_READS = metrics.counter('goaltracker_quote_file_reads_total', "Reads of a quotes file")
 
 class DailyQuote:
     """Service for managing daily motivational quotes"""
     
     def __init__(self):
-        self.data_dir = os.path.join(GLib.get_user_data_dir(), 'goaltracker')
-        os.makedirs(self.data_dir, exist_ok=True)
+        self.data_dir = paths.data_dir()
         self.quotes_file = os.path.join(self.data_dir, 'quotes.json')
         
         # For caching the daily quote
@@ -25,9 +27,9 @@ class DailyQuote:
     def load_quotes(self):
         """Load quotes from the system or user directory"""
         # Try user directory first
-        user_quotes = os.path.join(GLib.get_user_data_dir(), 'goaltracker', 'quotes.json')
+        user_quotes = os.path.join(paths.data_dir(), 'quotes.json')
         # System directory as fallback
-        system_quotes = os.path.join(GLib.get_system_data_dirs()[0], 'goaltracker', 'quotes.json')
+        system_quotes = os.path.join(paths.system_data_dirs()[0], paths.APP_DIR_NAME, 'quotes.json')
         
         # Default quotes collection
         default_quotes = {
@@ -47,11 +49,13 @@ class DailyQuote:
         try:
             # Try user directory first
             if os.path.exists(user_quotes):
+                QUOTE_FILE_READS.inc()
                 with open(user_quotes, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     return data['quotes']
             # Try system directory next
             elif os.path.exists(system_quotes):
+                QUOTE_FILE_READS.inc()
                 with open(system_quotes, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     return data['quotes']
@@ -92,6 +96,7 @@ class DailyQuote:
             
             # Save to user directory
             user_quotes = os.path.join(self.data_dir, 'quotes.json')
+            os.makedirs(self.data_dir, exist_ok=True)
             with open(user_quotes, 'w', encoding='utf-8') as f:
                 json.dump(quotes, f, indent=2, ensure_ascii=False)
                 
@@ -114,6 +119,7 @@ class DailyQuote:
             
             # Save to user directory
             user_quotes = os.path.join(self.data_dir, 'quotes.json')
+            os.makedirs(self.data_dir, exist_ok=True)
             with open(user_quotes, 'w', encoding='utf-8') as f:
                 json.dump(quotes, f, indent=2, ensure_ascii=False)
                 
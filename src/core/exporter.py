@@ -0,0 +1,416 @@
+"""Export of lists to Markdown, CSV, HTML and iCalendar
+
+Each format renders lists as a stream of text pieces, which are written to
+a temporary file as they are produced and then moved in place, so memory
+use does not depend on the size of the lists. The content hash of every
+exported list is remembered, and exporting lists that have not changed
+since the last export to the same file is skipped.
+"""
+
+import io
+import os
+import re
+import csv
+import html
+import json
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from . import model, ordering, paths
+
+FORMATS = {}
+
+
+def register_format(format_class):
+    """Make an export format available, keyed by its name"""
+    FORMATS[format_class.name] = format_class
+    return format_class
+
+
+def format_for_path(path):
+    """Get the export format for a file based on its extension"""
+    extension = os.path.splitext(path)[1].lower()
+    for format_class in FORMATS.values():
+        if extension == format_class.extension:
+            return format_class()
+    return None
+
+
+def list_hash(list_data):
+    """Get the content hash of a list
+
+    The list is hashed a goal at a time, so its JSON is never held in
+    memory as a whole.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    fields = {key: value for key, value in list_data.items() if key != 'goals'}
+    digest.update(json.dumps(fields, sort_keys=True).encode('utf-8'))
+    for goal in list_data.get('goals', []):
+        digest.update(json.dumps(goal, default=model.to_json).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ExportFormat:
+    """Base class of export formats
+
+    Subclasses set name, label and extension and implement render_list();
+    header() and footer() wrap the lists of a file.
+    """
+
+    name = ''
+    label = ''
+    extension = ''
+
+    def key(self):
+        """Identify the format and its options in the export manifest"""
+        return self.name
+
+    def header(self, lists):
+        return ''
+
+    def footer(self, lists):
+        return ''
+
+    def render_list(self, list_data):
+        """Yield the text of a list in pieces"""
+        raise NotImplementedError
+
+    def render(self, lists):
+        """Yield the text of a whole file in pieces"""
+        yield self.header(lists)
+        for list_data in lists:
+            yield from self.render_list(list_data)
+        yield self.footer(lists)
+
+
+@register_format
+class MarkdownFormat(ExportFormat):
+    """Markdown checklists, as read back by the importer"""
+
+    name = 'markdown'
+    label = "Markdown"
+    extension = '.md'
+
+    @staticmethod
+    def item_line(indent, text, completed, deadline):
+        line = f"{indent}- [{'x' if completed else ' '}] {text}"
+        if deadline:
+            line += f" (due {deadline})"
+        return line + '\n'
+
+    def render_list(self, list_data):
+        yield f"# {list_data['name']}\n\n"
+        for goal in ordering.sorted_items(list_data['goals']):
+            yield self.item_line('', goal['title'], goal.get('completed'), goal.get('deadline'))
+            for step in ordering.sorted_items(goal.get('steps', [])):
+                yield self.item_line('  ', step['text'], step.get('completed'), step.get('deadline'))
+        yield '\n'
+
+
+@register_format
+class CsvFormat(ExportFormat):
+    """One row per goal and step, with the columns the importer recognizes"""
+
+    name = 'csv'
+    label = "CSV"
+    extension = '.csv'
+
+    COLUMNS = ['List', 'Title', 'Completed', 'Deadline', 'Type']
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def row(self, values):
+        """Format a single CSV row"""
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.writer.writerow(values)
+        return self.buffer.getvalue()
+
+    def header(self, lists):
+        return self.row(self.COLUMNS)
+
+    def render_list(self, list_data):
+        for goal in ordering.sorted_items(list_data['goals']):
+            yield self.row([
+                list_data['name'], goal['title'], 'yes' if goal.get('completed') else 'no',
+                goal.get('deadline') or '', 'goal'
+            ])
+            for step in ordering.sorted_items(goal.get('steps', [])):
+                yield self.row([
+                    list_data['name'], step['text'], 'yes' if step.get('completed') else 'no',
+                    step.get('deadline') or '', 'step'
+                ])
+
+
+@register_format
+class HtmlFormat(ExportFormat):
+    """A standalone HTML page with a section per list"""
+
+    name = 'html'
+    label = "HTML"
+    extension = '.html'
+
+    STYLE = (
+        "body { font-family: sans-serif; max-width: 48em; margin: 2em auto; }\n"
+        ".completed { text-decoration: line-through; color: #888; }\n"
+        ".deadline { color: #888; font-size: 0.9em; margin-left: 0.5em; }\n"
+        "ul { list-style: none; padding-left: 1.2em; }\n"
+    )
+
+    def header(self, lists):
+        title = lists[0]['name'] if len(lists) == 1 else "Goals"
+        return (
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{html.escape(title)}</title>\n<style>\n{self.STYLE}</style>\n"
+            "</head>\n<body>\n"
+        )
+
+    def footer(self, lists):
+        return "</body>\n</html>\n"
+
+    @staticmethod
+    def item(text, completed, deadline):
+        css_class = ' class="completed"' if completed else ''
+        item = f"{'☑' if completed else '☐'} <span{css_class}>{html.escape(text)}</span>"
+        if deadline:
+            item += f"<span class=\"deadline\">due {html.escape(deadline)}</span>"
+        return item
+
+    def render_list(self, list_data):
+        yield f"<section>\n<h1>{html.escape(list_data['name'])}</h1>\n<ul>\n"
+        for goal in ordering.sorted_items(list_data['goals']):
+            yield f"<li>{self.item(goal['title'], goal.get('completed'), goal.get('deadline'))}"
+            steps = ordering.sorted_items(goal.get('steps', []))
+            if steps:
+                yield "\n<ul>\n"
+                for step in steps:
+                    yield f"<li>{self.item(step['text'], step.get('completed'), step.get('deadline'))}</li>\n"
+                yield "</ul>\n"
+            yield "</li>\n"
+        yield "</ul>\n</section>\n"
+
+
+@register_format
+class ICalendarFormat(ExportFormat):
+    """iCalendar file with a to-do for every goal and step
+
+    Deadlines become the due date of the to-do. With deadline_events set,
+    every deadline is also written as an all-day event for calendars that
+    do not show to-dos.
+    """
+
+    name = 'ics'
+    label = "iCalendar"
+    extension = '.ics'
+
+    ESCAPE_PATTERN = re.compile(r'([\\;,])')
+
+    def __init__(self, deadline_events=False):
+        self.deadline_events = deadline_events
+        self.timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+    def key(self):
+        return f"{self.name}+events" if self.deadline_events else self.name
+
+    @staticmethod
+    def escape(text):
+        """Escape a text value"""
+        return ICalendarFormat.ESCAPE_PATTERN.sub(r'\\\1', text).replace('\n', '\\n')
+
+    @staticmethod
+    def fold(line):
+        """Fold a content line at 75 octets as required by RFC 5545"""
+        encoded = line.encode('utf-8')
+        if len(encoded) <= 75:
+            return line + '\r\n'
+        parts = []
+        while encoded:
+            limit = 75 if not parts else 74
+            cut = min(limit, len(encoded))
+            # Do not split a multi-byte character
+            while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+                cut -= 1
+            parts.append(encoded[:cut].decode('utf-8'))
+            encoded = encoded[cut:]
+        return '\r\n '.join(parts) + '\r\n'
+
+    def header(self, lists):
+        return (
+            "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+            "PRODID:-//alexxisaapps//Goal Tracker//EN\r\n"
+        )
+
+    def footer(self, lists):
+        return "END:VCALENDAR\r\n"
+
+    def component(self, kind, uid, summary, completed, deadline, list_name, related_to=None):
+        """Render a VTODO or VEVENT"""
+        lines = [
+            f"BEGIN:{kind}",
+            f"UID:{uid}",
+            f"DTSTAMP:{self.timestamp}",
+            f"SUMMARY:{self.escape(summary)}",
+            f"CATEGORIES:{self.escape(list_name)}"
+        ]
+        date = deadline.replace('-', '') if deadline else None
+        if kind == 'VTODO':
+            lines.append(f"STATUS:{'COMPLETED' if completed else 'NEEDS-ACTION'}")
+            if date:
+                lines.append(f"DUE;VALUE=DATE:{date}")
+            if related_to:
+                lines.append(f"RELATED-TO:{related_to}")
+        else:
+            next_day = datetime.strptime(date, '%Y%m%d') + timedelta(days=1)
+            lines.append(f"DTSTART;VALUE=DATE:{date}")
+            lines.append(f"DTEND;VALUE=DATE:{next_day.strftime('%Y%m%d')}")
+            lines.append("TRANSP:TRANSPARENT")
+        lines.append(f"END:{kind}")
+        return ''.join(self.fold(line) for line in lines)
+
+    def render_item(self, item, text, list_name, related_to=None):
+        """Render the to-do of a goal or step and its deadline event"""
+        uid = f"{item.get('id') or id(item)}@goaltracker"
+        deadline = item.get('deadline')
+        yield self.component('VTODO', uid, text, item.get('completed'), deadline, list_name, related_to)
+        if self.deadline_events and deadline:
+            yield self.component(
+                'VEVENT', f"deadline-{uid}", text, item.get('completed'), deadline, list_name
+            )
+
+    def render_list(self, list_data):
+        for goal in ordering.sorted_items(list_data['goals']):
+            yield from self.render_item(goal, goal['title'], list_data['name'])
+            goal_uid = f"{goal.get('id') or id(goal)}@goaltracker"
+            for step in ordering.sorted_items(goal.get('steps', [])):
+                yield from self.render_item(step, step['text'], list_data['name'], goal_uid)
+
+
+class ExportResult:
+    """Files an export wrote and the ones it skipped as unchanged"""
+
+    def __init__(self):
+        self.written = []
+        self.skipped = []
+
+    def summary(self):
+        """Describe the result in a sentence"""
+        written = len(self.written)
+        text = f"Exported {written} file{'s' if written != 1 else ''}"
+        if self.skipped:
+            text += f", {len(self.skipped)} unchanged"
+        return text
+
+
+class Exporter:
+    """Export lists of a ListManager to files"""
+
+    def __init__(self, list_manager):
+        self.list_manager = list_manager
+        self.cache_dir = paths.cache_dir()
+        self.manifest_file = os.path.join(self.cache_dir, 'exports.json')
+
+    def load_manifest(self):
+        """Get the list hashes of earlier exports, by output file"""
+        try:
+            with open(self.manifest_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_manifest(self, manifest):
+        """Remember the list hashes of exports"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.manifest_file, 'w') as f:
+                json.dump(manifest, f, indent=2)
+        except Exception as e:
+            print(f"Error saving export manifest: {e}")
+
+    @staticmethod
+    def write(path, pieces):
+        """Write text pieces to a file, replacing it only once complete"""
+        temp_file = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temp_file, 'w', encoding='utf-8', newline='') as f:
+                for piece in pieces:
+                    f.write(piece)
+            os.replace(temp_file, path)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+
+    def export_to_file(self, path, list_ids=None, export_format=None, force=False):
+        """Export lists into a single file
+
+        Exports all lists if list_ids is None. The format is taken from the
+        file extension unless given. Returns True if the file was written,
+        False if it was up to date.
+        """
+        export_format = export_format or format_for_path(path)
+        if export_format is None:
+            raise ValueError(f"Unsupported file type: {os.path.basename(path)}")
+
+        lists = self.list_manager.lists
+        list_ids = [list_id for list_id in (list_ids or lists) if list_id in lists]
+        hashes = {'format': export_format.key()}
+        hashes.update((list_id, list_hash(lists[list_id])) for list_id in list_ids)
+
+        key = os.path.abspath(path)
+        manifest = self.load_manifest()
+        if not force and manifest.get(key) == hashes and os.path.exists(path):
+            return False
+
+        self.write(path, export_format.render([lists[list_id] for list_id in list_ids]))
+        manifest[key] = hashes
+        self.save_manifest(manifest)
+        return True
+
+    @staticmethod
+    def file_name(list_data, extension, taken=()):
+        """Get a file name for a list that is safe on every file system
+
+        taken holds the case-folded names other lists were given; the list
+        ID is added to the name if it is one of them.
+        """
+        name = re.sub(r'[\\/:*?"<>|\x00-\x1f]+', '_', list_data['name']).strip(' .') or list_data['id']
+        if f"{name}{extension}".casefold() in taken:
+            name = f"{name} ({list_data['id']})"
+        return f"{name}{extension}"
+
+    def export_to_directory(self, directory, export_format, list_ids=None, force=False):
+        """Export each list to its own file in a directory
+
+        Lists that have not changed since they were last exported there are
+        skipped. Returns an ExportResult.
+        """
+        result = ExportResult()
+        manifest = self.load_manifest()
+        lists = self.list_manager.lists
+        os.makedirs(directory, exist_ok=True)
+        # Names given so far, so lists whose names only differ in case or
+        # characters replaced by file_name() do not overwrite each other
+        taken = set()
+
+        for list_id in list_ids or list(lists):
+            if list_id not in lists:
+                continue
+            list_data = lists[list_id]
+            name = self.file_name(list_data, export_format.extension, taken)
+            taken.add(name.casefold())
+            path = os.path.join(directory, name)
+            key = os.path.abspath(path)
+            hashes = {'format': export_format.key(), list_id: list_hash(list_data)}
+            if not force and manifest.get(key) == hashes and os.path.exists(path):
+                result.skipped.append(path)
+                continue
+
+            self.write(path, export_format.render([list_data]))
+            manifest[key] = hashes
+            result.written.append(path)
+
+        if result.written:
+            self.save_manifest(manifest)
+        return result
@@ -0,0 +1,134 @@
+"""Undo and redo history of list changes
+
+Every change the list manager makes is recorded as the operations that
+revert it. Operations hold references to the goals, steps and lists they
+touch rather than copies, so undoing the deletion of a goal simply puts the
+very same dict back. Each operation is a tuple:
+
+    ('set', list_id, goal, item, key, value)
+    ('insert', list_id, goal, container, item)
+    ('remove', list_id, goal, container, item)
+    ('insert_many', list_id, goal, container, items)
+    ('remove_many', list_id, goal, container, items)
+    ('insert_list', list_id, list_data, index)
+    ('remove_list', list_id)
+
+``item`` is the goal, step or list whose field is set or which is added to
+or removed from ``container``; the '_many' forms add or remove several at
+once. ``goal`` is the goal shown on screen that is
+affected, or None for changes to a list itself.
+"""
+
+from collections import deque
+
+# Value of a field that did not exist
+MISSING = object()
+
+# Rough memory cost of an operation and of a retained goal or step
+OPERATION_SIZE = 120
+ITEM_SIZE = 200
+
+DEFAULT_MEMORY_LIMIT = 16 * 1024 * 1024
+
+
+def estimate_item_size(item):
+    """Estimate the memory a goal and its steps keep alive"""
+    size = ITEM_SIZE + len(item.get('title') or item.get('text') or '')
+    for step in item.get('steps', ()):
+        size += ITEM_SIZE + len(step.get('text') or '')
+    return size
+
+
+def estimate_size(operations):
+    """Estimate the memory a history entry keeps alive
+
+    Only inserts hold on to data that is no longer part of the lists.
+    """
+    size = 0
+    for operation in operations:
+        size += OPERATION_SIZE
+        if operation[0] == 'insert':
+            size += estimate_item_size(operation[4])
+        elif operation[0] == 'insert_many':
+            size += sum(estimate_item_size(item) for item in operation[4])
+        elif operation[0] == 'insert_list':
+            size += sum(estimate_item_size(goal) for goal in operation[2].get('goals', ()))
+    return size
+
+
+class History:
+    """Bounded undo and redo stacks of operation lists"""
+
+    def __init__(self, memory_limit=DEFAULT_MEMORY_LIMIT):
+        self.memory_limit = memory_limit
+        self.undo_entries = deque()
+        self.redo_entries = deque()
+        self.memory_used = 0
+
+    def push(self, operations):
+        """Record the operations reverting a new change"""
+        self.drop_entries(self.redo_entries, len(self.redo_entries))
+        self.push_undo(operations)
+
+    def push_undo(self, operations):
+        """Add an entry to the undo stack"""
+        size = estimate_size(operations)
+        self.undo_entries.append((operations, size))
+        self.memory_used += size
+        self.trim()
+
+    def push_redo(self, operations):
+        """Add an entry to the redo stack"""
+        size = estimate_size(operations)
+        self.redo_entries.append((operations, size))
+        self.memory_used += size
+        self.trim()
+
+    def pop_undo(self):
+        """Take the most recent undo entry, or None if there is none"""
+        return self.pop_entry(self.undo_entries)
+
+    def pop_redo(self):
+        """Take the most recent redo entry, or None if there is none"""
+        return self.pop_entry(self.redo_entries)
+
+    def pop_entry(self, entries):
+        """Take the most recent entry of a stack"""
+        if not entries:
+            return None
+        operations, size = entries.pop()
+        self.memory_used -= size
+        return operations
+
+    def drop_entries(self, entries, count):
+        """Forget the oldest entries of a stack"""
+        for _ in range(count):
+            _, size = entries.popleft()
+            self.memory_used -= size
+
+    def trim(self):
+        """Forget the oldest entries until the memory limit is respected"""
+        while self.memory_used > self.memory_limit and (self.undo_entries or self.redo_entries):
+            if self.undo_entries:
+                self.drop_entries(self.undo_entries, 1)
+            else:
+                self.drop_entries(self.redo_entries, 1)
+
+    def set_memory_limit(self, memory_limit):
+        """Change how much memory the history may keep alive"""
+        self.memory_limit = memory_limit
+        self.trim()
+
+    def clear(self):
+        """Forget everything"""
+        self.undo_entries.clear()
+        self.redo_entries.clear()
+        self.memory_used = 0
+
+    def can_undo(self):
+        """Check whether there is something to undo"""
+        return bool(self.undo_entries)
+
+    def can_redo(self):
+        """Check whether there is something to redo"""
+        return bool(self.redo_entries)
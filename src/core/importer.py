@@ -0,0 +1,581 @@
+"""Bulk import of goals from other formats
+
+An import reads the input file in chunks, parses the chunks in a pool of
+worker processes and collects the goals that pass validation. Each format
+turns a chunk into a flat list of records:
+
+    ('list', name)      following goals belong to the list called name
+    ('goal', fields)    a goal with 'title', 'completed', 'deadline' and
+                        optionally 'list'
+    ('step', fields)    a step with 'text', 'completed' and 'deadline',
+                        belonging to the last goal
+    ('invalid', reason) an entry that could not be read
+
+Records do not depend on each other within a chunk, so chunks can be parsed
+in any process and the stateful part (which list, which goal) happens while
+collecting them in order. The collected goals are then added through a
+single ListManager batch, which is saved once and undone at once.
+"""
+
+import io
+import os
+import re
+import csv
+import json
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Number of lines, rows or objects parsed together
+CHUNK_SIZE = 2000
+
+# Files smaller than this are parsed in the importing thread, since
+# starting worker processes takes longer than parsing them
+POOL_THRESHOLD = 4 * 1024 * 1024
+
+# Number of messages about skipped entries kept for the summary
+MAX_ERRORS = 20
+
+DATE_PATTERN = re.compile(r'(\d{4})-?(\d{2})-?(\d{2})')
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'x', 'done', 'completed', 'complete', 'checked'}
+
+FORMATS = {}
+
+
+class ImportCancelled(Exception):
+    """Raised when an import is cancelled before it finishes"""
+
+
+def register_format(format_class):
+    """Make an import format available, keyed by its name"""
+    FORMATS[format_class.name] = format_class
+    return format_class
+
+
+def format_for_path(path):
+    """Get the import format for a file based on its extension"""
+    extension = os.path.splitext(path)[1].lower()
+    for format_class in FORMATS.values():
+        if extension in format_class.extensions:
+            return format_class()
+    return None
+
+
+def parse_deadline(value):
+    """Normalize a date to YYYY-MM-DD, or return None if it is not a date
+
+    Accepts ISO dates and date-times as well as the compact YYYYMMDD form
+    used by iCalendar.
+    """
+    if not value:
+        return None
+    match = DATE_PATTERN.match(str(value).strip())
+    if match is None:
+        return None
+    year, month, day = (int(part) for part in match.groups())
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        return None
+    return f'{year:04d}-{month:02d}-{day:02d}'
+
+
+def parse_completed(value):
+    """Interpret the many ways trackers mark an item as done"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    return str(value or '').strip().lower() in TRUE_VALUES
+
+
+def chunked(entries, chunk_size):
+    """Group an iterable into lists of at most chunk_size entries"""
+    chunk = []
+    for entry in entries:
+        chunk.append(entry)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ImportFormat:
+    """Base class of import formats
+
+    Subclasses set name and extensions and implement parse_chunk(), which
+    must be a static method so worker processes can run it.
+    """
+
+    name = ''
+    label = ''
+    extensions = ()
+
+    def read_chunks(self, f, chunk_size):
+        """Split the file into chunks of lines"""
+        return chunked(f, chunk_size)
+
+    @staticmethod
+    def parse_chunk(chunk):
+        """Turn a chunk into records"""
+        raise NotImplementedError
+
+
+@register_format
+class TodoTxtFormat(ImportFormat):
+    """todo.txt files, one task per line
+
+    The first +project of a task is used as its list and due:YYYY-MM-DD as
+    its deadline.
+    """
+
+    name = 'todotxt'
+    label = "todo.txt"
+    extensions = ('.txt',)
+
+    LINE_PATTERN = re.compile(
+        r'^(?P<done>x\s+)?'
+        r'(?:\([A-Z]\)\s+)?'
+        r'(?:\d{4}-\d{2}-\d{2}\s+){0,2}'
+        r'(?P<text>.*)$'
+    )
+
+    @staticmethod
+    def parse_chunk(chunk):
+        records = []
+        for line in chunk:
+            line = line.strip()
+            if not line:
+                continue
+            match = TodoTxtFormat.LINE_PATTERN.match(line)
+            words = []
+            list_name = None
+            deadline = None
+            for word in match.group('text').split():
+                if word.startswith('due:'):
+                    deadline = parse_deadline(word[4:])
+                elif word.startswith('+') and len(word) > 1:
+                    if list_name is None:
+                        list_name = word[1:]
+                else:
+                    words.append(word)
+            title = ' '.join(words)
+            if not title:
+                records.append(('invalid', f"Task without text: {line}"))
+                continue
+            records.append(('goal', {
+                'title': title,
+                'completed': match.group('done') is not None,
+                'deadline': deadline,
+                'list': list_name
+            }))
+        return records
+
+
+@register_format
+class MarkdownFormat(ImportFormat):
+    """Markdown checklists
+
+    Headings start a new list, unindented checklist items become goals and
+    indented ones steps of the goal above. Deadlines are read from
+    due:YYYY-MM-DD, (due YYYY-MM-DD) or the 📅 YYYY-MM-DD notation.
+    """
+
+    name = 'markdown'
+    label = "Markdown checklist"
+    extensions = ('.md', '.markdown')
+
+    HEADING_PATTERN = re.compile(r'^#{1,6}\s+(.*?)\s*#*\s*$')
+    ITEM_PATTERN = re.compile(r'^(?P<indent>\s*)[-*+]\s+\[(?P<mark>[ xX])\]\s+(?P<text>.*)$')
+    DEADLINE_PATTERN = re.compile(r'\s*(?:due:|📅\s*|\(due\s+)(\d{4}-\d{2}-\d{2})\)?')
+
+    @staticmethod
+    def parse_chunk(chunk):
+        records = []
+        for line in chunk:
+            line = line.rstrip('\r\n')
+            heading = MarkdownFormat.HEADING_PATTERN.match(line)
+            if heading:
+                records.append(('list', heading.group(1)))
+                continue
+
+            item = MarkdownFormat.ITEM_PATTERN.match(line)
+            if item is None:
+                continue
+            text = item.group('text')
+            deadline = None
+            due = MarkdownFormat.DEADLINE_PATTERN.search(text)
+            if due:
+                deadline = parse_deadline(due.group(1))
+                text = text[:due.start()] + text[due.end():]
+            text = text.strip()
+            if not text:
+                records.append(('invalid', f"Checklist item without text: {line.strip()}"))
+                continue
+
+            completed = item.group('mark') != ' '
+            if item.group('indent'):
+                records.append(('step', {'text': text, 'completed': completed, 'deadline': deadline}))
+            else:
+                records.append(('goal', {'title': text, 'completed': completed, 'deadline': deadline}))
+        return records
+
+
+@register_format
+class CsvFormat(ImportFormat):
+    """CSV files with a header row
+
+    Columns are recognized by common names: title, completed, deadline,
+    list and type. Rows whose type is 'step' become steps of the goal
+    above. Without a recognizable title column the first column is used.
+    """
+
+    name = 'csv'
+    label = "CSV"
+    extensions = ('.csv',)
+
+    COLUMNS = {
+        'title': ('title', 'goal', 'task', 'name', 'summary', 'content', 'text'),
+        'completed': ('completed', 'done', 'status', 'checked', 'complete'),
+        'deadline': ('deadline', 'due', 'due date', 'due_date', 'duedate'),
+        'list': ('list', 'project', 'category'),
+        'type': ('type', 'kind')
+    }
+
+    def read_chunks(self, f, chunk_size):
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = [name.strip().lower() for name in header]
+        positions = {}
+        for field, names in self.COLUMNS.items():
+            for index, column in enumerate(columns):
+                if column in names:
+                    positions[field] = index
+                    break
+        positions.setdefault('title', 0)
+        for rows in chunked(reader, chunk_size):
+            yield positions, rows
+
+    @staticmethod
+    def parse_chunk(chunk):
+        positions, rows = chunk
+
+        def cell(row, field):
+            index = positions.get(field)
+            if index is None or index >= len(row):
+                return ''
+            return row[index].strip()
+
+        records = []
+        for row in rows:
+            if not any(value.strip() for value in row):
+                continue
+            title = cell(row, 'title')
+            if not title:
+                records.append(('invalid', f"Row without a title: {','.join(row)}"))
+                continue
+            completed = parse_completed(cell(row, 'completed'))
+            deadline = parse_deadline(cell(row, 'deadline'))
+            if cell(row, 'type').lower() in ('step', 'subtask'):
+                records.append(('step', {'text': title, 'completed': completed, 'deadline': deadline}))
+            else:
+                records.append(('goal', {
+                    'title': title,
+                    'completed': completed,
+                    'deadline': deadline,
+                    'list': cell(row, 'list') or None
+                }))
+        return records
+
+
+@register_format
+class JsonFormat(ImportFormat):
+    """JSON exports of Goal Tracker and other trackers
+
+    Reads the lists file format as well as arrays of task objects, using
+    the usual names for titles, completion, deadlines, projects and
+    subtasks. The document has to be parsed as a whole since the standard
+    library cannot parse JSON incrementally; use JSON Lines to stream.
+    """
+
+    name = 'json'
+    label = "JSON"
+    extensions = ('.json',)
+
+    TITLE_KEYS = ('title', 'name', 'content', 'text', 'summary')
+    COMPLETED_KEYS = ('completed', 'done', 'checked', 'is_completed', 'closed', 'status', 'state')
+    DEADLINE_KEYS = ('deadline', 'due', 'due_date', 'dueDate', 'due_on')
+    LIST_KEYS = ('list', 'project', 'list_name', 'listName')
+    STEPS_KEYS = ('steps', 'subtasks', 'checklist', 'checkItems', 'items', 'children')
+
+    def read_chunks(self, f, chunk_size):
+        yield from chunked(self.iter_objects(json.load(f)), chunk_size)
+
+    def iter_objects(self, document):
+        """Get the task objects of a whole document, with their list names"""
+        if isinstance(document, dict):
+            values = list(document.values())
+            if values and all(isinstance(value, dict) and 'goals' in value for value in values):
+                # The lists file of this application
+                for list_data in values:
+                    for goal in list_data['goals']:
+                        yield {**goal, 'list': list_data.get('name')}
+                return
+            for key in ('tasks', 'items', 'todos', 'goals', 'cards'):
+                if isinstance(document.get(key), list):
+                    document = document[key]
+                    break
+            else:
+                document = [document]
+        if isinstance(document, list):
+            yield from document
+
+    @staticmethod
+    def first_value(data, keys):
+        for key in keys:
+            if key in data and data[key] not in (None, ''):
+                return data[key]
+        return None
+
+    @staticmethod
+    def object_fields(data):
+        """Get title, completion and deadline of a task object"""
+        title = JsonFormat.first_value(data, JsonFormat.TITLE_KEYS)
+        completed = JsonFormat.first_value(data, JsonFormat.COMPLETED_KEYS)
+        if isinstance(completed, str) and completed.lower() in ('closed', 'resolved'):
+            completed = True
+        deadline = JsonFormat.first_value(data, JsonFormat.DEADLINE_KEYS)
+        if isinstance(deadline, dict):
+            deadline = deadline.get('date')
+        return (
+            str(title).strip() if title is not None else '',
+            parse_completed(completed),
+            parse_deadline(deadline)
+        )
+
+    @staticmethod
+    def parse_chunk(chunk):
+        records = []
+        for data in chunk:
+            if isinstance(data, str):
+                try:
+                    data = json.loads(data)
+                except json.JSONDecodeError as e:
+                    records.append(('invalid', f"Invalid JSON line: {e}"))
+                    continue
+            if not isinstance(data, dict):
+                records.append(('invalid', f"Not a task object: {data!r:.80}"))
+                continue
+            title, completed, deadline = JsonFormat.object_fields(data)
+            if not title:
+                records.append(('invalid', f"Task without a title: {json.dumps(data):.80}"))
+                continue
+            list_name = JsonFormat.first_value(data, JsonFormat.LIST_KEYS)
+            if isinstance(list_name, dict):
+                list_name = list_name.get('name')
+            records.append(('goal', {
+                'title': title,
+                'completed': completed,
+                'deadline': deadline,
+                'list': str(list_name) if list_name else None
+            }))
+
+            steps = JsonFormat.first_value(data, JsonFormat.STEPS_KEYS) or []
+            for step in steps if isinstance(steps, list) else []:
+                if isinstance(step, str):
+                    step = {'text': step}
+                if not isinstance(step, dict):
+                    continue
+                text, step_completed, step_deadline = JsonFormat.object_fields(step)
+                if text:
+                    records.append(('step', {
+                        'text': text, 'completed': step_completed, 'deadline': step_deadline
+                    }))
+        return records
+
+
+@register_format
+class JsonLinesFormat(JsonFormat):
+    """JSON Lines exports, one task object per line, read as a stream"""
+
+    name = 'jsonl'
+    label = "JSON Lines"
+    extensions = ('.jsonl', '.ndjson')
+
+    def read_chunks(self, f, chunk_size):
+        return chunked((line for line in f if line.strip()), chunk_size)
+
+
+class CountingReader(io.RawIOBase):
+    """Binary file wrapper counting the bytes read, for progress reports"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self.raw.readinto(buffer)
+        self.bytes_read += count or 0
+        return count
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+class ImportResult:
+    """Goals read from a file, by list name, and what happened to the rest"""
+
+    def __init__(self):
+        # None stands for the list chosen for the import
+        self.lists = {}
+        self.goals = 0
+        self.steps = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.errors = []
+        self.list_ids = []
+
+    def skip(self, reason):
+        """Count an entry that could not be imported"""
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(reason)
+
+    def summary(self):
+        """Describe the result in a sentence"""
+        text = f"Imported {self.goals} goal{'s' if self.goals != 1 else ''}"
+        if self.steps:
+            text += f" with {self.steps} step{'s' if self.steps != 1 else ''}"
+        if self.duplicates:
+            text += f", {self.duplicates} duplicate{'s' if self.duplicates != 1 else ''} skipped"
+        if self.skipped:
+            text += f", {self.skipped} invalid entr{'ies' if self.skipped != 1 else 'y'} skipped"
+        return text
+
+
+class BulkImporter:
+    """Import goals from files into the lists of a ListManager
+
+    read() does the slow part and may run in a background thread; commit()
+    changes the lists and has to run where the ListManager is used.
+    """
+
+    DEFAULT_LIST_NAME = "Imported"
+
+    def __init__(self, list_manager, workers=None):
+        self.list_manager = list_manager
+        self.workers = workers or os.cpu_count() or 1
+
+    def parse_chunks(self, import_format, chunks, use_pool):
+        """Parse chunks in worker processes, yielding records in file order
+
+        Only a few chunks are in flight at a time so that memory use does
+        not grow with the size of the file.
+        """
+        if not use_pool or self.workers < 2:
+            for chunk in chunks:
+                yield import_format.parse_chunk(chunk)
+            return
+
+        # Forking a process that runs GTK is not safe
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(import_format.parse_chunk, chunk))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def read(self, path, import_format=None, progress=None, cancelled=None):
+        """Read goals from a file
+
+        progress is called with the fraction of the file read so far, and
+        cancelled is polled between chunks; when it returns True the import
+        stops with ImportCancelled. Returns an ImportResult.
+        """
+        import_format = import_format or format_for_path(path)
+        if import_format is None:
+            raise ValueError(f"Unsupported file type: {os.path.basename(path)}")
+
+        result = ImportResult()
+        seen = set()
+        current_list = None
+        last_goal = None
+        size = os.path.getsize(path) or 1
+
+        with open(path, 'rb', buffering=0) as raw:
+            counter = CountingReader(raw)
+            text = io.TextIOWrapper(io.BufferedReader(counter), encoding='utf-8-sig', newline='')
+            chunks = import_format.read_chunks(text, CHUNK_SIZE)
+            for records in self.parse_chunks(import_format, chunks, size >= POOL_THRESHOLD):
+                if cancelled is not None and cancelled():
+                    raise ImportCancelled()
+
+                for kind, fields in records:
+                    if kind == 'list':
+                        current_list = fields
+                        last_goal = None
+                    elif kind == 'goal':
+                        list_name = fields.pop('list', None) or current_list
+                        key = (list_name.casefold() if list_name else None, fields['title'].casefold())
+                        if key in seen:
+                            # Steps of a duplicate are skipped along with it
+                            result.duplicates += 1
+                            last_goal = False
+                            continue
+                        seen.add(key)
+                        last_goal = {**fields, 'steps': []}
+                        result.lists.setdefault(list_name, []).append(last_goal)
+                    elif kind == 'step':
+                        if last_goal is None:
+                            result.skip(f"Step without a goal: {fields['text']}")
+                        elif last_goal is not False:
+                            last_goal['steps'].append(fields)
+                    else:
+                        result.skip(fields)
+
+                if progress is not None:
+                    progress(min(counter.bytes_read / size, 1.0))
+        return result
+
+    def commit(self, result, list_id=None):
+        """Add the goals that were read to the lists
+
+        Goals without a list go to list_id. Goals already present in their
+        list are skipped. Everything is saved once and undone at once.
+        """
+        list_manager = self.list_manager
+        lists_by_name = {
+            list_data['name'].casefold(): list_id
+            for list_id, list_data in list_manager.lists.items()
+        }
+
+        with list_manager.batch():
+            for list_name, goals in result.lists.items():
+                if list_name is None:
+                    target_id = list_id if list_id in list_manager.lists else None
+                    list_name = self.DEFAULT_LIST_NAME
+                else:
+                    target_id = lists_by_name.get(list_name.casefold())
+                if target_id is None:
+                    target_id = list_manager.add_list(list_name)
+                    lists_by_name[list_name.casefold()] = target_id
+
+                existing = {goal['title'].casefold() for goal in list_manager.lists[target_id]['goals']}
+                new_goals = [goal for goal in goals if goal['title'].casefold() not in existing]
+                result.duplicates += len(goals) - len(new_goals)
+                result.goals += len(new_goals)
+                result.steps += sum(len(goal['steps']) for goal in new_goals)
+                list_manager.add_goals_to_list(target_id, new_goals)
+                if target_id not in result.list_ids:
+                    result.list_ids.append(target_id)
+
+        result.lists = {}
+        return result
@@ -0,0 +1,90 @@
+"""Helpers for goal and step records
+
+Goals and steps are ``model.Goal`` and ``model.Step``, which read and
+write like the dicts of the lists file. Each one has an ``id`` that stays
+the same across saves, so that copies of the data read back from disk can
+be matched with the ones in memory.
+"""
+
+import os
+from copy import deepcopy
+
+ID_KEY = 'id'
+
+
+def new_id():
+    """Generate an ID for a new goal or step"""
+    # 48 random bits, like the first 12 hex digits of a random UUID
+    return os.urandom(6).hex()
+
+
+def ensure_ids(items):
+    """Give items loaded from older files an ID
+
+    Returns whether any item was missing one.
+    """
+    missing = [item for item in items if not item.get(ID_KEY)]
+    for item in missing:
+        item[ID_KEY] = new_id()
+    return bool(missing)
+
+
+def copy_goal(goal):
+    """Copy a goal with its steps, giving the copies new IDs"""
+    goal_copy = deepcopy(goal)
+    goal_copy[ID_KEY] = new_id()
+    for step in goal_copy.get('steps', []):
+        step[ID_KEY] = new_id()
+    return goal_copy
+
+
+def update_in_place(item, new_data):
+    """Make item equal to new_data without replacing the dict itself"""
+    for key in [key for key in item if key not in new_data]:
+        del item[key]
+    item.update(new_data)
+
+
+def merge_goal(goal, new_goal):
+    """Update a goal in place, keeping the dicts of steps that still exist"""
+    steps_by_id = {step.get(ID_KEY): step for step in goal.get('steps', [])}
+    merged_steps = []
+    for new_step in new_goal.get('steps', []):
+        step = steps_by_id.get(new_step.get(ID_KEY))
+        if step is None:
+            merged_steps.append(new_step)
+        else:
+            if step != new_step:
+                update_in_place(step, new_step)
+            merged_steps.append(step)
+
+    steps = goal.get('steps', [])
+    update_in_place(goal, {key: value for key, value in new_goal.items() if key != 'steps'})
+    steps[:] = merged_steps
+    goal['steps'] = steps
+
+
+def merge_list(list_data, new_list_data):
+    """Update a list in place from another copy of it, matching goals by ID
+
+    Goals that exist in both keep their dict, so widgets showing them stay
+    valid. Returns the goals whose contents changed.
+    """
+    goals_by_id = {goal.get(ID_KEY): goal for goal in list_data.get('goals', [])}
+    merged_goals = []
+    changed_goals = []
+    for new_goal in new_list_data.get('goals', []):
+        goal = goals_by_id.get(new_goal.get(ID_KEY))
+        if goal is None:
+            merged_goals.append(new_goal)
+        else:
+            if goal != new_goal:
+                merge_goal(goal, new_goal)
+                changed_goals.append(goal)
+            merged_goals.append(goal)
+
+    goals = list_data.get('goals', [])
+    update_in_place(list_data, {key: value for key, value in new_list_data.items() if key != 'goals'})
+    goals[:] = merged_goals
+    list_data['goals'] = goals
+    return changed_goals
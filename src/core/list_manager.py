@@ -0,0 +1,1045 @@
+import os
+import json
+import random
+import hashlib
+from datetime import date, timedelta
+from contextlib import contextmanager
+
+from . import archive, columns, completions, items, metrics, model, ordering, paths, progress, tracing
+from .history import History, MISSING
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+VERSION_KEY = 'version'
+
+SAVES_REQUESTED = metrics.counter(
+    'goaltracker_saves_requested_total', "Saves asked for, including those deferred by a batch"
+)
+SAVES_WRITTEN = metrics.counter('goaltracker_saves_written_total', "Writes of the lists file")
+BYTES_WRITTEN = metrics.counter('goaltracker_lists_bytes_written_total', "Bytes written to the lists file")
+SAVE_SECONDS = metrics.histogram('goaltracker_save_seconds', "Time to merge and write the lists file")
+LOAD_SECONDS = metrics.histogram('goaltracker_load_seconds', "Time to read and parse the lists file")
+
+class StorageConflict(Exception):
+    """Raised when lists were changed both in memory and by another writer
+
+    ``theirs`` maps the ID of every conflicting list to the version found
+    on disk, or None if it was deleted there. Merge them into the lists in
+    memory, call ``ListManager.resolve_conflict`` for each and save again.
+    """
+    
+    def __init__(self, theirs):
+        super().__init__(f"Lists changed by another writer: {', '.join(theirs)}")
+        self.theirs = theirs
+
+class ListManager:
+    """Service for managing goal lists"""
+    
+    def __init__(self, data_dir=None):
+        # Another directory than the user's is used by tools and benchmarks
+        self.data_dir = data_dir or paths.data_dir()
+        self.lists_file = os.path.join(self.data_dir, 'lists.json')
+        self.lock_file = self.lists_file + '.lock'
+        self.lists = {}
+        
+        # Saves requested inside a batch are deferred until it ends, and
+        # the changes made in it are undone together
+        self._batch_depth = 0
+        self._save_pending = False
+        self._batch_operations = []
+        
+        # Operations reverting recent changes
+        self.history = History()
+        
+        # What the lists file looked like when we last read or wrote it, to
+        # notice changes made by other programs: its signature and the
+        # version and digest of every list in it. Only its contents are
+        # kept when it is read or written, and base() computes the digests
+        # when a merge needs them.
+        self._file_signature = None
+        self._base = {}
+        self._base_text = None
+        
+        # IDs of the lists changed in memory since, which get their
+        # version bumped when written
+        self._dirty = set()
+        
+        # Callbacks notified of changes, called as callback(event, details)
+        self.listeners = []
+        
+        # Done and total goals of every list and steps of every goal
+        self.progress = progress.Progress()
+        
+        # When goals and steps were completed, for the statistics
+        self.completions = completions.CompletionLog(self.data_dir)
+        
+        # Old completed goals, moved out of the lists file
+        self.archive = archive.Archive(self.data_dir)
+        
+        # Columns of every goal and step for deadline queries, built by
+        # column_store() on first use when NumPy is available, and the
+        # overdue goals and steps of every list counted from them
+        self.columns = None
+        self.overdue = {}
+        
+    @staticmethod
+    def serialize_list(list_data):
+        """Serialize a list the way it is stored in the lists file"""
+        return json.dumps(model.list_to_json(list_data), indent=2)
+    
+    @staticmethod
+    def list_digest(list_data):
+        """Get a short hash of the contents of a list
+
+        Compact JSON is hashed, which the C encoder of the json module
+        writes several times faster than the indented JSON of the file.
+        """
+        serialized = json.dumps(list_data, default=model.to_json, separators=(',', ':'))
+        return hashlib.blake2b(serialized.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def read_file_signature(self):
+        """Get a signature of the lists file that changes whenever it is written"""
+        try:
+            stat = os.stat(self.lists_file)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    
+    def add_listener(self, callback):
+        """Get notified of changes to the lists"""
+        self.listeners.append(callback)
+    
+    def notify(self, event, details):
+        """Call every listener with an event"""
+        for callback in self.listeners:
+            callback(event, details)
+        
+    def rebuild_aggregates(self):
+        """Count the lists again after they changed other than by record()"""
+        self.progress.rebuild(self.lists)
+        if self.columns is not None:
+            self.columns.rebuild(self.lists)
+            self.count_overdue()
+    
+    def track(self, operations):
+        """Update the counters and columns after a change
+
+        operations revert the change, as recorded for undo. Listeners get
+        a 'progress' event with the counts that changed, which includes
+        lists whose overdue count changed.
+        """
+        self._dirty.update(operation[1] for operation in operations)
+        self.progress.apply(operations, self.lists)
+        if self.columns is not None:
+            self.columns.apply(operations, self.lists)
+            self.count_overdue()
+        changes = self.progress.take_changes()
+        if changes:
+            self.notify('progress', changes)
+    
+    def log_completions(self, operations):
+        """Log the goals and steps whose completion a change flipped
+
+        operations revert the change, as recorded for undo, so they hold
+        the completion of every item from before it.
+        """
+        for operation in operations:
+            if operation[0] != 'set' or operation[4] != 'completed' or operation[2] is None:
+                continue
+            _, _, goal, item, _, old_value = operation
+            completed = bool(item.get('completed'))
+            if completed != (old_value is not MISSING and bool(old_value)):
+                self.completions.append(
+                    item, completed, completions.KIND_GOAL if item is goal else completions.KIND_STEP
+                )
+    
+    def column_store(self):
+        """Get the columns of every goal and step, or None without NumPy
+
+        Built on first use and kept up to date from then on.
+        """
+        if self.columns is None and columns.load_numpy():
+            self.columns = columns.ColumnStore()
+            self.columns.rebuild(self.lists)
+            self.count_overdue()
+        return self.columns
+    
+    def count_overdue(self):
+        """Count the overdue items of every list again from the columns
+
+        Lists whose count changed are reported with the next 'progress'
+        event, so their badges are updated.
+        """
+        overdue = self.columns.overdue_counts(date.today())
+        for list_id in set(overdue) | set(self.overdue):
+            if overdue.get(list_id) != self.overdue.get(list_id) and list_id in self.lists:
+                self.progress.changed_lists.add(list_id)
+        self.overdue = overdue
+    
+    @staticmethod
+    def is_overdue(item, today):
+        """Check whether an item is not completed and its deadline was before today"""
+        return bool(item.deadline_ordinal) and item.deadline_ordinal < today.toordinal() and not item.get('completed')
+    
+    def overdue_goals(self, today=None):
+        """Get the goals not completed whose deadline has passed, by list ID
+
+        Lists without any are missing.
+        """
+        today = today or date.today()
+        store = self.column_store()
+        if store is not None:
+            return store.overdue_goals(today)
+        goals = {}
+        for list_id, list_data in self.lists.items():
+            for goal in list_data['goals']:
+                if self.is_overdue(goal, today):
+                    goals.setdefault(list_id, []).append(goal)
+        return goals
+    
+    def count_due(self, today=None, days=7):
+        """Count the goals and steps not completed that are overdue, and due in the next days"""
+        today = today or date.today()
+        store = self.column_store()
+        if store is not None:
+            return store.count_due(today, days)
+        counts = {'overdue': 0, 'due_soon': 0}
+        first, last = today.toordinal(), today.toordinal() + days - 1
+        for list_data in self.lists.values():
+            for goal in list_data['goals']:
+                for item in [goal] + goal.get('steps', []):
+                    if self.is_overdue(item, today):
+                        counts['overdue'] += 1
+                    elif not item.get('completed') and item.deadline_ordinal and first <= item.deadline_ordinal <= last:
+                        counts['due_soon'] += 1
+        return counts
+    
+    def goal_counts(self):
+        """Get the completed and total goals of every list, by list ID"""
+        return {list_id: self.progress.list_progress(list_id) for list_id in self.lists}
+        
+    def generate_id(self):
+        """Generate a unique ID for a new list"""
+        while True:
+            new_id = str(random.randint(10000, 99999))
+            if new_id not in self.lists:
+                return new_id
+        
+    @tracing.traced(category='storage')
+    def load_lists(self, write=True):
+        """Load lists from file
+
+        Unless write is unset, new item keys are stored right away and a
+        missing or corrupted file is replaced by an empty one. Without
+        write the file is only read, and a corrupted file raises
+        json.JSONDecodeError.
+        """
+        try:
+            with LOAD_SECONDS.time():
+                self._file_signature = self.read_file_signature()
+                with open(self.lists_file, 'r') as f:
+                    contents = f.read()
+                self.lists = model.lists_from_json(json.loads(contents))
+                migrated = self.ensure_item_keys()
+                self.history.clear()
+                self.rebuild_aggregates()
+                self._dirty = set()
+                self._base = None
+                self._base_text = contents
+            if migrated and write:
+                # Store the new IDs right away so they stay the same for
+                # other programs reading the file
+                self.save_lists()
+        except FileNotFoundError:
+            self.lists = {}
+            self.rebuild_aggregates()
+            if write:
+                self.save_lists()
+        except json.JSONDecodeError:
+            if not write:
+                raise
+            print("Lists file corrupted, creating new file")
+            self.lists = {}
+            self.rebuild_aggregates()
+            self.save_lists()
+            
+    def ensure_item_keys(self, lists=None):
+        """Make sure every goal and step has an ID and an order key
+
+        Returns whether any were missing.
+        """
+        changed = False
+        for list_data in (self.lists if lists is None else lists).values():
+            goals = list_data.get('goals', [])
+            changed |= items.ensure_ids(goals)
+            changed |= ordering.ensure_order(goals)
+            for goal in goals:
+                changed |= items.ensure_ids(goal.get('steps', []))
+                changed |= ordering.ensure_order(goal.get('steps', []))
+        return changed
+
+    @contextmanager
+    def batch(self):
+        """Group several changes so they are written with a single save"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                if self._batch_operations:
+                    self.history.push(self._batch_operations)
+                    self._batch_operations = []
+                if self._save_pending:
+                    self.save_lists()
+
+    @contextmanager
+    def locked(self):
+        """Hold the advisory lock that writers of the lists file take
+
+        Only writers lock: the file is replaced atomically, so readers
+        always see a complete version of it without waiting.
+        """
+        # The data directory is only created once something is written
+        os.makedirs(self.data_dir, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @tracing.traced(category='storage')
+    def save_lists(self, strict=False):
+        """Save lists to file
+
+        Changes other programs made to the file since we last read or wrote
+        it are merged in first instead of being overwritten. Every list that
+        changed in memory gets its version bumped.
+        
+        With strict set, lists changed on both sides raise StorageConflict
+        instead of being kept side by side, and nothing is written.
+        """
+        SAVES_REQUESTED.inc()
+        if self._batch_depth:
+            self._save_pending = True
+            return
+        
+        self._save_pending = False
+        try:
+            with SAVE_SECONDS.time(), self.locked():
+                if self.read_file_signature() != self._file_signature:
+                    self.merge_external_changes(strict=strict)
+                self.write_lists()
+        except StorageConflict:
+            raise
+        except Exception as e:
+            print(f"Error saving lists: {e}")
+
+    def write_lists(self):
+        """Write all lists to the file, bumping the versions of changed ones
+
+        Every list is serialized once, after its version was bumped.
+        """
+        chunks = {}
+        for list_id, list_data in self.lists.items():
+            if list_id in self._dirty:
+                base = self._base if self._base is not None else {}
+                base_version = base[list_id][0] if list_id in base else 0
+                list_data[VERSION_KEY] = max(base_version, list_data.get(VERSION_KEY, 0)) + 1
+            chunks[list_id] = self.serialize_list(list_data)
+        contents = self.join_chunks(chunks)
+        
+        temp_file = f'{self.lists_file}.{os.getpid()}.tmp'
+        with open(temp_file, 'w') as f:
+            f.write(contents)
+            f.flush()
+            size = os.fstat(f.fileno()).st_size
+        os.replace(temp_file, self.lists_file)
+        SAVES_WRITTEN.inc()
+        BYTES_WRITTEN.inc(size)
+        
+        self._file_signature = self.read_file_signature()
+        self._base = None
+        self._base_text = contents
+        self._dirty = set()
+    
+    def base(self):
+        """Get the version and digest of every list as last read or written"""
+        if self._base is None:
+            lists = model.lists_from_json(json.loads(self._base_text)) if self._base_text else {}
+            self.ensure_item_keys(lists)
+            self._base = {
+                list_id: (list_data.get(VERSION_KEY, 0), self.list_digest(list_data))
+                for list_id, list_data in lists.items()
+            }
+            self._base_text = None
+        return self._base
+    
+    def mark_changed(self, list_id):
+        """Note a change to a list made other than through record()"""
+        self._dirty.add(list_id)
+    
+    @staticmethod
+    def join_chunks(chunks):
+        """Assemble serialized lists into the contents of the lists file"""
+        if not chunks:
+            return '{}'
+        entries = [
+            f'  {json.dumps(list_id)}: ' + chunk.replace('\n', '\n  ')
+            for list_id, chunk in chunks.items()
+        ]
+        return '{\n' + ',\n'.join(entries) + '\n}'
+    
+    def merge_external_changes(self, strict=False):
+        """Merge changes another program made to the lists file
+
+        Lists changed only on disk are updated in place, matching goals and
+        steps by ID. A list changed both on disk and in memory keeps the
+        in-memory version, and the version from disk is added next to it as
+        a conflicted copy so that neither side is lost. With strict set,
+        StorageConflict is raised for such lists instead and nothing is
+        merged.
+        
+        Listeners get an 'external-change' event with the IDs of the added,
+        removed and conflicted-copy lists and the changed goals per list.
+        Returns those details, or None if the file could not be read.
+        """
+        signature = self.read_file_signature()
+        try:
+            with open(self.lists_file, 'r') as f:
+                disk_lists = model.lists_from_json(json.load(f))
+        except FileNotFoundError:
+            disk_lists = {}
+        except (OSError, json.JSONDecodeError):
+            return None
+        self.ensure_item_keys(disk_lists)
+        self.base()
+        
+        # Sort the lists changed on disk by whether we changed them too
+        disk_only = {}
+        both = {}
+        for list_id in set(self.lists) | set(disk_lists):
+            local_list = self.lists.get(list_id)
+            disk_list = disk_lists.get(list_id)
+            base = self._base.get(list_id)
+            
+            disk_base = None
+            if disk_list is not None:
+                disk_base = (
+                    disk_list.get(VERSION_KEY, 0),
+                    self.list_digest(disk_list)
+                )
+            if disk_base == base:
+                continue
+            
+            if list_id not in self._dirty:
+                disk_only[list_id] = (disk_list, disk_base)
+            elif (
+                disk_base is not None and local_list is not None
+                and self.list_digest(local_list) == disk_base[1]
+            ):
+                # Both sides made the same change
+                self._base[list_id] = disk_base
+                self._dirty.discard(list_id)
+            else:
+                both[list_id] = (disk_list, disk_base)
+        
+        if strict and both:
+            raise StorageConflict({list_id: disk_list for list_id, (disk_list, _) in both.items()})
+        
+        changes = {'added': [], 'removed': [], 'changed': {}, 'conflicts': []}
+        for list_id, (disk_list, disk_base) in disk_only.items():
+            if disk_list is None:
+                del self.lists[list_id]
+                self._base.pop(list_id, None)
+                changes['removed'].append(list_id)
+                continue
+            
+            if list_id in self.lists:
+                changes['changed'][list_id] = items.merge_list(self.lists[list_id], disk_list)
+            else:
+                self.lists[list_id] = disk_list
+                changes['added'].append(list_id)
+            self._base[list_id] = disk_base
+        
+        for list_id, (disk_list, disk_base) in both.items():
+            if disk_list is not None:
+                changes['conflicts'].append(self.add_conflicted_copy(disk_list))
+                # Our side gets written as a newer version than theirs
+                base_digest = self._base[list_id][1] if list_id in self._base else None
+                self._base[list_id] = (disk_base[0], base_digest)
+        
+        self._file_signature = signature
+        if any(changes.values()):
+            # Recorded operations may refer to data that is gone now
+            self.history.clear()
+            self.rebuild_aggregates()
+            self.notify('external-change', changes)
+        return changes
+    
+    def resolve_conflict(self, list_id, list_data):
+        """Accept a merged list after a StorageConflict
+
+        list_data, or None to delete the list, replaces the in-memory list
+        and is saved as a newer version than the one found on disk.
+        """
+        try:
+            with open(self.lists_file, 'r') as f:
+                disk_list = json.load(f).get(list_id)
+        except (OSError, json.JSONDecodeError):
+            disk_list = None
+        
+        self.base()
+        if disk_list is not None:
+            model.list_from_json(disk_list)
+            self.ensure_item_keys({list_id: disk_list})
+            self._base[list_id] = (
+                disk_list.get(VERSION_KEY, 0),
+                self.list_digest(disk_list)
+            )
+        else:
+            self._base.pop(list_id, None)
+        
+        if list_data is None:
+            self.lists.pop(list_id, None)
+        else:
+            self.lists[list_id] = model.list_from_json(list_data)
+        self.mark_changed(list_id)
+        self.rebuild_aggregates()
+    
+    def reload_if_changed(self):
+        """Merge the lists file if another program wrote it since we last did
+
+        Returns the merged changes, or None if there was nothing to merge.
+        """
+        if self.read_file_signature() == self._file_signature:
+            return None
+        
+        changes = self.merge_external_changes()
+        if changes and changes['conflicts']:
+            # Write the conflicted copies together with our side
+            self.save_lists()
+        return changes
+    
+    def add_conflicted_copy(self, list_data):
+        """Add a list read from disk next to the in-memory one it conflicts with"""
+        list_id = self.generate_id()
+        self.lists[list_id] = {
+            'id': list_id,
+            'name': f"{list_data['name']} (conflicted copy)",
+            'goals': [items.copy_goal(goal) for goal in list_data.get('goals', [])]
+        }
+        self.mark_changed(list_id)
+        return list_id
+            
+    def record(self, operations):
+        """Record the operations that revert a change for undo
+
+        Inside a batch they are collected so that the whole batch is undone
+        at once.
+        """
+        if not operations:
+            return
+        self.track(operations)
+        if self._batch_depth:
+            self._batch_operations.extend(operations)
+        else:
+            self.history.push(operations)
+
+    def set_field(self, list_id, goal, item, key, value):
+        """Set a field of a goal, step or list and return the operation reverting it"""
+        old_value = item.get(key, MISSING)
+        if value is MISSING:
+            item.pop(key, None)
+        else:
+            item[key] = value
+        return ('set', list_id, goal, item, key, old_value)
+
+    def order_operations(self, list_id, goal, changes):
+        """Get the operations reverting order key changes"""
+        return [
+            ('set', list_id, goal if goal is not None else item, item, ordering.ORDER_KEY, old_key)
+            for item, old_key in changes
+        ]
+
+    def remove_item(self, list_id, goal, container, item):
+        """Remove a goal or step by identity and return the operation reverting it"""
+        container[:] = [other for other in container if other is not item]
+        return ('insert', list_id, goal, container, item)
+
+    def apply_operation(self, operation, changes):
+        """Apply a recorded operation, noting what it changed
+
+        Returns the operation reverting it.
+        """
+        kind, list_id = operation[0], operation[1]
+        if kind == 'insert_list':
+            _, _, list_data, index = operation
+            entries = list(self.lists.items())
+            entries.insert(index, (list_id, list_data))
+            self.lists = dict(entries)
+            changes['added'].append(list_id)
+            return ('remove_list', list_id)
+        
+        if kind == 'remove_list':
+            index = list(self.lists).index(list_id)
+            list_data = self.lists.pop(list_id)
+            changes['removed'].append(list_id)
+            return ('insert_list', list_id, list_data, index)
+        
+        changed_goals = changes['changed'].setdefault(list_id, [])
+        if kind == 'set':
+            _, _, goal, item, key, value = operation
+            inverse = self.set_field(list_id, goal, item, key, value)
+        elif kind == 'insert':
+            _, _, goal, container, item = operation
+            container.append(item)
+            inverse = ('remove', list_id, goal, container, item)
+        elif kind == 'insert_many':
+            _, _, goal, container, added = operation
+            container.extend(added)
+            inverse = ('remove_many', list_id, goal, container, added)
+        elif kind == 'remove_many':
+            _, _, goal, container, removed = operation
+            removed_ids = {id(item) for item in removed}
+            container[:] = [item for item in container if id(item) not in removed_ids]
+            inverse = ('insert_many', list_id, goal, container, removed)
+        else:
+            _, _, goal, container, item = operation
+            inverse = self.remove_item(list_id, goal, container, item)
+        
+        if goal is not None:
+            changed_goals.append(goal)
+        return inverse
+
+    def replay(self, operations):
+        """Apply an undo or redo entry and return the entry reverting it"""
+        changes = {'added': [], 'removed': [], 'changed': {}, 'conflicts': []}
+        inverse = [self.apply_operation(operation, changes) for operation in reversed(operations)]
+        self.track(inverse)
+        self.log_completions(inverse)
+        return inverse, changes
+
+    def undo(self):
+        """Revert the most recent change
+
+        Returns what changed like an 'external-change' event, which is also
+        sent to listeners as an 'undo' event, or None if there was nothing
+        to undo.
+        """
+        operations = self.history.pop_undo()
+        if operations is None:
+            return None
+        
+        inverse, changes = self.replay(operations)
+        self.history.push_redo(inverse)
+        self.save_lists()
+        self.notify('undo', changes)
+        return changes
+
+    def redo(self):
+        """Apply the most recently undone change again
+
+        Returns what changed like undo(), or None if there was nothing to
+        redo.
+        """
+        operations = self.history.pop_redo()
+        if operations is None:
+            return None
+        
+        inverse, changes = self.replay(operations)
+        self.history.push_undo(inverse)
+        self.save_lists()
+        self.notify('redo', changes)
+        return changes
+
+    def add_list(self, name):
+        """Add a new list"""
+        list_id = self.generate_id()
+        self.lists[list_id] = {
+            'id': list_id,
+            'name': name,
+            'goals': []
+        }
+        self.record([('remove_list', list_id)])
+        self.save_lists()
+        return list_id
+        
+    def edit_list(self, list_id, new_name):
+        """Edit an existing list"""
+        if list_id in self.lists:
+            self.record([self.set_field(list_id, None, self.lists[list_id], 'name', new_name)])
+            self.save_lists()
+            
+    def delete_list(self, list_id):
+        """Delete a list"""
+        if list_id in self.lists:
+            index = list(self.lists).index(list_id)
+            list_data = self.lists.pop(list_id)
+            self.record([('insert_list', list_id, list_data, index)])
+            self.save_lists()
+    
+    def get_list(self, list_id):
+        """Get a specific list by ID"""
+        return self.lists.get(list_id)
+    
+    def get_all_lists(self):
+        """Get all lists"""
+        return self.lists
+    
+    def add_goal_to_list(self, list_id, goal_data):
+        """Add a goal to a specific list
+
+        A dict is turned into a goal first. Returns the goal added.
+        """
+        if list_id in self.lists:
+            goal_data = model.as_goal(goal_data)
+            goals = self.lists[list_id]['goals']
+            goal_data.setdefault(items.ID_KEY, items.new_id())
+            if ordering.ORDER_KEY not in goal_data:
+                goal_data[ordering.ORDER_KEY] = ordering.next_key(goals)
+            goals.append(goal_data)
+            self.record([('remove', list_id, None, goals, goal_data)])
+            self.save_lists()
+            return goal_data
+
+    def add_goals_to_list(self, list_id, goals):
+        """Add several goals with their steps to the end of a list at once
+
+        Dicts are turned into goals first. Returns the goals added.
+        """
+        goals = [model.as_goal(goal) for goal in goals]
+        if list_id in self.lists and goals:
+            list_goals = self.lists[list_id]['goals']
+            key = ordering.next_key(list_goals)
+            for goal in goals:
+                goal.setdefault(items.ID_KEY, items.new_id())
+                goal[ordering.ORDER_KEY] = key
+                key += ordering.ORDER_STEP
+                steps = goal.setdefault('steps', [])
+                items.ensure_ids(steps)
+                ordering.ensure_order(steps)
+            list_goals.extend(goals)
+            self.record([('remove_many', list_id, None, list_goals, list(goals))])
+            self.save_lists()
+        return goals
+
+    def add_step_to_goal(self, list_id, goal_data, step_data):
+        """Add a step at the end of a goal
+
+        A dict is turned into a step first. Returns the step added.
+        """
+        if list_id in self.lists:
+            step_data = model.as_step(step_data)
+            steps = goal_data.setdefault('steps', [])
+            step_data.setdefault(items.ID_KEY, items.new_id())
+            if ordering.ORDER_KEY not in step_data:
+                step_data[ordering.ORDER_KEY] = ordering.next_key(steps)
+            steps.append(step_data)
+            self.record([('remove', list_id, goal_data, steps, step_data)])
+            self.save_lists()
+            return step_data
+
+    def update_goal(self, list_id, goal_data, **fields):
+        """Change fields of a goal, e.g. its title, deadline or completion
+
+        Completing a goal notes the day, after which it gets archived.
+        """
+        if list_id in self.lists:
+            if 'completed' in fields and bool(fields['completed']) != bool(goal_data.get('completed')):
+                fields.setdefault(
+                    archive.COMPLETED_ON_KEY, date.today().isoformat() if fields['completed'] else MISSING
+                )
+            operations = [
+                self.set_field(list_id, goal_data, goal_data, key, value)
+                for key, value in fields.items()
+            ]
+            self.record(operations)
+            self.log_completions(operations)
+            self.save_lists()
+
+    def update_step(self, list_id, goal_data, step_data, **fields):
+        """Change fields of a step, e.g. its text, deadline or completion"""
+        if list_id in self.lists:
+            operations = [
+                self.set_field(list_id, goal_data, step_data, key, value)
+                for key, value in fields.items()
+            ]
+            self.record(operations)
+            self.log_completions(operations)
+            self.save_lists()
+
+    def remove_goal(self, list_id, goal_data):
+        """Remove a goal with its steps from a list"""
+        if list_id in self.lists:
+            self.record([self.remove_item(list_id, None, self.lists[list_id]['goals'], goal_data)])
+            self.save_lists()
+
+    def remove_step(self, list_id, goal_data, step_data):
+        """Remove a step from a goal"""
+        if list_id in self.lists:
+            self.record([self.remove_item(list_id, goal_data, goal_data['steps'], step_data)])
+            self.save_lists()
+            
+    def update_goal_in_list(self, list_id, goal_index, goal_data):
+        """Update a goal in a specific list
+
+        Positions refer to the order the goals are displayed in.
+        """
+        if list_id in self.lists and 0 <= goal_index < len(self.lists[list_id]['goals']):
+            goal_data = model.as_goal(goal_data)
+            goals = self.lists[list_id]['goals']
+            old_goal = ordering.sorted_items(goals)[goal_index]
+            goal_data.setdefault(ordering.ORDER_KEY, old_goal[ordering.ORDER_KEY])
+            goal_data.setdefault(items.ID_KEY, old_goal.get(items.ID_KEY) or items.new_id())
+            operations = [self.remove_item(list_id, None, goals, old_goal)]
+            goals.append(goal_data)
+            operations.append(('remove', list_id, None, goals, goal_data))
+            self.record(operations)
+            self.save_lists()
+            
+    def remove_goal_from_list(self, list_id, goal_index):
+        """Remove a goal from a specific list
+
+        Positions refer to the order the goals are displayed in.
+        """
+        if list_id in self.lists and 0 <= goal_index < len(self.lists[list_id]['goals']):
+            goal_data = ordering.sorted_items(self.lists[list_id]['goals'])[goal_index]
+            self.remove_goal(list_id, goal_data)
+    
+    def move_goal(self, list_id, old_index, new_index):
+        """Move a goal to a new position in the list
+
+        Positions refer to the order the goals are displayed in. Only the
+        order key of the moved goal changes.
+        """
+        if list_id in self.lists:
+            goals = self.lists[list_id]['goals']
+            if 0 <= old_index < len(goals) and 0 <= new_index < len(goals):
+                goal = ordering.sorted_items(goals)[old_index]
+                self.move_goal_to(list_id, goal, new_index)
+
+    def move_goal_to(self, list_id, goal_data, index, completed_last=False):
+        """Move a goal to a position in the display order of its list"""
+        if list_id in self.lists:
+            changes = ordering.move_to_index(self.lists[list_id]['goals'], goal_data, index, completed_last)
+            self.record(self.order_operations(list_id, None, changes))
+            self.save_lists()
+
+    def place_goal(self, list_id, goal_data, prev_goal, next_goal):
+        """Move a goal between two neighbouring goals of its list"""
+        if list_id in self.lists:
+            changes = ordering.place_between(self.lists[list_id]['goals'], goal_data, prev_goal, next_goal)
+            self.record(self.order_operations(list_id, None, changes))
+            self.save_lists()
+
+    def move_step_to(self, list_id, goal_data, step_data, index, completed_last=False):
+        """Move a step to a position in the display order of its goal"""
+        if list_id in self.lists:
+            changes = ordering.move_to_index(goal_data['steps'], step_data, index, completed_last)
+            self.record(self.order_operations(list_id, goal_data, changes))
+            self.save_lists()
+    
+    def set_goals_completed(self, list_id, goals, completed):
+        """Mark several goals of a list as completed or not"""
+        if list_id in self.lists:
+            with self.batch():
+                for goal in goals:
+                    self.update_goal(list_id, goal, completed=completed)
+
+    def set_goals_deadline(self, list_id, goals, deadline):
+        """Set or clear the deadline of several goals of a list"""
+        if list_id in self.lists:
+            with self.batch():
+                for goal in goals:
+                    self.update_goal(list_id, goal, deadline=deadline)
+
+    def remove_goals(self, list_id, goals):
+        """Remove several goals from a list in a single pass"""
+        if list_id in self.lists:
+            removed = {id(goal) for goal in goals}
+            list_goals = self.lists[list_id]['goals']
+            self.record([('insert_many', list_id, None, list_goals, [
+                goal for goal in list_goals if id(goal) in removed
+            ])])
+            list_goals[:] = [goal for goal in list_goals if id(goal) not in removed]
+            self.save_lists()
+
+    def move_goals_to_list(self, list_id, goals, target_list_id):
+        """Move several goals to the end of another list
+
+        The goals keep their steps, deadlines and relative order.
+        """
+        if list_id not in self.lists or target_list_id not in self.lists or list_id == target_list_id:
+            return
+        
+        target_goals = self.lists[target_list_id]['goals']
+        with self.batch():
+            self.remove_goals(list_id, goals)
+            key = ordering.next_key(target_goals)
+            operations = []
+            for goal in ordering.sorted_items(goals):
+                operations.append(self.set_field(target_list_id, goal, goal, ordering.ORDER_KEY, key))
+                key += ordering.ORDER_STEP
+                target_goals.append(goal)
+                operations.append(('remove', target_list_id, None, target_goals, goal))
+            self.record(operations)
+            self.save_lists()
+    
+    def copy_goals_to_list(self, list_id, goals, target_list_id):
+        """Copy several goals with their steps to the end of a list
+
+        The target may be the list the goals come from. Returns the copies.
+        """
+        if list_id not in self.lists or target_list_id not in self.lists:
+            return []
+        
+        target_goals = self.lists[target_list_id]['goals']
+        copies = []
+        key = ordering.next_key(target_goals)
+        for goal in ordering.sorted_items(goals):
+            goal_copy = items.copy_goal(goal)
+            goal_copy[ordering.ORDER_KEY] = key
+            key += ordering.ORDER_STEP
+            copies.append(goal_copy)
+        target_goals.extend(copies)
+        self.record([('remove', target_list_id, None, target_goals, goal_copy) for goal_copy in copies])
+        self.save_lists()
+        return copies
+
+    def transfer_step(self, list_id, goal_data, step_data, target_list_id, copy=False):
+        """Move or copy a step to another list, where it becomes a goal
+
+        Returns the new goal.
+        """
+        if list_id not in self.lists or target_list_id not in self.lists:
+            return None
+        
+        target_goals = self.lists[target_list_id]['goals']
+        new_goal = model.Goal({
+            items.ID_KEY: items.new_id(),
+            'title': step_data['text'],
+            'completed': step_data['completed'],
+            'deadline': step_data.get('deadline'),
+            'steps': [],
+            ordering.ORDER_KEY: ordering.next_key(target_goals)
+        })
+        operations = []
+        if not copy:
+            operations.append(self.remove_item(list_id, goal_data, goal_data['steps'], step_data))
+        target_goals.append(new_goal)
+        operations.append(('remove', target_list_id, None, target_goals, new_goal))
+        self.record(operations)
+        self.save_lists()
+        return new_goal
+    
+    def archive_completed(self, max_age_days, today=None):
+        """Move goals completed more than max_age_days ago to the archive
+
+        Completed goals that do not know when they were completed, e.g.
+        from older versions, are taken as completed today. Like changes
+        from other programs this is not undone, so the undo history is
+        cleared if anything was archived. Returns the number of goals
+        archived.
+        """
+        today = today or date.today()
+        cutoff = (today - timedelta(days=max_age_days)).isoformat()
+        stamped = False
+        archived = 0
+        for list_id, list_data in self.lists.items():
+            goals = list_data['goals']
+            old_goals = []
+            for goal in goals:
+                if not goal.get('completed'):
+                    continue
+                if not goal.get(archive.COMPLETED_ON_KEY):
+                    goal[archive.COMPLETED_ON_KEY] = today.isoformat()
+                    self.mark_changed(list_id)
+                    stamped = True
+                if goal[archive.COMPLETED_ON_KEY] <= cutoff:
+                    old_goals.append(goal)
+            if not old_goals:
+                continue
+            
+            # Written to the archive before they leave the list, so a
+            # failure can at worst leave them in both
+            try:
+                self.archive.add(list_id, old_goals)
+            except OSError as e:
+                print(f"Error archiving goals: {e}")
+                continue
+            removed = {id(goal) for goal in old_goals}
+            goals[:] = [goal for goal in goals if id(goal) not in removed]
+            self.track([('insert_many', list_id, None, goals, old_goals)])
+            archived += len(old_goals)
+        
+        if archived:
+            self.history.clear()
+        if archived or stamped:
+            self.save_lists()
+        return archived
+
+    def restore_archived(self, list_id, goal_id):
+        """Bring an archived goal back into its list and return it
+
+        It counts as completed today, so it is not archived again right
+        away. Returns None if it is no longer in the archive.
+        """
+        if list_id not in self.lists:
+            return None
+        goal_data = self.archive.remove(list_id, goal_id)
+        if goal_data is None:
+            return None
+        
+        if goal_data.get('completed'):
+            goal_data[archive.COMPLETED_ON_KEY] = date.today().isoformat()
+        goals = self.lists[list_id]['goals']
+        goals.append(goal_data)
+        # Not recorded for undo: undoing it would drop the goal from the
+        # list while it is no longer in the archive
+        self.track([('remove', list_id, None, goals, goal_data)])
+        self.save_lists()
+        return goal_data
+
+    def backup_lists(self):
+        """Create a backup of the lists file and return its path"""
+        backup_dir = os.path.join(self.data_dir, 'backups')
+        os.makedirs(backup_dir, exist_ok=True)
+        
+        from datetime import datetime
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        backup_file = os.path.join(backup_dir, f'lists_backup_{timestamp}.json')
+        
+        try:
+            with open(self.lists_file, 'r') as source, open(backup_file, 'w') as target:
+                target.write(source.read())
+        except Exception as e:
+            print(f"Error creating backup: {e}")
+            return None
+        return backup_file
+    
+    def restore_from_backup(self, backup_file):
+        """Restore lists from a backup file"""
+        try:
+            with open(backup_file, 'r') as f:
+                self.lists = model.lists_from_json(json.load(f))
+            self.ensure_item_keys()
+            # Every list is replaced, and lists missing from the backup
+            # count as deleted
+            self._dirty.update(self.lists)
+            self._dirty.update(self.base())
+            self.history.clear()
+            self.rebuild_aggregates()
+            self.save_lists()
+            return True
+        except Exception as e:
+            print(f"Error restoring from backup: {e}")
+            return False
\ No newline at end of file
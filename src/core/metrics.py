@@ -0,0 +1,128 @@
+"""Counters and latency histograms of the running application
+
+Metrics are registered in the module-level registry when first asked for
+and cost a few additions to update, so they are always collected. Use
+``write_metrics`` to dump them in the Prometheus text format, by default
+to metrics.prom in the cache directory.
+"""
+
+import os
+import time
+import bisect
+from contextlib import contextmanager
+
+from . import paths
+
+# Upper bounds in seconds, from a millisecond to ten seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Counter:
+    """A count that only goes up"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+
+    def inc(self, amount=1):
+        """Add to the count"""
+        self.value += amount
+
+    def samples(self):
+        """Get the (name, value) pairs to export"""
+        return [(self.name, self.value)]
+
+class Histogram:
+    """Observed values, counted into buckets by upper bound"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        # One count per bucket, and the last for values above all bounds
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Add an observed value"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self):
+        """Observe how many seconds the enclosed block takes"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self):
+        """Get the (name, value) pairs to export, with cumulative buckets"""
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            samples.append((f'{self.name}_bucket{{le="{bound}"}}', cumulative))
+        samples.append((f'{self.name}_bucket{{le="+Inf"}}', self.count))
+        samples.append((f'{self.name}_sum', self.sum))
+        samples.append((f'{self.name}_count', self.count))
+        return samples
+
+class Registry:
+    """The metrics of the application, by name"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def get(self, metric_class, name, help_text, **kwargs):
+        """Get a metric, creating it when first asked for"""
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = metric_class(name, help_text, **kwargs)
+        elif not isinstance(metric, metric_class):
+            raise ValueError(f"Metric {name} is a {metric.kind}")
+        return metric
+
+    def render(self):
+        """Render all metrics in the Prometheus text format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, value in metric.samples():
+                lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+
+def counter(name, help_text):
+    """Get a counter of the application registry"""
+    return registry.get(Counter, name, help_text)
+
+
+def histogram(name, help_text, buckets=LATENCY_BUCKETS):
+    """Get a histogram of the application registry"""
+    return registry.get(Histogram, name, help_text, buckets=buckets)
+
+
+def write_metrics(path=None):
+    """Write the metrics in the Prometheus text format and return the path"""
+    path = path or os.path.join(paths.cache_dir(), 'metrics.prom')
+    temp_file = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(temp_file, 'w') as f:
+            f.write(registry.render())
+        os.replace(temp_file, path)
+    except OSError as e:
+        print(f"Error writing metrics: {e}")
+        return None
+    return path
@@ -0,0 +1,250 @@
+"""Compact goals and steps
+
+Goals and steps keep their fields in ``__slots__`` instead of a dict each,
+which takes less than half the memory of the dict it replaces. They still
+behave like the dicts of the lists file, so the rest of the code reads and
+writes them with the same keys: ``goal['title']``, ``step.get('deadline')``,
+``'order' in goal``. A field that was never set or was deleted is missing,
+like a key that is not in a dict.
+
+Deadlines are interned, since many items share a date, and parsed once
+into a date ordinal when set. Keys unknown to this version are kept as
+they are so that they survive a save.
+
+Items are converted from and to the JSON schema only when the lists file
+is read or written, with ``from_json`` and ``to_json``.
+"""
+
+import sys
+from copy import deepcopy
+from datetime import date
+from operator import attrgetter
+from collections.abc import Mapping, MutableMapping
+
+# Value of a slot whose key the item does not have
+_UNSET = object()
+
+
+def parse_deadline(deadline):
+    """Get the date ordinal of a YYYY-MM-DD deadline, or None"""
+    if not deadline:
+        return None
+    try:
+        return date.fromisoformat(deadline).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def intern(value):
+    """Share one copy of a string that many items hold, like a deadline"""
+    return sys.intern(value) if type(value) is str else value
+
+
+class Item(MutableMapping):
+    """Base class of goals and steps, readable and writable like a dict"""
+
+    # The keys kept in slots, in the order they are written to the file
+    FIELDS = ()
+
+    # column_row is the row of the item in a columns.ColumnStore, or None,
+    # and counted the completion progress.Progress counted it with
+    __slots__ = ('_extra', 'deadline_ordinal', 'column_row', 'counted')
+
+    def __init__(self, data=(), **fields):
+        self._extra = None
+        self.deadline_ordinal = None
+        self.column_row = None
+        self.counted = None
+        for key in self.FIELDS:
+            setattr(self, key, _UNSET)
+        for key, value in dict(data, **fields).items():
+            self[key] = value
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls.FIELD_SET = frozenset(cls.FIELDS)
+        cls.get_fields = attrgetter(*cls.FIELDS)
+
+    @classmethod
+    def from_json(cls, data):
+        """Create an item from its dict in the lists file"""
+        raise NotImplementedError
+
+    def set_common_fields(self, data):
+        """Fill the slots goals and steps share from their dict
+
+        Called for every goal and step when loading, so the slots are set
+        directly instead of going through __setitem__.
+        """
+        get = data.get
+        self.id = get('id', _UNSET)
+        self.completed = get('completed', _UNSET)
+        deadline = get('deadline', _UNSET)
+        if type(deadline) is str:
+            self.deadline = sys.intern(deadline)
+            self.deadline_ordinal = parse_deadline(deadline)
+        else:
+            self.deadline = deadline
+            self.deadline_ordinal = None
+        self.order = get('order', _UNSET)
+        self.column_row = None
+        self.counted = None
+        self._extra = None
+        if not self.FIELD_SET.issuperset(data):
+            self._extra = {key: value for key, value in data.items() if key not in self.FIELD_SET}
+
+    def to_json(self):
+        """Get the item as the dict it is stored as"""
+        data = {key: value for key, value in zip(self.FIELDS, self.get_fields(self)) if value is not _UNSET}
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __getitem__(self, key):
+        if key in self.FIELD_SET:
+            value = getattr(self, key)
+            if value is not _UNSET:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELD_SET:
+            if key == 'deadline':
+                value = intern(value)
+                self.deadline_ordinal = parse_deadline(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELD_SET:
+            if getattr(self, key) is _UNSET:
+                raise KeyError(key)
+            setattr(self, key, _UNSET)
+            if key == 'deadline':
+                self.deadline_ordinal = None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for key, value in zip(self.FIELDS, self.get_fields(self)):
+            if value is not _UNSET:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for key in self)
+
+    def __contains__(self, key):
+        if key in self.FIELD_SET:
+            return getattr(self, key) is not _UNSET
+        return self._extra is not None and key in self._extra
+
+    def get(self, key, default=None):
+        # Faster than going through __getitem__ and KeyError
+        if key in self.FIELD_SET:
+            value = getattr(self, key)
+            return default if value is _UNSET else value
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __eq__(self, other):
+        if isinstance(other, Item):
+            other = other.to_json()
+        elif not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_json() == dict(other)
+
+    __hash__ = None
+
+    def __deepcopy__(self, memo):
+        return type(self).from_json(deepcopy(self.to_json(), memo))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_json()!r})"
+
+
+class Step(Item):
+    """A step of a goal"""
+
+    FIELDS = ('id', 'text', 'completed', 'deadline', 'order')
+
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_json(cls, data):
+        step = cls.__new__(cls)
+        step.text = data.get('text', _UNSET)
+        step.set_common_fields(data)
+        return step
+
+
+class Goal(Item):
+    """A goal with its steps"""
+
+    FIELDS = ('id', 'title', 'completed', 'completed_on', 'deadline', 'steps', 'order')
+
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_json(cls, data):
+        goal = cls.__new__(cls)
+        goal.title = data.get('title', _UNSET)
+        goal.completed_on = data.get('completed_on', _UNSET)
+        steps = data.get('steps', _UNSET)
+        goal.steps = [as_step(step) for step in steps] if steps is not _UNSET else _UNSET
+        goal.set_common_fields(data)
+        return goal
+
+    def to_json(self):
+        data = super().to_json()
+        if 'steps' in data:
+            data['steps'] = [step.to_json() for step in data['steps']]
+        return data
+
+
+def as_goal(data):
+    """Get a goal from a goal or its dict"""
+    return data if type(data) is Goal else Goal.from_json(data)
+
+
+def as_step(data):
+    """Get a step from a step or its dict"""
+    return data if type(data) is Step else Step.from_json(data)
+
+
+def list_from_json(list_data):
+    """Turn the goals of a list read from the lists file into goals"""
+    if 'goals' in list_data:
+        list_data['goals'] = [as_goal(goal) for goal in list_data['goals']]
+    return list_data
+
+
+def lists_from_json(lists):
+    """Turn the goals of every list read from the lists file into goals"""
+    for list_data in lists.values():
+        list_from_json(list_data)
+    return lists
+
+
+def list_to_json(list_data):
+    """Get a list with its goals and steps as it is stored in the lists file"""
+    list_json = dict(list_data)
+    if 'goals' in list_json:
+        list_json['goals'] = [goal.to_json() for goal in list_json['goals']]
+    return list_json
+
+
+def to_json(item):
+    """Serialize goals and steps, as the ``default`` of ``json.dump``"""
+    if isinstance(item, Item):
+        return item.to_json()
+    raise TypeError(f"Object of type {type(item).__name__} is not JSON serializable")
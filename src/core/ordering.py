@@ -0,0 +1,154 @@
+"""Fractional order keys for goals and steps
+
+Every goal and step carries an ``order`` number. Items are displayed sorted
+by that key, so moving an item only rewrites its own key instead of shifting
+every element of the list it lives in.
+"""
+
+ORDER_KEY = 'order'
+ORDER_STEP = 1024.0
+
+
+def key_between(prev_key, next_key):
+    """Return a key that sorts between two neighbouring keys
+
+    Either neighbour may be None to mean the start or the end of the list.
+    Returns None when floating point precision has run out between the two
+    keys and the list needs to be renumbered.
+    """
+    if prev_key is None and next_key is None:
+        return ORDER_STEP
+    if prev_key is None:
+        return next_key - ORDER_STEP
+    if next_key is None:
+        return prev_key + ORDER_STEP
+
+    key = (prev_key + next_key) / 2
+    if prev_key < key < next_key:
+        return key
+    return None
+
+
+def sort_key(item, completed_last=False):
+    """Get the display sort key of an item"""
+    if completed_last:
+        return (bool(item.get('completed')), item[ORDER_KEY])
+    return item[ORDER_KEY]
+
+
+def sorted_items(items, completed_last=False):
+    """Get items in display order"""
+    return sorted(items, key=lambda item: sort_key(item, completed_last))
+
+
+def next_key(items):
+    """Get a key that places a new item at the end of the list"""
+    if not items:
+        return ORDER_STEP
+    return max(item[ORDER_KEY] for item in items) + ORDER_STEP
+
+
+def renumber(items):
+    """Spread the keys of all items evenly, keeping their current order
+
+    Returns (item, old key) pairs for the items whose key changed.
+    """
+    changes = []
+    for index, item in enumerate(sorted_items(items)):
+        key = (index + 1) * ORDER_STEP
+        if item[ORDER_KEY] != key:
+            changes.append((item, item[ORDER_KEY]))
+            item[ORDER_KEY] = key
+    return changes
+
+
+def ensure_order(items):
+    """Give items loaded from older files an order key
+
+    Files written before order keys existed rely on the array position, so
+    that position becomes the key. The same goes for files with a null key,
+    which moves between completed and open items used to write. The old ``original_position`` hint is
+    dropped since completion no longer moves items around. Returns whether
+    anything had to change.
+    """
+    missing = any(item.get(ORDER_KEY) is None for item in items)
+    if missing:
+        for index, item in enumerate(items):
+            item[ORDER_KEY] = (index + 1) * ORDER_STEP
+    # Only looked up, since removing a missing key raises inside pop()
+    hinted = [item for item in items if 'original_position' in item]
+    for item in hinted:
+        del item['original_position']
+    return missing or bool(hinted)
+
+
+def place_between(items, item, prev_item, next_item):
+    """Give item a key that sorts it between two neighbouring items
+
+    Returns (item, old key) pairs for the items whose key changed, which is
+    only item itself unless the list had to be renumbered.
+
+    Neighbours taken from the completed-last display order can sort the
+    other way round by key when one is completed and the other is not.
+    Only the one completed like item is used then, since item is shown
+    among those.
+    """
+    def neighbour_keys():
+        prev_key = prev_item[ORDER_KEY] if prev_item is not None else None
+        next_key = next_item[ORDER_KEY] if next_item is not None else None
+        if prev_key is not None and next_key is not None and prev_key > next_key:
+            if bool(prev_item.get('completed')) == bool(item.get('completed')):
+                next_key = None
+            else:
+                prev_key = None
+        return prev_key, next_key
+
+    changes = []
+    key = key_between(*neighbour_keys())
+    if key is None:
+        changes = renumber(items)
+        key = key_between(*neighbour_keys())
+    
+    old_key = next((old for changed, old in changes if changed is item), item[ORDER_KEY])
+    changes = [(changed, old) for changed, old in changes if changed is not item]
+    changes.append((item, old_key))
+    item[ORDER_KEY] = key
+    return changes
+
+
+def move_to_index(items, item, index, completed_last=False):
+    """Move item to a position in the display order
+
+    Returns (item, old key) pairs like place_between().
+    """
+    others = [other for other in sorted_items(items, completed_last) if other is not item]
+    if completed_last:
+        # Completion decides the group item is shown in, so it can only
+        # move among the items completed like it
+        completed = bool(item.get('completed'))
+        group = [other for other in others if bool(other.get('completed')) == completed]
+        if completed:
+            index -= len(others) - len(group)
+        others = group
+    index = max(0, min(index, len(others)))
+    prev_item = others[index - 1] if index > 0 else None
+    next_item = others[index] if index < len(others) else None
+    return place_between(items, item, prev_item, next_item)
+
+
+def display_index(items, item, completed_last=False):
+    """Get the position of item in the display order"""
+    key = sort_key(item, completed_last)
+    return sum(1 for other in items if sort_key(other, completed_last) < key)
+
+
+def preceding_item(items, item, completed_last=False):
+    """Get the item displayed right before item, or None if it comes first"""
+    key = sort_key(item, completed_last)
+    previous = None
+    previous_key = None
+    for other in items:
+        other_key = sort_key(other, completed_last)
+        if other_key < key and (previous_key is None or other_key > previous_key):
+            previous, previous_key = other, other_key
+    return previous
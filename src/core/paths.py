@@ -0,0 +1,55 @@
+"""Locations of the application's files
+
+Follows the XDG Base Directory specification the way GLib does, without
+needing GLib, so the core can be used from scripts that never load GTK.
+Inside a Flatpak sandbox the XDG variables point into the sandbox, which
+gives the same locations GLib would report.
+"""
+
+import os
+
+APP_DIR_NAME = 'goaltracker'
+
+
+def xdg_dir(variable, default):
+    """Get a user directory from an XDG variable, which must be absolute"""
+    path = os.environ.get(variable)
+    if path and os.path.isabs(path):
+        return path
+    return os.path.join(os.path.expanduser('~'), default)
+
+
+def user_data_dir():
+    """Get the base directory for user data, e.g. ~/.local/share"""
+    return xdg_dir('XDG_DATA_HOME', os.path.join('.local', 'share'))
+
+
+def user_cache_dir():
+    """Get the base directory for user caches, e.g. ~/.cache"""
+    return xdg_dir('XDG_CACHE_HOME', '.cache')
+
+
+def user_config_dir():
+    """Get the base directory for user configuration, e.g. ~/.config"""
+    return xdg_dir('XDG_CONFIG_HOME', '.config')
+
+
+def system_data_dirs():
+    """Get the system data directories in order of preference"""
+    dirs = os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share'
+    return [path for path in dirs.split(':') if os.path.isabs(path)]
+
+
+def data_dir():
+    """Get the directory holding the lists, settings and quotes"""
+    return os.path.join(user_data_dir(), APP_DIR_NAME)
+
+
+def cache_dir():
+    """Get the directory for caches, logs and other disposable files"""
+    return os.path.join(user_cache_dir(), APP_DIR_NAME)
+
+
+def config_dir():
+    """Get the directory for configuration"""
+    return os.path.join(user_config_dir(), APP_DIR_NAME)
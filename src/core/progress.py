@@ -0,0 +1,180 @@
+"""Counters of the completed goals of every list and steps of every goal
+
+The sidebar shows done/total goals per list and every goal a bar of its
+completed steps. Counting them again after each change would mean walking
+a list with thousands of goals whenever a step is toggled, so the list
+manager keeps these counters up to date from the operations it records for
+undo instead.
+
+Every counted goal and step remembers in ``counted`` the completion it was
+counted with. A change then only moves a counter by the difference to the
+item's completion now, which keeps the counters right however operations
+are batched, undone and redone. Whether a goal is counted at all is told
+by it having step counts, since goals left over from before a rebuild may
+still have ``counted`` set.
+"""
+
+
+class Progress:
+    """Done and total goals of every list and steps of every goal"""
+
+    def __init__(self):
+        # [done, total] by list ID, and of the steps by id() of their goal
+        self.lists = {}
+        self.goals = {}
+        # What changed since take_changes() was last called
+        self.changed_lists = set()
+        self.changed_goals = {}
+
+    def rebuild(self, lists):
+        """Count every list from scratch"""
+        self.lists = {}
+        self.goals = {}
+        for list_id, list_data in lists.items():
+            self.lists[list_id] = [0, 0]
+            for goal in list_data.get('goals', []):
+                self.add_goal(list_id, goal)
+        self.changed_lists = set()
+        self.changed_goals = {}
+
+    def list_progress(self, list_id):
+        """Get the completed and total goals of a list"""
+        done, total = self.lists.get(list_id, (0, 0))
+        return done, total
+
+    def step_progress(self, goal):
+        """Get the completed and total steps of a goal"""
+        done, total = self.goals.get(id(goal), (0, 0))
+        return done, total
+
+    def take_changes(self):
+        """Get the lists and goals whose counts changed since the last call
+
+        Returns None if nothing changed, else a dict with the counts of the
+        changed lists by ID under 'lists' and the changed goals under
+        'goals'.
+        """
+        if not self.changed_lists and not self.changed_goals:
+            return None
+        changes = {
+            'lists': {list_id: self.list_progress(list_id) for list_id in self.changed_lists},
+            'goals': list(self.changed_goals.values())
+        }
+        self.changed_lists = set()
+        self.changed_goals = {}
+        return changes
+
+    def add_goal(self, list_id, goal):
+        """Count a goal added to a list, with its steps"""
+        if id(goal) in self.goals:
+            self.update(list_id, goal, goal)
+            return
+        counts = self.lists.setdefault(list_id, [0, 0])
+        goal.counted = bool(goal.get('completed'))
+        counts[0] += goal.counted
+        counts[1] += 1
+        step_counts = self.goals[id(goal)] = [0, 0]
+        for step in goal.get('steps', []):
+            step.counted = bool(step.get('completed'))
+            step_counts[0] += step.counted
+            step_counts[1] += 1
+        self.changed_lists.add(list_id)
+        self.changed_goals[id(goal)] = goal
+
+    def discard_goal(self, list_id, goal):
+        """Stop counting a goal removed from a list, with its steps"""
+        if self.goals.pop(id(goal), None) is None:
+            return
+        counts = self.lists.get(list_id)
+        if counts is not None:
+            counts[0] -= goal.counted
+            counts[1] -= 1
+        goal.counted = None
+        for step in goal.get('steps', []):
+            step.counted = None
+        self.changed_lists.add(list_id)
+        self.changed_goals.pop(id(goal), None)
+
+    def add_step(self, goal, step):
+        """Count a step added to a counted goal"""
+        counts = self.goals.get(id(goal))
+        if counts is None:
+            return
+        if step.counted is not None:
+            self.update(None, goal, step)
+            return
+        step.counted = bool(step.get('completed'))
+        counts[0] += step.counted
+        counts[1] += 1
+        self.changed_goals[id(goal)] = goal
+
+    def discard_step(self, goal, step):
+        """Stop counting a step removed from its goal"""
+        if step.counted is None:
+            return
+        counts = self.goals.get(id(goal))
+        if counts is not None:
+            counts[0] -= step.counted
+            counts[1] -= 1
+            self.changed_goals[id(goal)] = goal
+        step.counted = None
+
+    def update(self, list_id, goal, item):
+        """Count the completion of a goal or step again after it was set"""
+        if item.counted is None or id(goal) not in self.goals:
+            return
+        completed = bool(item.get('completed'))
+        difference = completed - item.counted
+        if not difference:
+            return
+        item.counted = completed
+        if item is goal:
+            self.lists[list_id][0] += difference
+            self.changed_lists.add(list_id)
+        else:
+            self.goals[id(goal)][0] += difference
+            self.changed_goals[id(goal)] = goal
+
+    def apply(self, operations, lists):
+        """Update the counters from operations reverting changes just made
+
+        These are the operations ListManager records for undo, or the
+        inverse a replay returns, so 'remove' means the item was added.
+        """
+        for operation in operations:
+            kind, list_id = operation[0], operation[1]
+            if kind == 'remove_list':
+                self.lists.setdefault(list_id, [0, 0])
+                self.changed_lists.add(list_id)
+                for goal in lists[list_id].get('goals', []):
+                    self.add_goal(list_id, goal)
+            elif kind == 'insert_list':
+                for goal in operation[2].get('goals', []):
+                    self.discard_goal(list_id, goal)
+                self.lists.pop(list_id, None)
+                self.changed_lists.discard(list_id)
+            elif kind == 'set':
+                _, _, goal, item, key, old_value = operation
+                if goal is None:
+                    continue
+                if key == 'steps':
+                    for step in old_value if isinstance(old_value, list) else ():
+                        self.discard_step(goal, step)
+                    for step in goal.get('steps', []):
+                        self.add_step(goal, step)
+                elif key == 'completed':
+                    self.update(list_id, goal, item)
+            elif kind in ('remove', 'remove_many'):
+                goal, added = operation[2], operation[4]
+                for item in added if kind == 'remove_many' else (added,):
+                    if goal is None:
+                        self.add_goal(list_id, item)
+                    else:
+                        self.add_step(goal, item)
+            else:
+                goal, removed = operation[2], operation[4]
+                for item in removed if kind == 'insert_many' else (removed,):
+                    if goal is None:
+                        self.discard_goal(list_id, item)
+                    else:
+                        self.discard_step(goal, item)
@@ -0,0 +1,90 @@
+"""Recording of what the user does, for replaying slow sessions
+
+Set GOALTRACKER_RECORD to record the actions taken in the window, such as
+selecting a list or completing a goal, with the time each took to handle.
+The recording starts with a snapshot of the lists and settings, so that
+``replay.Replayer`` can apply the same actions to the same data later:
+
+    {"type": "header", "version": 1, "snapshot": "...", ...}
+    {"t": 1520.4, "action": "toggle_goal", "duration_ms": 3.1, "list": "12345",
+     "goal": "a1b2c3d4e5f6", "completed": true}
+
+Goals and steps are referred to by their IDs. The recording goes to the
+cache directory as JSON Lines, or to the path given as the value of the
+variable, and is written as it goes so that a crash leaves it intact.
+"""
+
+import os
+import json
+import time
+import shutil
+from datetime import datetime
+
+from . import paths
+
+RECORD_ENV = 'GOALTRACKER_RECORD'
+VERSION = 1
+
+# Where to write the recording: None when not recording, '' for the default
+record_path = os.environ.get(RECORD_ENV) or None
+if record_path in ('1', 'true', 'yes'):
+    record_path = ''
+
+enabled = record_path is not None
+
+# The file being written, once recording started
+recording = None
+start_time = None
+
+
+def start(data_dir):
+    """Start recording, snapshotting the lists and settings in data_dir"""
+    global recording, start_time
+    if not enabled or recording is not None:
+        return None
+
+    path = record_path or os.path.join(
+        paths.cache_dir(), f"actions-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl"
+    )
+    snapshot_dir = os.path.splitext(path)[0] + '.snapshot'
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        for name in ('lists.json', 'settings.json'):
+            if os.path.exists(os.path.join(data_dir, name)):
+                shutil.copy2(os.path.join(data_dir, name), snapshot_dir)
+        recording = open(path, 'w', buffering=1)
+    except OSError as e:
+        print(f"Error starting the recording: {e}")
+        return None
+
+    start_time = time.perf_counter()
+    recording.write(json.dumps({
+        'type': 'header',
+        'version': VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'snapshot': os.path.abspath(snapshot_dir)
+    }) + '\n')
+    print(f"Recording actions to {path}")
+    return path
+
+
+def now():
+    """Get the time to pass to ``record`` once the action was handled"""
+    return time.perf_counter() if recording is not None else None
+
+
+def record(action, started, **fields):
+    """Record an action that started at the time ``now`` returned"""
+    if recording is None or started is None:
+        return
+    finished = time.perf_counter()
+    entry = {
+        't': round((started - start_time) * 1000, 3),
+        'action': action,
+        'duration_ms': round((finished - started) * 1000, 3)
+    }
+    entry.update(fields)
+    try:
+        recording.write(json.dumps(entry) + '\n')
+    except (OSError, ValueError) as e:
+        print(f"Error recording action: {e}")
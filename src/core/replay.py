@@ -0,0 +1,233 @@
+"""Replay of recorded user actions
+
+Applies the actions of a recording made with GOALTRACKER_RECORD to a list
+manager, through the same list manager calls the window makes. Started on
+a copy of the recording's snapshot, a replay goes through the same states
+as the recorded session:
+
+    list_manager = ListManager(copy_of_snapshot)
+    list_manager.load_lists()
+    replayer = Replayer(list_manager, completed_last=auto_sort_items)
+    for entry in read_recording(path)[1]:
+        replayer.apply(entry)
+"""
+
+import json
+
+from . import items, model
+
+class ReplayError(Exception):
+    """Raised when an action refers to a list, goal or step that is not there"""
+
+def read_recording(path):
+    """Read a recording and return its header and its actions"""
+    header = None
+    actions = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if entry.get('type') == 'header':
+                header = entry
+            else:
+                actions.append(entry)
+    if header is None:
+        raise ValueError(f"{path} is not a recording of actions")
+    return header, actions
+
+class Replayer:
+    """Applies recorded actions to a list manager"""
+
+    def __init__(self, list_manager, completed_last=False):
+        self.list_manager = list_manager
+        self.completed_last = completed_last
+        # IDs of lists added while replaying, by their recorded IDs
+        self.list_ids = {}
+
+    def resolve_list(self, list_id):
+        """Get the ID a recorded list has in the replay"""
+        list_id = self.list_ids.get(list_id, list_id)
+        if list_id not in self.list_manager.lists:
+            raise ReplayError(f"No list {list_id}")
+        return list_id
+
+    def find_goal(self, list_id, goal_id):
+        """Get a goal of a list by ID"""
+        for goal in self.list_manager.lists[list_id]['goals']:
+            if goal.get(items.ID_KEY) == goal_id:
+                return goal
+        raise ReplayError(f"No goal {goal_id} in list {list_id}")
+
+    def find_goals(self, list_id, goal_ids):
+        """Get several goals of a list by ID"""
+        wanted = set(goal_ids)
+        return [goal for goal in self.list_manager.lists[list_id]['goals'] if goal.get(items.ID_KEY) in wanted]
+
+    @staticmethod
+    def find_step(goal, step_id):
+        """Get a step of a goal by ID"""
+        for step in goal.get('steps', []):
+            if step.get(items.ID_KEY) == step_id:
+                return step
+        raise ReplayError(f"No step {step_id} in goal {goal.get(items.ID_KEY)}")
+
+    def apply(self, entry):
+        """Apply a recorded action
+
+        Returns what changed in the shape of an 'external-change' event, so
+        a window can bring itself up to date.
+        """
+        handler = getattr(self, f"replay_{entry['action']}", None)
+        if handler is None:
+            raise ReplayError(f"Unknown action {entry['action']}")
+        changes = {'added': [], 'removed': [], 'changed': {}, 'conflicts': []}
+        handler(entry, changes)
+        return changes
+
+    def replay_select_list(self, entry, changes):
+        self.resolve_list(entry['list'])
+
+    def replay_add_list(self, entry, changes):
+        list_id = self.list_manager.add_list(entry['name'])
+        self.list_ids[entry['list']] = list_id
+        changes['added'].append(list_id)
+
+    def replay_edit_list(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        self.list_manager.edit_list(list_id, entry['name'])
+        changes['changed'][list_id] = []
+
+    def replay_delete_list(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        self.list_manager.delete_list(list_id)
+        changes['removed'].append(list_id)
+
+    def replay_add_goal(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        goal = model.Goal({items.ID_KEY: entry['goal'], 'title': entry['title'], 'completed': False, 'steps': []})
+        self.list_manager.add_goal_to_list(list_id, goal)
+        changes['changed'][list_id] = [goal]
+
+    def replay_toggle_goal(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        goal = self.find_goal(list_id, entry['goal'])
+        self.list_manager.update_goal(list_id, goal, completed=entry['completed'])
+        changes['changed'][list_id] = [goal]
+
+    def replay_edit_goal(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        goal = self.find_goal(list_id, entry['goal'])
+        with self.list_manager.batch():
+            self.list_manager.update_goal(list_id, goal, title=entry['title'], deadline=entry['deadline'])
+            if entry.get('position') is not None:
+                self.list_manager.move_goal_to(list_id, goal, entry['position'], self.completed_last)
+        changes['changed'][list_id] = [goal]
+
+    def replay_move_goal(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        goal = self.find_goal(list_id, entry['goal'])
+        self.list_manager.move_goal_to(list_id, goal, entry['position'], self.completed_last)
+        changes['changed'][list_id] = [goal]
+
+    def replay_delete_goal(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        self.list_manager.remove_goal(list_id, self.find_goal(list_id, entry['goal']))
+        changes['changed'][list_id] = []
+
+    def replay_transfer_goal(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        target_list_id = self.resolve_list(entry['target'])
+        goals = [self.find_goal(list_id, entry['goal'])]
+        if entry['copy']:
+            copies = self.list_manager.copy_goals_to_list(list_id, goals, target_list_id)
+            # Later actions refer to the copies by their recorded IDs
+            for goal_copy, goal_id in zip(copies, entry.get('new_goals', [])):
+                goal_copy[items.ID_KEY] = goal_id
+            self.list_manager.mark_changed(target_list_id)
+            changes['changed'][target_list_id] = copies
+        else:
+            self.list_manager.move_goals_to_list(list_id, goals, target_list_id)
+            changes['changed'][list_id] = []
+            changes['changed'][target_list_id] = goals
+
+    def replay_add_step(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        goal = self.find_goal(list_id, entry['goal'])
+        step = model.Step({
+            items.ID_KEY: entry['step'], 'text': entry['text'], 'completed': False, 'deadline': entry['deadline']
+        })
+        self.list_manager.add_step_to_goal(list_id, goal, step)
+        changes['changed'][list_id] = [goal]
+
+    def replay_toggle_step(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        goal = self.find_goal(list_id, entry['goal'])
+        step = self.find_step(goal, entry['step'])
+        self.list_manager.update_step(list_id, goal, step, completed=entry['completed'])
+        changes['changed'][list_id] = [goal]
+
+    def replay_edit_step(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        goal = self.find_goal(list_id, entry['goal'])
+        step = self.find_step(goal, entry['step'])
+        with self.list_manager.batch():
+            self.list_manager.update_step(list_id, goal, step, text=entry['text'], deadline=entry['deadline'])
+            if entry.get('position') is not None:
+                self.list_manager.move_step_to(list_id, goal, step, entry['position'], self.completed_last)
+        changes['changed'][list_id] = [goal]
+
+    def replay_delete_step(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        goal = self.find_goal(list_id, entry['goal'])
+        self.list_manager.remove_step(list_id, goal, self.find_step(goal, entry['step']))
+        changes['changed'][list_id] = [goal]
+
+    def replay_transfer_step(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        target_list_id = self.resolve_list(entry['target'])
+        goal = self.find_goal(list_id, entry['goal'])
+        new_goal = self.list_manager.transfer_step(
+            list_id, goal, self.find_step(goal, entry['step']), target_list_id, copy=entry['copy']
+        )
+        if new_goal is not None and entry.get('new_goal'):
+            new_goal[items.ID_KEY] = entry['new_goal']
+            self.list_manager.mark_changed(target_list_id)
+        changes['changed'][list_id] = [goal]
+        changes['changed'].setdefault(target_list_id, []).append(new_goal)
+
+    def replay_bulk_complete(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        goals = self.find_goals(list_id, entry['goals'])
+        self.list_manager.set_goals_completed(list_id, goals, entry['completed'])
+        changes['changed'][list_id] = goals
+
+    def replay_bulk_deadline(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        goals = self.find_goals(list_id, entry['goals'])
+        self.list_manager.set_goals_deadline(list_id, goals, entry['deadline'])
+        changes['changed'][list_id] = goals
+
+    def replay_bulk_delete(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        self.list_manager.remove_goals(list_id, self.find_goals(list_id, entry['goals']))
+        changes['changed'][list_id] = []
+
+    def replay_bulk_move(self, entry, changes):
+        list_id = self.resolve_list(entry['list'])
+        target_list_id = self.resolve_list(entry['target'])
+        goals = self.find_goals(list_id, entry['goals'])
+        self.list_manager.move_goals_to_list(list_id, goals, target_list_id)
+        changes['changed'][list_id] = []
+        changes['changed'][target_list_id] = goals
+
+    def replay_undo(self, entry, changes):
+        replayed = self.list_manager.undo()
+        if replayed:
+            changes.update(replayed)
+
+    def replay_redo(self, entry, changes):
+        replayed = self.list_manager.redo()
+        if replayed:
+            changes.update(replayed)
@@ -1,13 +1,13 @@
 import os
 import json
-from gi.repository import GLib
+
+from . import paths
 
 class Settings:
     """Service for managing application settings"""
     
     def __init__(self):
-        self.data_dir = os.path.join(GLib.get_user_data_dir(), 'goaltracker')
-        os.makedirs(self.data_dir, exist_ok=True)
+        self.data_dir = paths.data_dir()
         self.settings_file = os.path.join(self.data_dir, 'settings.json')
         
         # Define default settings
@@ -15,7 +15,9 @@ class Settings:
             'auto_sort_items': False,
             'theme': 'light',
             'enable_notifications': True,
-            'default_deadline_reminder': 1  # days before deadline
+            'default_deadline_reminder': 1,  # days before deadline
+            'undo_memory_limit_mb': 16,  # memory kept for undoing changes
+            'archive_after_days': 0  # completed goals older than this are archived, 0 for never
         }
         
         # Load current settings
@@ -27,10 +29,8 @@ class Settings:
             with open(self.settings_file, 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
-            # If settings file doesn't exist, create it with defaults
-            settings = self.default_settings.copy()
-            self.save_settings_to_file(settings)
-            return settings
+            # Defaults are only written once a setting changes
+            return self.default_settings.copy()
         except json.JSONDecodeError:
             # If settings file is corrupted, recreate with defaults
             print("Settings file corrupted, recreating with defaults")
@@ -41,6 +41,7 @@ class Settings:
     def save_settings_to_file(self, settings):
         """Save settings to file"""
         try:
+            os.makedirs(self.data_dir, exist_ok=True)
             with open(self.settings_file, 'w') as f:
                 json.dump(settings, f, indent=2)
         except Exception as e:
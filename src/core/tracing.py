@@ -0,0 +1,133 @@
+"""Tracing of hot paths as Chrome trace events
+
+Set GOALTRACKER_TRACE to record how long traced functions take. When the
+application exits the spans are written as trace event JSON, which
+chrome://tracing and https://ui.perfetto.dev can open. The trace goes to
+the cache directory, or to the path given as the value of the variable.
+
+Tracing is decided when the modules are imported: with the variable unset,
+``traced`` returns the functions unchanged and costs nothing at all.
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+import functools
+from contextlib import nullcontext, contextmanager
+from datetime import datetime
+
+from . import paths
+
+TRACE_ENV = 'GOALTRACKER_TRACE'
+
+# Spans kept at most, so a long session cannot use up the memory
+MAX_EVENTS = 1000000
+
+# Where to write the trace: None when not tracing, '' for the default
+trace_path = os.environ.get(TRACE_ENV) or None
+if trace_path in ('1', 'true', 'yes'):
+    trace_path = ''
+
+enabled = trace_path is not None
+
+events = []
+dropped = 0
+
+
+def now_us():
+    """Get the current time in microseconds on the monotonic clock"""
+    return time.perf_counter_ns() // 1000
+
+
+def record(name, category, start, end, args=None):
+    """Add a complete span to the trace"""
+    global dropped
+    if len(events) >= MAX_EVENTS:
+        dropped += 1
+        return
+    event = {
+        'name': name,
+        'cat': category,
+        'ph': 'X',
+        'ts': start,
+        'dur': end - start,
+        'pid': os.getpid(),
+        'tid': threading.get_native_id()
+    }
+    if args:
+        event['args'] = args
+    events.append(event)
+
+
+@contextmanager
+def _span(name, category, args):
+    start = now_us()
+    try:
+        yield
+    finally:
+        record(name, category, start, now_us(), args)
+
+
+def span(name, category='app', **args):
+    """Trace the enclosed block as a span"""
+    if not enabled:
+        return nullcontext()
+    return _span(name, category, args)
+
+
+def traced(name=None, category='app'):
+    """Decorate a function to trace every call as a span
+
+    The span is named after the function, e.g. 'ListManager.save_lists',
+    unless a name is given.
+    """
+    def decorate(func):
+        if not enabled:
+            return func
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = now_us()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(span_name, category, start, now_us())
+        return wrapper
+    return decorate
+
+
+def write_trace():
+    """Write the recorded spans as trace event JSON and return its path"""
+    if not enabled or not events:
+        return None
+
+    metadata = [
+        {'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': 'goaltracker'}},
+        {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(),
+         'tid': threading.main_thread().native_id, 'args': {'name': 'main'}}
+    ]
+    trace = {
+        'traceEvents': metadata + events,
+        'displayTimeUnit': 'ms',
+        'otherData': {'created': datetime.now().isoformat(timespec='seconds'), 'dropped': dropped}
+    }
+
+    path = trace_path or os.path.join(
+        paths.cache_dir(), f"trace-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(trace, f)
+        print(f"Trace written to {path}")
+    except OSError as e:
+        print(f"Error writing trace: {e}")
+        return None
+    return path
+
+
+if enabled:
+    atexit.register(write_trace)
@@ -1,9 +1,26 @@
-"""Dialog components for the Goal Tracker application"""
+"""Dialog components for the Goal Tracker application
 
-from .goal_dialog import GoalDialog
-from .about_dialog import AboutDialog
-from .settings_dialog import SettingsDialog
-from .confirm_dialog import ConfirmDialog
-from .list_dialog import ListDialog
+Dialogs are only imported when first used, to keep them off the startup
+path.
+"""
 
-__all__ = ['GoalDialog', 'AboutDialog', 'SettingsDialog', 'ConfirmDialog', 'ListDialog']
\ No newline at end of file
+import importlib
+
+_MODULES = {
+    'GoalDialog': 'goal_dialog',
+    'AboutDialog': 'about_dialog',
+    'SettingsDialog': 'settings_dialog',
+    'ConfirmDialog': 'confirm_dialog',
+    'ListDialog': 'list_dialog',
+    'ImportDialog': 'import_dialog',
+    'StatisticsDialog': 'statistics_dialog'
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f'.{_MODULES[name]}', __name__)
+    return getattr(module, name)
@@ -1,9 +1,11 @@
 from gi.repository import Gtk, GLib, Pango
 from ..config import APP_NAME, APP_VERSION
+from ..core import tracing
 
 class AboutDialog(Gtk.Dialog):
     """Dialog showing application information and credits"""
     
+    @tracing.traced()
     def __init__(self, parent):
         super().__init__(
             title=f"About {APP_NAME}",
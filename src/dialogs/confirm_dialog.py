@@ -1,8 +1,11 @@
 from gi.repository import Gtk
 
+from ..core import tracing
+
 class ConfirmDialog(Gtk.Dialog):
     """A dialog for confirming destructive actions"""
     
+    @tracing.traced()
     def __init__(self, parent, title, message):
         super().__init__(
             title=title,
@@ -1,8 +1,11 @@
 from gi.repository import Gtk, GLib
 
+from ..core import tracing
+
 class GoalDialog(Gtk.Dialog):
     """Dialog for adding or editing goals and steps"""
     
+    @tracing.traced()
     def __init__(self, parent, title, current_text="", is_step=False, 
                  current_position=None, max_position=None, current_deadline=None):
         super().__init__(
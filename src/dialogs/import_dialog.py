@@ -0,0 +1,108 @@
+import os
+import threading
+from gi.repository import Gtk, GLib
+
+from ..core import tracing
+from ..core.importer import ImportCancelled
+
+class ImportDialog(Gtk.Dialog):
+    """Dialog showing the progress of a bulk import
+
+    The file is read in a background thread and the goals are added to the
+    lists once it is done. Emits OK when the import finished, with the
+    outcome in result, and CANCEL when it was cancelled or failed, with the
+    reason in error.
+    """
+
+    @tracing.traced()
+    def __init__(self, parent, importer, path, list_id=None):
+        super().__init__(
+            title="Import",
+            transient_for=parent,
+            modal=True,
+            destroy_with_parent=True
+        )
+
+        self.importer = importer
+        self.path = path
+        self.list_id = list_id
+        self.result = None
+        self.error = None
+        self.cancelled = False
+
+        self.set_deletable(False)
+        self.set_default_size(400, -1)
+
+        # Header Bar
+        header_bar = Gtk.HeaderBar()
+        header_bar.set_show_title_buttons(False)
+        self.set_titlebar(header_bar)
+
+        # Cancel button
+        cancel_button = Gtk.Button(label="Cancel")
+        cancel_button.connect("clicked", self.on_cancel_clicked)
+        header_bar.pack_start(cancel_button)
+
+        # Content box
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        box.set_margin_top(24)
+        box.set_margin_bottom(24)
+        box.set_margin_start(24)
+        box.set_margin_end(24)
+        self.set_child(box)
+
+        self.status_label = Gtk.Label(label=f"Reading {os.path.basename(path)}…")
+        self.status_label.set_wrap(True)
+        self.status_label.set_max_width_chars(40)
+        box.append(self.status_label)
+
+        self.progress_bar = Gtk.ProgressBar()
+        self.progress_bar.set_show_text(True)
+        box.append(self.progress_bar)
+
+    def start(self):
+        """Start reading the file"""
+        thread = threading.Thread(target=self.read_file, daemon=True)
+        thread.start()
+
+    def read_file(self):
+        """Read the file, in the background thread"""
+        try:
+            result = self.importer.read(
+                self.path,
+                progress=lambda fraction: GLib.idle_add(self.update_progress, fraction),
+                cancelled=lambda: self.cancelled
+            )
+        except ImportCancelled:
+            return
+        except Exception as e:
+            print(f"Error importing {self.path}: {e}")
+            GLib.idle_add(self.finish, None, str(e))
+            return
+        GLib.idle_add(self.finish, result, None)
+
+    def update_progress(self, fraction):
+        """Show how much of the file has been read"""
+        self.progress_bar.set_fraction(fraction)
+        return GLib.SOURCE_REMOVE
+
+    def finish(self, result, error):
+        """Add the goals that were read, back in the main thread"""
+        if self.cancelled:
+            return GLib.SOURCE_REMOVE
+
+        if result is None:
+            self.error = error
+            self.emit("response", Gtk.ResponseType.CANCEL)
+            return GLib.SOURCE_REMOVE
+
+        self.status_label.set_text("Adding goals…")
+        self.progress_bar.set_fraction(1.0)
+        self.result = self.importer.commit(result, self.list_id)
+        self.emit("response", Gtk.ResponseType.OK)
+        return GLib.SOURCE_REMOVE
+
+    def on_cancel_clicked(self, button):
+        """Stop the import; the lists are only changed once reading is done"""
+        self.cancelled = True
+        self.emit("response", Gtk.ResponseType.CANCEL)
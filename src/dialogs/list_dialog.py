@@ -1,8 +1,11 @@
 from gi.repository import Gtk
 
+from ..core import tracing
+
 class ListDialog(Gtk.Dialog):
     """Dialog for adding/editing lists"""
     
+    @tracing.traced()
     def __init__(self, parent, title, current_text=""):
         super().__init__(
             title=title,
@@ -2,9 +2,12 @@ from gi.repository import Gtk, Adw
 
 from gi.repository import Gtk, Adw
 
+from ..core import tracing
+
 class SettingsDialog(Gtk.Dialog):
     """Dialog for application settings"""
     
+    @tracing.traced()
     def __init__(self, parent, settings):
         super().__init__(
             title="Settings",
@@ -58,6 +61,10 @@ class SettingsDialog(Gtk.Dialog):
         )
         behavior_section.append(auto_sort_row)
         
+        # Archive age setting
+        archive_row = self.create_archive_selector()
+        behavior_section.append(archive_row)
+        
         # Appearance section
         appearance_section = self.create_section("Appearance")
         main_box.append(appearance_section)
@@ -170,6 +177,58 @@ class SettingsDialog(Gtk.Dialog):
         
         return row
 
+    def create_archive_selector(self):
+        """Create the row choosing when completed goals are archived"""
+        row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        row.add_css_class('setting-row')
+        
+        # Labels box
+        labels_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        labels_box.set_hexpand(True)
+        row.append(labels_box)
+        
+        # Title
+        title_label = Gtk.Label(label="Archive Completed Goals")
+        title_label.add_css_class('setting-title')
+        title_label.set_halign(Gtk.Align.START)
+        labels_box.append(title_label)
+        
+        # Description
+        description_label = Gtk.Label(
+            label="Move goals completed long ago to the archive when the app starts"
+        )
+        description_label.add_css_class('setting-description')
+        description_label.set_wrap(True)
+        description_label.set_xalign(0)
+        labels_box.append(description_label)
+        
+        # Age combo box, with the days as IDs
+        combo = Gtk.ComboBoxText()
+        combo.append('0', "Never")
+        for days, label in ((7, "After a week"), (30, "After a month"), (90, "After 3 months"), (365, "After a year")):
+            combo.append(str(days), label)
+        current = str(self.settings.get('archive_after_days'))
+        if not combo.set_active_id(current):
+            # A number of days set outside the dialog
+            combo.append(current, f"After {current} days")
+            combo.set_active_id(current)
+        combo.connect('changed', self._on_archive_age_changed)
+        row.append(combo)
+        
+        # Reset button (only shown if setting is modified)
+        if self.settings.is_modified('archive_after_days'):
+            reset_button = Gtk.Button()
+            reset_button.set_icon_name('edit-undo-symbolic')
+            reset_button.add_css_class('flat')
+            reset_button.connect('clicked', self.on_reset_setting, 'archive_after_days', combo)
+            row.append(reset_button)
+        
+        return row
+
+    def _on_archive_age_changed(self, combo):
+        """Handle archive age selection change"""
+        self.settings.set('archive_after_days', int(combo.get_active_id()))
+
     def _on_setting_toggled(self, button, setting_key):
         """Handle boolean setting toggle"""
         self.settings.set(setting_key, button.get_active())
@@ -198,7 +257,7 @@ class SettingsDialog(Gtk.Dialog):
         if isinstance(widget, Gtk.CheckButton):
             widget.set_active(default_value)
         elif isinstance(widget, Gtk.ComboBoxText):
-            widget.set_active_id(default_value)
+            widget.set_active_id(str(default_value))
             
         # Remove the reset button
         button.get_parent().remove(button)
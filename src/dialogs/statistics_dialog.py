@@ -0,0 +1,146 @@
+from gi.repository import Gtk
+
+from ..core import tracing
+
+class StatisticsDialog(Gtk.Dialog):
+    """Dialog showing how many goals and steps were completed over time"""
+
+    @tracing.traced()
+    def __init__(self, parent, summary):
+        super().__init__(
+            title="Statistics",
+            transient_for=parent,
+            modal=True,
+            destroy_with_parent=True
+        )
+
+        self.set_default_size(460, 560)
+        self.set_size_request(400, -1)
+
+        # Header Bar
+        header_bar = Gtk.HeaderBar()
+        header_bar.set_show_title_buttons(False)
+        self.set_titlebar(header_bar)
+
+        close_button = Gtk.Button(label="Close")
+        close_button.connect("clicked", self._on_response, Gtk.ResponseType.OK)
+        header_bar.pack_end(close_button)
+
+        # Scrolled Window
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scrolled.set_vexpand(True)
+        self.set_child(scrolled)
+
+        main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=24)
+        main_box.set_margin_top(24)
+        main_box.set_margin_bottom(24)
+        main_box.set_margin_start(24)
+        main_box.set_margin_end(24)
+        scrolled.set_child(main_box)
+
+        goals, steps = summary['total']
+        if goals + steps == 0:
+            empty_label = Gtk.Label(label="Complete goals and steps to see your progress here")
+            empty_label.add_css_class('dim-label')
+            empty_label.set_wrap(True)
+            main_box.append(empty_label)
+            if summary['overdue'] or summary['due_soon']:
+                main_box.append(self.create_deadlines(summary))
+            return
+
+        # Totals and streaks
+        overview = self.create_section("Overview")
+        overview.append(self.create_row("Goals completed", str(goals)))
+        overview.append(self.create_row("Steps completed", str(steps)))
+        overview.append(self.create_row("Current streak", self.format_days(summary['current_streak'])))
+        overview.append(self.create_row("Longest streak", self.format_days(summary['longest_streak'])))
+        main_box.append(overview)
+
+        # Deadlines
+        if summary['with_deadline'] or summary['overdue'] or summary['due_soon']:
+            main_box.append(self.create_deadlines(summary))
+
+        # Completions per day and week
+        main_box.append(self.create_chart(
+            "Last days", [(day.strftime('%a %d %b'), goals, steps) for day, goals, steps in summary['days']]
+        ))
+        main_box.append(self.create_chart(
+            "Last weeks", [(f"Week of {day.strftime('%d %b')}", goals, steps) for day, goals, steps in summary['weeks']]
+        ))
+
+    @staticmethod
+    def format_days(count):
+        return f"{count} day{'s' if count != 1 else ''}"
+
+    def create_deadlines(self, summary):
+        """Create a section with the open items by deadline, and how completed ones kept theirs"""
+        deadlines = self.create_section("Deadlines")
+        deadlines.append(self.create_row("Overdue", str(summary['overdue'])))
+        deadlines.append(self.create_row("Due in the next 7 days", str(summary['due_soon'])))
+        if summary['with_deadline']:
+            deadlines.append(self.create_row(
+                "Completed on time", f"{summary['on_time']} of {summary['with_deadline']}"
+            ))
+            margin = summary['average_margin']
+            deadlines.append(self.create_row(
+                "Average margin",
+                f"{margin:.1f} days early" if margin >= 0 else f"{-margin:.1f} days late"
+            ))
+        return deadlines
+
+    def create_section(self, title):
+        """Create a section with a title"""
+        section = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        section.add_css_class('settings-section')
+
+        title_label = Gtk.Label(label=title)
+        title_label.add_css_class('settings-section-title')
+        title_label.set_halign(Gtk.Align.START)
+        section.append(title_label)
+
+        return section
+
+    def create_row(self, title, value):
+        """Create a row with a title and its value"""
+        row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+
+        title_label = Gtk.Label(label=title)
+        title_label.set_halign(Gtk.Align.START)
+        title_label.set_hexpand(True)
+        row.append(title_label)
+
+        value_label = Gtk.Label(label=value)
+        value_label.add_css_class('statistics-value')
+        row.append(value_label)
+
+        return row
+
+    def create_chart(self, title, bars):
+        """Create a section with a bar of completed goals and steps per period"""
+        section = self.create_section(title)
+        highest = max(max(goals + steps for _, goals, steps in bars), 1)
+
+        grid = Gtk.Grid(column_spacing=12, row_spacing=4)
+        for row, (label, goals, steps) in enumerate(bars):
+            period_label = Gtk.Label(label=label)
+            period_label.set_halign(Gtk.Align.START)
+            period_label.add_css_class('dim-label')
+            grid.attach(period_label, 0, row, 1, 1)
+
+            bar = Gtk.LevelBar(min_value=0, max_value=highest, value=goals + steps)
+            bar.set_hexpand(True)
+            bar.set_valign(Gtk.Align.CENTER)
+            bar.set_tooltip_text(f"{goals} goals, {steps} steps")
+            grid.attach(bar, 1, row, 1, 1)
+
+            count_label = Gtk.Label(label=str(goals + steps))
+            count_label.add_css_class('statistics-value')
+            grid.attach(count_label, 2, row, 1, 1)
+        section.append(grid)
+
+        return section
+
+    def _on_response(self, button, response):
+        """Handle dialog response"""
+        self.emit("response", response)
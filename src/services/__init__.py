@@ -1,7 +1,11 @@
-"""Services for the Goal Tracker application"""
+"""Services for the Goal Tracker application
 
-from .settings import Settings
-from .list_manager import ListManager
-from .daily_quote import DailyQuote
+The storage and model services live in the GTK-free core package and are
+re-exported here for the user interface.
+"""
 
-__all__ = ['Settings', 'ListManager', 'DailyQuote']
\ No newline at end of file
+from ..core import Settings, ListManager, StorageConflict, DailyQuote
+from .file_watcher import ListsFileWatcher
+from .watchdog import MainLoopWatchdog
+
+__all__ = ['Settings', 'ListManager', 'StorageConflict', 'DailyQuote', 'ListsFileWatcher', 'MainLoopWatchdog']
@@ -0,0 +1,47 @@
+from gi.repository import Gio, GLib
+
+class ListsFileWatcher:
+    """Service merging changes other programs make to the lists file
+
+    File-sync tools and scripts may rewrite the lists file while the app
+    is running. Events are debounced, since a single write usually shows up
+    as several of them, and the file is then merged by the list manager.
+    """
+    
+    RELOAD_DELAY_MS = 300
+    
+    def __init__(self, list_manager):
+        self.list_manager = list_manager
+        self.reload_source = None
+        
+        lists_file = Gio.File.new_for_path(list_manager.lists_file)
+        self.monitor = lists_file.monitor_file(Gio.FileMonitorFlags.WATCH_MOVES, None)
+        self.monitor.connect('changed', self.on_file_changed)
+    
+    def on_file_changed(self, monitor, file, other_file, event_type):
+        """Schedule a reload when the file was written or replaced"""
+        if event_type not in (
+            Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+            Gio.FileMonitorEvent.CREATED,
+            Gio.FileMonitorEvent.DELETED,
+            Gio.FileMonitorEvent.MOVED_IN,
+            Gio.FileMonitorEvent.RENAMED
+        ):
+            return
+        
+        if self.reload_source is not None:
+            GLib.source_remove(self.reload_source)
+        self.reload_source = GLib.timeout_add(self.RELOAD_DELAY_MS, self.reload)
+    
+    def reload(self):
+        """Merge the changed file"""
+        self.reload_source = None
+        self.list_manager.reload_if_changed()
+        return GLib.SOURCE_REMOVE
+    
+    def stop(self):
+        """Stop watching the file"""
+        if self.reload_source is not None:
+            GLib.source_remove(self.reload_source)
+            self.reload_source = None
+        self.monitor.cancel()
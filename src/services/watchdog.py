@@ -0,0 +1,179 @@
+import os
+import sys
+import time
+import logging
+import threading
+import traceback
+from logging.handlers import RotatingFileHandler
+from gi.repository import GLib
+
+from ..core import paths
+
+WATCHDOG_ENV = 'GOALTRACKER_WATCHDOG'
+
+class MainLoopWatchdog:
+    """Debugging aid reporting when the main loop stops responding
+
+    A timeout on the main loop updates a heartbeat, which a background
+    thread checks. When no beat came within the threshold, the thread takes
+    the Python stack of the main thread, and samples it again while the
+    stall lasts. Once the loop runs again, the stall is written with the
+    handler it happened in, e.g. on_goal_toggled, and the stacks to
+    stalls.log in the cache directory, which is rotated.
+    """
+
+    DEFAULT_THRESHOLD_MS = 50
+    MIN_THRESHOLD_MS = 20
+
+    # Stacks taken at most per stall
+    MAX_SAMPLES = 5
+
+    LOG_SIZE = 512 * 1024
+    LOG_BACKUPS = 3
+
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS):
+        self.threshold = threshold_ms / 1000
+        # Beats come more often than the threshold to keep the error small
+        self.interval = max(threshold_ms // 5, 10) / 1000
+        self.last_beat = time.monotonic()
+        self.main_thread_id = threading.main_thread().ident
+        self.beat_source = None
+        self.thread = None
+        self.stopping = threading.Event()
+        self.logger = None
+
+    @classmethod
+    def requested_threshold(cls):
+        """Get the stall threshold in ms asked for with GOALTRACKER_WATCHDOG
+
+        The variable holds the threshold, or 1 for the default. Returns None
+        when the watchdog was not asked for.
+        """
+        value = os.environ.get(WATCHDOG_ENV)
+        if not value:
+            return None
+        if value in ('1', 'true', 'yes'):
+            return cls.DEFAULT_THRESHOLD_MS
+        try:
+            return max(int(value), cls.MIN_THRESHOLD_MS)
+        except ValueError:
+            print(f"Invalid {WATCHDOG_ENV} value '{value}', using the default threshold")
+            return cls.DEFAULT_THRESHOLD_MS
+
+    def start(self):
+        """Start the heartbeat and the watching thread"""
+        if self.thread is not None:
+            return
+        self.logger = self.create_logger()
+        self.last_beat = time.monotonic()
+        self.beat_source = GLib.timeout_add(
+            int(self.interval * 1000), self.beat, priority=GLib.PRIORITY_HIGH
+        )
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.watch, name='main-loop-watchdog', daemon=True)
+        self.thread.start()
+        print(f"Watching for main loop stalls over {self.threshold * 1000:.0f} ms")
+
+    def stop(self):
+        """Stop watching"""
+        if self.thread is None:
+            return
+        self.stopping.set()
+        GLib.source_remove(self.beat_source)
+        self.beat_source = None
+        self.thread = None
+
+    def create_logger(self):
+        """Create the logger writing to the rotated stall log"""
+        logger = logging.getLogger('goaltracker.stalls')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        if not logger.handlers:
+            os.makedirs(paths.cache_dir(), exist_ok=True)
+            handler = RotatingFileHandler(
+                os.path.join(paths.cache_dir(), 'stalls.log'),
+                maxBytes=self.LOG_SIZE,
+                backupCount=self.LOG_BACKUPS
+            )
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            logger.addHandler(handler)
+        return logger
+
+    def beat(self):
+        """Note that the main loop is running, in the main thread"""
+        self.last_beat = time.monotonic()
+        return GLib.SOURCE_CONTINUE
+
+    def watch(self):
+        """Check the heartbeat, in the background thread"""
+        stalled_beat = None
+        samples = []
+        next_sample = 0
+
+        while not self.stopping.wait(self.interval):
+            last_beat = self.last_beat
+            now = time.monotonic()
+
+            if stalled_beat is not None and last_beat != stalled_beat:
+                # The loop runs again
+                self.report(last_beat - stalled_beat - self.interval, samples)
+                stalled_beat = None
+                samples = []
+
+            if now - last_beat < self.threshold + self.interval:
+                continue
+
+            if stalled_beat is None:
+                stalled_beat = last_beat
+                next_sample = now
+            if now >= next_sample and len(samples) < self.MAX_SAMPLES:
+                sample = self.sample_main_thread()
+                if sample is not None:
+                    samples.append((now - last_beat - self.interval, sample))
+                next_sample = now + self.threshold
+
+    def sample_main_thread(self):
+        """Get the running handler and the formatted stack of the main thread
+
+        Taken right away, since the frames go on running.
+        """
+        frame = sys._current_frames().get(self.main_thread_id)
+        if frame is None:
+            return None
+        frames = []
+        while frame is not None:
+            frames.append((frame, frame.f_lineno))
+            frame = frame.f_back
+        frames.reverse()
+        stack = ''.join(traceback.StackSummary.extract(frames).format())
+        return self.find_handler(frames), stack
+
+    @staticmethod
+    def find_handler(frames):
+        """Get the outermost signal handler among frames, as 'name (file:line)'"""
+        for frame, lineno in frames:
+            if frame.f_code.co_name.startswith('on_'):
+                name = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+                return f"{name} ({os.path.basename(frame.f_code.co_filename)}:{lineno})"
+        return None
+
+    def report(self, duration, samples):
+        """Log a stall with the stacks taken during it"""
+        if not samples:
+            return
+
+        handler = samples[0][1][0]
+        where = f"in {handler}" if handler else "outside a handler"
+        lines = [f"Main loop stalled for {duration * 1000:.0f} ms {where}"]
+
+        previous = None
+        for offset, (_, stack) in samples:
+            if stack == previous:
+                lines.append(f"Same stack after {offset * 1000:.0f} ms")
+                continue
+            previous = stack
+            lines.append(f"Stack of the main thread after {offset * 1000:.0f} ms:")
+            lines.append(stack.rstrip())
+
+        print(lines[0])
+        self.logger.info('\n'.join(lines))
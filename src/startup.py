@@ -0,0 +1,143 @@
+"""Startup timing and the startup profile
+
+START_TIME is taken when the package is first imported, which main.py does
+before anything else.
+
+With the --profile-startup flag or the GOALTRACKER_PROFILE_STARTUP
+environment variable, the phases of startup are recorded and written as a
+JSON report once the window is shown. The report goes to the cache
+directory, or to the path given as --profile-startup=PATH or as the value
+of the variable.
+"""
+
+import time
+
+# Taken before anything else is imported
+START_TIME = time.perf_counter()
+
+import os
+import sys
+import json
+from contextlib import contextmanager
+from datetime import datetime
+
+from .core import paths
+
+PROFILE_FLAG = '--profile-startup'
+PROFILE_ENV = 'GOALTRACKER_PROFILE_STARTUP'
+
+# Recorded phases as (name, start, end) in perf_counter seconds
+phases = []
+
+# Where to write the report: None when not profiling, '' for the default
+profile_path = os.environ.get(PROFILE_ENV) or None
+if profile_path in ('1', 'true', 'yes'):
+    profile_path = ''
+
+
+def elapsed_ms():
+    """Get the milliseconds since the application started"""
+    return (time.perf_counter() - START_TIME) * 1000
+
+
+def configure(args):
+    """Turn profiling on if requested on the command line
+
+    Returns the arguments without the profiling flag, which GTK would not
+    understand.
+    """
+    global profile_path
+    remaining = []
+    for arg in args:
+        if arg == PROFILE_FLAG:
+            profile_path = profile_path or ''
+        elif arg.startswith(PROFILE_FLAG + '='):
+            profile_path = arg[len(PROFILE_FLAG) + 1:]
+        else:
+            remaining.append(arg)
+    return remaining
+
+
+def is_profiling():
+    """Check whether the startup profile is being recorded"""
+    return profile_path is not None
+
+
+@contextmanager
+def phase(name):
+    """Record how long the enclosed startup phase takes"""
+    if profile_path is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases.append((name, start, time.perf_counter()))
+
+
+def mark(name):
+    """Record a point in time during startup"""
+    if profile_path is not None:
+        now = time.perf_counter()
+        phases.append((name, now, now))
+
+
+def interpreter_start_time():
+    """Get when the process started on the perf_counter clock, if known
+
+    Linux reports the start of a process in clock ticks since boot, which
+    can be related to the monotonic clock through /proc/uptime.
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            # The command name may contain spaces, so count from its end
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        started = int(fields[19]) / os.sysconf('SC_CLK_TCK')
+        return time.perf_counter() - (uptime - started)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def write_report():
+    """Write the recorded phases as a JSON report and return its path"""
+    if profile_path is None:
+        return None
+
+    interpreter_start = interpreter_start_time()
+    origin = interpreter_start if interpreter_start is not None else START_TIME
+
+    def ms(value):
+        return round((value - origin) * 1000, 3)
+
+    report = {
+        'version': 1,
+        'clock': 'monotonic',
+        'origin': 'interpreter-start' if interpreter_start is not None else 'package-import',
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'marks': {
+            'interpreter-start': 0.0 if interpreter_start is not None else None,
+            'package-import': ms(START_TIME)
+        },
+        'phases': [
+            {'name': name, 'start_ms': ms(start), 'end_ms': ms(end), 'duration_ms': round((end - start) * 1000, 3)}
+            for name, start, end in phases
+        ]
+    }
+    report['total_ms'] = max((entry['end_ms'] for entry in report['phases']), default=0.0)
+
+    path = profile_path or os.path.join(
+        paths.cache_dir(), f"startup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Startup profile written to {path}")
+    except OSError as e:
+        print(f"Error writing startup profile: {e}")
+        return None
+    return path
@@ -2,5 +2,7 @@
 
 from .goal import GoalWidget
 from .step import StepWidget
+from .transfer_menu import TransferMenuButton
+from .archive import ArchiveSection
 
-__all__ = ['GoalWidget', 'StepWidget']
\ No newline at end of file
+__all__ = ['GoalWidget', 'StepWidget', 'TransferMenuButton', 'ArchiveSection']
\ No newline at end of file
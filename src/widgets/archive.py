@@ -0,0 +1,131 @@
+from gi.repository import Gtk, Pango
+
+from ..core import archive
+
+class ArchiveSection(Gtk.Box):
+    """Expandable section below the goals with the archived goals of the list
+
+    Nothing is read from the archive until the section is expanded, and
+    then only a page of goals at a time.
+    """
+
+    def __init__(self, parent_window):
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        self.parent_window = parent_window
+        self.list_id = None
+        # Goals shown, to continue from with "Show more"
+        self.shown = 0
+        self.add_css_class('archive-section')
+
+        self.expander = Gtk.Expander()
+        self.expander.connect('notify::expanded', self.on_expanded)
+        self.append(self.expander)
+
+        content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        self.expander.set_child(content)
+
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text("Search archived goals")
+        self.search_entry.connect('search-changed', self.on_search_changed)
+        content.append(self.search_entry)
+
+        self.rows_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        content.append(self.rows_box)
+
+        self.more_button = Gtk.Button(label="Show more")
+        self.more_button.add_css_class('flat')
+        self.more_button.connect('clicked', self.on_more_clicked)
+        content.append(self.more_button)
+
+        self.set_visible(False)
+
+    def show_list(self, list_id):
+        """Show the archive of another list, collapsed"""
+        self.list_id = list_id
+        self.expander.set_expanded(False)
+        self.search_entry.set_text("")
+        self.clear_rows()
+        self.update_title()
+
+    def update_title(self):
+        """Show the number of archived goals, hiding the section without any"""
+        count = self.parent_window.list_manager.archive.count(self.list_id) if self.list_id else 0
+        self.expander.set_label(f"Archived goals ({count})")
+        self.set_visible(count > 0)
+        return count
+
+    def clear_rows(self):
+        while True:
+            child = self.rows_box.get_first_child()
+            if child is None:
+                break
+            self.rows_box.remove(child)
+        self.shown = 0
+
+    def load_page(self):
+        """Add the next page of archived goals, or of the search results"""
+        list_archive = self.parent_window.list_manager.archive
+        text = self.search_entry.get_text().strip()
+        if text:
+            # Searches show a single page of the most recent matches
+            goals = list_archive.search(self.list_id, text)
+            has_more = False
+        else:
+            goals = list_archive.page(self.list_id, self.shown, archive.PAGE_SIZE + 1)
+            has_more = len(goals) > archive.PAGE_SIZE
+            goals = goals[:archive.PAGE_SIZE]
+        for goal in goals:
+            self.rows_box.append(self.create_row(goal))
+        self.shown += len(goals)
+        self.more_button.set_visible(has_more)
+
+    def create_row(self, goal):
+        """Create a read-only row for an archived goal"""
+        row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        row.add_css_class('archived-goal-row')
+
+        title_label = Gtk.Label(label=goal.get('title', ''))
+        title_label.set_xalign(0)
+        title_label.set_hexpand(True)
+        title_label.set_ellipsize(Pango.EllipsizeMode.END)
+        if goal.get('completed'):
+            title_label.add_css_class('completed')
+        row.append(title_label)
+
+        completed_on = goal.get(archive.COMPLETED_ON_KEY)
+        if completed_on:
+            date_label = Gtk.Label(label=f"Completed {completed_on}")
+            date_label.add_css_class('dim-label')
+            row.append(date_label)
+
+        restore_button = Gtk.Button(label="Restore")
+        restore_button.add_css_class('flat')
+        restore_button.set_tooltip_text("Move the goal back into the list")
+        restore_button.connect('clicked', self.on_restore_clicked, goal.get('id'), row)
+        row.append(restore_button)
+
+        return row
+
+    def on_expanded(self, expander, param):
+        """Read the first page when the section is opened"""
+        self.clear_rows()
+        if expander.get_expanded():
+            self.load_page()
+
+    def on_search_changed(self, entry):
+        if self.expander.get_expanded():
+            self.clear_rows()
+            self.load_page()
+
+    def on_more_clicked(self, button):
+        self.load_page()
+
+    def on_restore_clicked(self, button, goal_id, row):
+        """Bring an archived goal back into the list"""
+        window = self.parent_window
+        if window.list_manager.restore_archived(self.list_id, goal_id) is None:
+            return
+        self.rows_box.remove(row)
+        self.shown -= 1
+        self.update_title()
+        window.reconcile_goals()
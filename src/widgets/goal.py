@@ -1,18 +1,30 @@
-from datetime import datetime
-from gi.repository import Gtk, Pango
+import weakref
+from datetime import date
+from gi.repository import Gtk, Gdk, GObject, Pango
 
-from ..dialogs.goal_dialog import GoalDialog
-from ..dialogs.confirm_dialog import ConfirmDialog
+from ..core import metrics, model, ordering, recording, tracing
 from .step import StepWidget
+from .transfer_menu import TransferMenuButton
+
+WIDGETS_CREATED = metrics.counter('goaltracker_goal_widgets_created_total', "Goal widgets constructed")
+WIDGETS_DESTROYED = metrics.counter('goaltracker_goal_widgets_destroyed_total', "Goal widgets freed")
 
 class GoalWidget(Gtk.Box):
     """Widget representing a goal with its steps"""
     
+    @tracing.traced()
     def __init__(self, goal_data, parent_window, list_id):
         super().__init__(orientation=Gtk.Orientation.VERTICAL)
         self.goal_data = goal_data
         self.parent_window = parent_window
         self.list_id = list_id
+        WIDGETS_CREATED.inc()
+        weakref.finalize(self, WIDGETS_DESTROYED.inc)
+        
+        # Step widgets of this goal, by id() of their step data
+        self.step_widgets = {}
+        # Signal handlers to disconnect on teardown, as (object, handler ID)
+        self.handlers = []
 
         self.build_ui()
         self.load_steps()
@@ -27,28 +39,44 @@ class GoalWidget(Gtk.Box):
         # Left side box (number, checkbox, title)
         left_box = self.create_left_box()
         goal_row.append(left_box)
+
+        # Completed steps out of all, hidden without steps
+        self.progress_bar = Gtk.ProgressBar()
+        self.progress_bar.add_css_class('step-progress')
+        self.progress_bar.set_valign(Gtk.Align.CENTER)
+        goal_row.append(self.progress_bar)
+        self.update_progress()
         
         # Deadline label (if exists)
-        if 'deadline' in self.goal_data and self.goal_data['deadline']:
+        if self.goal_data.deadline_ordinal is not None:
             deadline_box = self.create_deadline_label(
-                self.goal_data['deadline'],
+                self.goal_data.deadline_ordinal,
                 self.goal_data['completed']
             )
             goal_row.append(deadline_box)
 
         # Buttons
-        button_box = self.create_button_box()
-        goal_row.append(button_box)
+        self.button_box = self.create_button_box()
+        goal_row.append(self.button_box)
 
         # Steps container
         self.steps_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         self.append(self.steps_box)
 
+        self.setup_drag_and_drop(goal_row)
+        self.setup_selection(goal_row)
+
     def create_left_box(self):
         """Create the left side of the goal row with number, checkbox, and title"""
         left_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
         left_box.set_hexpand(True)
 
+        # Drag handle
+        self.drag_handle = Gtk.Image.new_from_icon_name('list-drag-handle-symbolic')
+        self.drag_handle.add_css_class('drag-handle')
+        self.drag_handle.set_tooltip_text("Drag to reorder")
+        left_box.append(self.drag_handle)
+
         # Number label
         self.number_label = Gtk.Label()
         self.number_label.add_css_class('goal-number')
@@ -57,7 +85,7 @@ class GoalWidget(Gtk.Box):
         # Checkbox
         self.check = Gtk.CheckButton()
         self.check.set_active(self.goal_data['completed'])
-        self.check.connect('toggled', self.on_goal_toggled)
+        self.check_handler = self.connect_handler(self.check, 'toggled', self.on_goal_toggled)
         left_box.append(self.check)
 
         # Goal title
@@ -94,25 +122,30 @@ class GoalWidget(Gtk.Box):
         add_step_button = Gtk.Button(label="Add Step")
         add_step_button.add_css_class('action-button')
         add_step_button.add_css_class('edit-button')
-        add_step_button.connect('clicked', self.on_add_step_clicked)
+        self.connect_handler(add_step_button, 'clicked', self.on_add_step_clicked)
         button_box.append(add_step_button)
 
         edit_button = Gtk.Button(label="Edit")
         edit_button.add_css_class('action-button')
         edit_button.add_css_class('edit-button')
-        edit_button.connect('clicked', self.on_edit_clicked)
+        self.connect_handler(edit_button, 'clicked', self.on_edit_clicked)
         button_box.append(edit_button)
 
         delete_button = Gtk.Button(label="Delete")
         delete_button.add_css_class('action-button')
         delete_button.add_css_class('delete-button')
-        delete_button.connect('clicked', self.on_delete_clicked)
+        self.connect_handler(delete_button, 'clicked', self.on_delete_clicked)
         button_box.append(delete_button)
 
+        self.transfer_button = TransferMenuButton(
+            self.parent_window.list_manager, self.list_id, self.on_transfer
+        )
+        button_box.append(self.transfer_button)
+
         return button_box
 
-    def create_deadline_label(self, deadline_date_str, is_completed=False):
-        """Create a deadline label with appropriate styling"""
+    def create_deadline_label(self, deadline_ordinal, is_completed=False):
+        """Create a deadline label with appropriate styling for a date ordinal"""
         deadline_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
         deadline_box.add_css_class('deadline-box')
         
@@ -121,8 +154,7 @@ class GoalWidget(Gtk.Box):
             deadline_label.add_css_class('deadline-label')
             deadline_label.add_css_class('deadline-completed')
         else:
-            deadline_date = datetime.strptime(deadline_date_str, "%Y-%m-%d").date()
-            days_left = (deadline_date - datetime.now().date()).days
+            days_left = deadline_ordinal - date.today().toordinal()
             
             if days_left < 0:
                 css_class = 'deadline-overdue'
@@ -141,17 +173,132 @@ class GoalWidget(Gtk.Box):
         deadline_box.append(deadline_label)
         return deadline_box
 
+    def setup_drag_and_drop(self, goal_row):
+        """Allow reordering goals by dragging them by their handle"""
+        drag_source = Gtk.DragSource()
+        drag_source.set_actions(Gdk.DragAction.MOVE)
+        self.connect_handler(drag_source, 'prepare', self.on_drag_prepare)
+        self.drag_handle.add_controller(drag_source)
+
+        drop_target = Gtk.DropTarget.new(GObject.TYPE_STRING, Gdk.DragAction.MOVE)
+        self.connect_handler(drop_target, 'drop', self.on_drop)
+        goal_row.add_controller(drop_target)
+
+    def setup_selection(self, goal_row):
+        """Allow picking this goal by clicking its row in selection mode"""
+        self.selected = False
+        gesture = Gtk.GestureClick()
+        gesture.set_propagation_phase(Gtk.PropagationPhase.CAPTURE)
+        self.connect_handler(gesture, 'pressed', self.on_row_pressed)
+        goal_row.add_controller(gesture)
+
+    def connect_handler(self, obj, signal, callback):
+        """Connect a signal of one of the goal's parts, to be disconnected on teardown"""
+        handler = obj.connect(signal, callback)
+        self.handlers.append((obj, handler))
+        return handler
+
+    def teardown(self):
+        """Release the widget and its steps once it left the view
+
+        Handlers connected to bound methods keep the widget alive from the
+        C side, where Python's garbage collector cannot see them, so they
+        are disconnected and the references to the window dropped.
+        """
+        for step_widget in self.step_widgets.values():
+            step_widget.teardown()
+        self.step_widgets = {}
+        for obj, handler in self.handlers:
+            obj.disconnect(handler)
+        self.handlers = []
+        self.transfer_button.teardown()
+        self.parent_window = None
+
+    def set_selection_mode(self, active):
+        """Lock the goal's own controls while goals are being selected"""
+        self.check.set_sensitive(not active)
+        self.button_box.set_sensitive(not active)
+        self.drag_handle.set_visible(not active)
+        if not active:
+            self.set_selected(False)
+
+    def set_selected(self, selected):
+        """Show whether the goal is part of the selection"""
+        self.selected = selected
+        if selected:
+            self.get_first_child().add_css_class('selected')
+        else:
+            self.get_first_child().remove_css_class('selected')
+
+    def refresh(self):
+        """Update the goal row after its data was changed elsewhere"""
+        with self.check.handler_block(self.check_handler):
+            self.check.set_active(self.goal_data['completed'])
+        self.label.set_text(self.goal_data['title'])
+        self.update_label_style()
+        self.update_deadline_display()
+        self.sync_steps()
+        self.update_progress()
+
+    def sync_steps(self):
+        """Bring the step widgets in line with the goal's steps"""
+        steps = self.goal_data.get('steps', [])
+        present = {id(step) for step in steps}
+        for key in [key for key in self.step_widgets if key not in present]:
+            step_widget = self.step_widgets.pop(key)
+            self.steps_box.remove(step_widget)
+            step_widget.teardown()
+        
+        completed_last = self.parent_window.settings.get('auto_sort_items')
+        prev_widget = None
+        for step in ordering.sorted_items(steps, completed_last):
+            step_widget = self.step_widgets.get(id(step))
+            if step_widget is None:
+                step_widget = self.create_step_widget(step)
+                self.steps_box.insert_child_after(step_widget, prev_widget)
+            else:
+                step_widget.refresh()
+                if step_widget.get_prev_sibling() is not prev_widget:
+                    self.steps_box.reorder_child_after(step_widget, prev_widget)
+            prev_widget = step_widget
+        
+        self.update_step_numbers()
+
     def load_steps(self):
         """Load existing steps for this goal"""
-        for step in self.goal_data.get('steps', []):
-            self.add_step_widget(step)
+        completed_last = self.parent_window.settings.get('auto_sort_items')
+        for step in ordering.sorted_items(self.goal_data.get('steps', []), completed_last):
+            self.steps_box.append(self.create_step_widget(step))
+        self.update_step_numbers()
+
+    def create_step_widget(self, step_data):
+        """Create a widget for a step and remember it by its data"""
+        step_widget = StepWidget(step_data, self)
+        self.step_widgets[id(step_data)] = step_widget
+        return step_widget
 
     def add_step_widget(self, step_data):
         """Add a new step widget to the goal"""
-        step_widget = StepWidget(step_data, self)
-        self.steps_box.append(step_widget)
+        self.position_step_widget(self.create_step_widget(step_data))
+        self.update_step_numbers()
+
+    def remove_step_widget(self, step_widget):
+        """Remove a step widget from the goal"""
+        self.step_widgets.pop(id(step_widget.step_data), None)
+        self.steps_box.remove(step_widget)
+        step_widget.teardown()
         self.update_step_numbers()
-        self.parent_window.list_manager.save_lists()
+
+    def position_step_widget(self, step_widget):
+        """Place a step widget right after the step displayed before it"""
+        completed_last = self.parent_window.settings.get('auto_sort_items')
+        prev_step = ordering.preceding_item(self.goal_data['steps'], step_widget.step_data, completed_last)
+        prev_widget = self.step_widgets.get(id(prev_step)) if prev_step is not None else None
+        
+        if step_widget.get_parent() is None:
+            self.steps_box.insert_child_after(step_widget, prev_widget)
+        else:
+            self.steps_box.reorder_child_after(step_widget, prev_widget)
 
     def update_label_style(self):
         """Update the label style based on completion status"""
@@ -160,6 +307,14 @@ class GoalWidget(Gtk.Box):
         else:
             self.label.remove_css_class('completed')
 
+    def update_progress(self):
+        """Show the share of completed steps, counted by the list manager"""
+        done, total = self.parent_window.list_manager.progress.step_progress(self.goal_data)
+        self.progress_bar.set_visible(total > 0)
+        if total:
+            self.progress_bar.set_fraction(done / total)
+            self.progress_bar.set_tooltip_text(f"{done} of {total} steps completed")
+
     def update_number(self, number):
         """Update the displayed number"""
         self.number_label.set_text(f"{number}.")
@@ -173,63 +328,49 @@ class GoalWidget(Gtk.Box):
     # Event Handlers
     def on_goal_toggled(self, button):
         """Handle goal completion toggle"""
-        self.goal_data['completed'] = button.get_active()
+        started = recording.now()
+        list_manager = self.parent_window.list_manager
+        list_manager.update_goal(self.list_id, self.goal_data, completed=button.get_active())
         self.update_label_style()
-        
-        # Update deadline display if it exists
-        if 'deadline' in self.goal_data and self.goal_data['deadline']:
-            goal_row = self.get_first_child()
-            
-            # Find and remove old deadline box
-            child = goal_row.get_first_child()
-            while child is not None:
-                next_child = child.get_next_sibling()
-                if isinstance(child, Gtk.Box) and 'deadline-box' in child.get_css_classes():
-                    goal_row.remove(child)
-                    break
-                child = next_child
-            
-            # Add new deadline box
-            deadline_box = self.create_deadline_label(
-                self.goal_data['deadline'], 
-                self.goal_data['completed']
-            )
-            # Insert before the button box
-            button_box = goal_row.get_last_child()
-            goal_row.insert_child_after(deadline_box, button_box.get_prev_sibling())
+        self.update_deadline_display()
         
         self.parent_window.handle_completion(self, is_goal=True)
-        self.parent_window.list_manager.save_lists()
+        recording.record(
+            'toggle_goal', started, list=self.list_id, goal=self.goal_data.get('id'), completed=button.get_active()
+        )
 
     def on_add_step_clicked(self, button):
         """Handle add step button click"""
+        from ..dialogs import GoalDialog
         dialog = GoalDialog(self.parent_window, "Add Step", "")
         dialog.connect('response', self.on_add_step_response)
         dialog.present()
 
     def on_add_step_response(self, dialog, response):
         """Handle response from add step dialog"""
+        started = recording.now()
         if response == Gtk.ResponseType.OK:
             step_text = dialog.entry.get_text()
             step_deadline = dialog.get_deadline()
             if step_text:
-                step_data = {
-                    'text': step_text, 
-                    'completed': False,
-                    'deadline': step_deadline
-                }
-                if 'steps' not in self.goal_data:
-                    self.goal_data['steps'] = []
-                self.goal_data['steps'].append(step_data)
+                step_data = model.Step(text=step_text, completed=False, deadline=step_deadline)
+                self.parent_window.list_manager.add_step_to_goal(self.list_id, self.goal_data, step_data)
                 self.add_step_widget(step_data)
-                self.parent_window.list_manager.save_lists()
+                recording.record(
+                    'add_step', started, list=self.list_id, goal=self.goal_data.get('id'),
+                    step=step_data.get('id'), text=step_text, deadline=step_deadline
+                )
         dialog.destroy()
 
     def on_edit_clicked(self, button):
         """Handle edit button click"""
-        current_position = self.parent_window.goals.index(self.goal_data) + 1
+        completed_last = self.parent_window.settings.get('auto_sort_items')
+        current_position = ordering.display_index(
+            self.parent_window.goals, self.goal_data, completed_last
+        ) + 1
         max_position = len(self.parent_window.goals)
         
+        from ..dialogs import GoalDialog
         dialog = GoalDialog(
             self.parent_window,
             "Edit Goal",
@@ -243,87 +384,120 @@ class GoalWidget(Gtk.Box):
 
     def on_edit_response(self, dialog, response):
         """Handle response from edit dialog"""
+        started = recording.now()
         if response == Gtk.ResponseType.OK:
             new_text = dialog.entry.get_text()
             new_position = dialog.get_position()
             new_deadline = dialog.get_deadline()
             
             if new_text:
-                # Update the goal data
-                self.goal_data['title'] = new_text
-                self.goal_data['deadline'] = new_deadline
-                
-                # Handle position change if needed
-                if new_position is not None:
-                    current_position = self.parent_window.goals.index(self.goal_data)
-                    target_position = new_position - 1
+                # Update the goal data, saved and undone as one change
+                moved_to = None
+                list_manager = self.parent_window.list_manager
+                with list_manager.batch():
+                    list_manager.update_goal(
+                        self.list_id, self.goal_data, title=new_text, deadline=new_deadline
+                    )
                     
-                    if target_position != current_position:
-                        self.handle_position_change(current_position, target_position)
+                    # Handle position change if needed
+                    if new_position is not None:
+                        completed_last = self.parent_window.settings.get('auto_sort_items')
+                        current_position = ordering.display_index(
+                            self.parent_window.goals, self.goal_data, completed_last
+                        )
+                        target_position = new_position - 1
+                        
+                        if target_position != current_position:
+                            self.handle_position_change(target_position)
+                            moved_to = target_position
                 
                 # Update UI
                 self.label.set_text(new_text)
                 self.update_deadline_display()
-                
-                # Save changes
-                self.parent_window.list_manager.save_lists()
+                recording.record(
+                    'edit_goal', started, list=self.list_id, goal=self.goal_data.get('id'),
+                    title=new_text, deadline=new_deadline, position=moved_to
+                )
                 
         dialog.destroy()
 
-    def handle_position_change(self, current_position, target_position):
+    def handle_position_change(self, target_position):
         """Handle changing the position of the goal in the list"""
-        # Remove from current position
-        self.parent_window.goals.pop(current_position)
+        completed_last = self.parent_window.settings.get('auto_sort_items')
+        self.parent_window.list_manager.move_goal_to(
+            self.list_id, self.goal_data, target_position, completed_last
+        )
         
-        # Insert at new position
-        self.parent_window.goals.insert(target_position, self.goal_data)
+        self.parent_window.position_goal_widget(self)
+        self.parent_window.update_goal_numbers()
+
+    def on_drag_prepare(self, drag_source, x, y):
+        """Start dragging this goal"""
+        drag_source.set_icon(Gtk.WidgetPaintable.new(self.get_first_child()), x, y)
+        return Gdk.ContentProvider.new_for_value(
+            GObject.Value(GObject.TYPE_STRING, str(id(self.goal_data)))
+        )
+
+    def on_drop(self, drop_target, value, x, y):
+        """Move the dropped goal before or after this one"""
+        if not value.isdigit():
+            return False
         
-        # Update widget position
-        parent = self.get_parent()
-        if parent:
-            parent.remove(self)
-            
-            if target_position == 0:
-                parent.prepend(self)
-            else:
-                widget_count = 0
-                prev_widget = None
-                for child in parent:
-                    if isinstance(child, GoalWidget):
-                        if widget_count == target_position - 1:
-                            prev_widget = child
-                            break
-                        widget_count += 1
-                
-                if prev_widget:
-                    parent.insert_child_after(self, prev_widget)
-                else:
-                    parent.append(self)
+        dragged_widget = self.parent_window.goal_widgets.get(int(value))
+        if dragged_widget is None or dragged_widget is self:
+            return False
+        
+        started = recording.now()
+        after = y > drop_target.get_widget().get_height() / 2
+        self.parent_window.move_goal_widget(dragged_widget, self, after)
+        if started is not None:
+            completed_last = self.parent_window.settings.get('auto_sort_items')
+            recording.record(
+                'move_goal', started, list=self.list_id, goal=dragged_widget.goal_data.get('id'),
+                position=ordering.display_index(self.parent_window.goals, dragged_widget.goal_data, completed_last)
+            )
+        return True
 
     def update_deadline_display(self):
         """Update the deadline display in the UI"""
-        if 'deadline' in self.goal_data and self.goal_data['deadline']:
-            goal_row = self.get_first_child()
-            
-            # Remove old deadline box if exists
-            child = goal_row.get_first_child()
-            while child:
-                next_child = child.get_next_sibling()
-                if isinstance(child, Gtk.Box) and 'deadline-box' in child.get_css_classes():
-                    goal_row.remove(child)
-                    break
-                child = next_child
-            
-            # Add new deadline box
+        goal_row = self.get_first_child()
+        
+        # Remove old deadline box if exists
+        child = goal_row.get_first_child()
+        while child:
+            next_child = child.get_next_sibling()
+            if isinstance(child, Gtk.Box) and 'deadline-box' in child.get_css_classes():
+                goal_row.remove(child)
+                break
+            child = next_child
+        
+        # Add new deadline box if deadline exists
+        if self.goal_data.deadline_ordinal is not None:
             deadline_box = self.create_deadline_label(
-                self.goal_data['deadline'],
+                self.goal_data.deadline_ordinal,
                 self.goal_data['completed']
             )
-            button_box = goal_row.get_last_child()
-            goal_row.insert_child_after(deadline_box, button_box.get_prev_sibling())
+            goal_row.insert_child_after(deadline_box, self.button_box.get_prev_sibling())
+
+    def on_row_pressed(self, gesture, n_press, x, y):
+        """Toggle the selection of this goal when in selection mode"""
+        if not self.parent_window.selection_mode:
+            return
+        gesture.set_state(Gtk.EventSequenceState.CLAIMED)
+        self.parent_window.toggle_goal_selection(self)
+
+    def on_transfer(self, target_list_id, copy):
+        """Handle moving or copying the goal to another list"""
+        started = recording.now()
+        new_goals = self.parent_window.transfer_goal(self, target_list_id, copy)
+        recording.record(
+            'transfer_goal', started, list=self.list_id, goal=self.goal_data.get('id'),
+            target=target_list_id, copy=copy, new_goals=[goal.get('id') for goal in new_goals]
+        )
 
     def on_delete_clicked(self, button):
         """Handle delete button click"""
+        from ..dialogs import ConfirmDialog
         dialog = ConfirmDialog(
             self.parent_window,
             "Delete Goal",
@@ -335,5 +509,7 @@ class GoalWidget(Gtk.Box):
     def on_delete_confirmed(self, dialog, response):
         """Handle confirmation of goal deletion"""
         if response == Gtk.ResponseType.OK:
+            started = recording.now()
             self.parent_window.remove_goal(self)
+            recording.record('delete_goal', started, list=self.list_id, goal=self.goal_data.get('id'))
         dialog.destroy()
\ No newline at end of file
@@ -1,17 +1,26 @@
-from datetime import datetime
+import weakref
+from datetime import date
 from gi.repository import Gtk, Pango
 
-from ..dialogs.goal_dialog import GoalDialog
-from ..dialogs.confirm_dialog import ConfirmDialog
+from ..core import metrics, ordering, recording, tracing
+from .transfer_menu import TransferMenuButton
+
+WIDGETS_CREATED = metrics.counter('goaltracker_step_widgets_created_total', "Step widgets constructed")
+WIDGETS_DESTROYED = metrics.counter('goaltracker_step_widgets_destroyed_total', "Step widgets freed")
 
 class StepWidget(Gtk.Box):
     """Widget representing a step within a goal"""
     
+    @tracing.traced()
     def __init__(self, step_data, parent_goal):
         super().__init__(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
         self.step_data = step_data
         self.parent_goal = parent_goal
         self.add_css_class('step-row')
+        WIDGETS_CREATED.inc()
+        weakref.finalize(self, WIDGETS_DESTROYED.inc)
+        # Signal handlers to disconnect on teardown, as (object, handler ID)
+        self.handlers = []
 
         self.build_ui()
 
@@ -22,9 +31,9 @@ class StepWidget(Gtk.Box):
         self.append(left_box)
 
         # Deadline label (if exists)
-        if 'deadline' in self.step_data and self.step_data['deadline']:
+        if self.step_data.deadline_ordinal is not None:
             deadline_box = self.create_deadline_label(
-                self.step_data['deadline'],
+                self.step_data.deadline_ordinal,
                 self.step_data['completed']
             )
             self.append(deadline_box)
@@ -46,7 +55,7 @@ class StepWidget(Gtk.Box):
         # Checkbox
         self.check = Gtk.CheckButton()
         self.check.set_active(self.step_data['completed'])
-        self.check.connect('toggled', self.on_step_toggled)
+        self.check_handler = self.connect_handler(self.check, 'toggled', self.on_step_toggled)
         left_box.append(self.check)
 
         # Step text
@@ -83,19 +92,42 @@ class StepWidget(Gtk.Box):
         edit_button = Gtk.Button(label="Edit")
         edit_button.add_css_class('action-button')
         edit_button.add_css_class('edit-button')
-        edit_button.connect('clicked', self.on_edit_clicked)
+        self.connect_handler(edit_button, 'clicked', self.on_edit_clicked)
         button_box.append(edit_button)
 
         delete_button = Gtk.Button(label="Delete")
         delete_button.add_css_class('action-button')
         delete_button.add_css_class('delete-button')
-        delete_button.connect('clicked', self.on_delete_clicked)
+        self.connect_handler(delete_button, 'clicked', self.on_delete_clicked)
         button_box.append(delete_button)
 
+        # Steps moved or copied to a list become goals there
+        self.transfer_button = TransferMenuButton(
+            self.parent_goal.parent_window.list_manager,
+            self.parent_goal.list_id,
+            self.on_transfer
+        )
+        self.transfer_button.set_tooltip_text("Move or copy to a list as a goal")
+        button_box.append(self.transfer_button)
+
         return button_box
 
-    def create_deadline_label(self, deadline_date_str, is_completed=False):
-        """Create a deadline label with appropriate styling"""
+    def connect_handler(self, obj, signal, callback):
+        """Connect a signal of one of the step's parts, to be disconnected on teardown"""
+        handler = obj.connect(signal, callback)
+        self.handlers.append((obj, handler))
+        return handler
+
+    def teardown(self):
+        """Release the widget once it left the view, see ``GoalWidget.teardown``"""
+        for obj, handler in self.handlers:
+            obj.disconnect(handler)
+        self.handlers = []
+        self.transfer_button.teardown()
+        self.parent_goal = None
+
+    def create_deadline_label(self, deadline_ordinal, is_completed=False):
+        """Create a deadline label with appropriate styling for a date ordinal"""
         deadline_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
         deadline_box.add_css_class('deadline-box')
         
@@ -104,8 +136,7 @@ class StepWidget(Gtk.Box):
             deadline_label.add_css_class('deadline-label')
             deadline_label.add_css_class('deadline-completed')
         else:
-            deadline_date = datetime.strptime(deadline_date_str, "%Y-%m-%d").date()
-            days_left = (deadline_date - datetime.now().date()).days
+            days_left = deadline_ordinal - date.today().toordinal()
             
             if days_left < 0:
                 css_class = 'deadline-overdue'
@@ -135,6 +166,14 @@ class StepWidget(Gtk.Box):
         """Update the displayed number"""
         self.number_label.set_text(f"{number}.")
 
+    def refresh(self):
+        """Update the step row after its data was changed elsewhere"""
+        with self.check.handler_block(self.check_handler):
+            self.check.set_active(self.step_data['completed'])
+        self.label.set_text(self.step_data['text'])
+        self.update_label_style()
+        self.update_deadline_display()
+
     def update_deadline_display(self):
         """Update the deadline display in the UI"""
         # Find and remove old deadline box
@@ -147,9 +186,9 @@ class StepWidget(Gtk.Box):
             child = next_child
         
         # Add new deadline box if deadline exists
-        if 'deadline' in self.step_data and self.step_data['deadline']:
+        if self.step_data.deadline_ordinal is not None:
             deadline_box = self.create_deadline_label(
-                self.step_data['deadline'],
+                self.step_data.deadline_ordinal,
                 self.step_data['completed']
             )
             button_box = self.get_last_child()
@@ -158,18 +197,30 @@ class StepWidget(Gtk.Box):
     # Event Handlers
     def on_step_toggled(self, button):
         """Handle step completion toggle"""
-        self.step_data['completed'] = button.get_active()
+        started = recording.now()
+        list_manager = self.parent_goal.parent_window.list_manager
+        list_manager.update_step(
+            self.parent_goal.list_id, self.parent_goal.goal_data, self.step_data,
+            completed=button.get_active()
+        )
         self.update_label_style()
         self.update_deadline_display()
         
         self.parent_goal.parent_window.handle_completion(self, is_goal=False)
-        self.parent_goal.parent_window.list_manager.save_lists()
+        recording.record(
+            'toggle_step', started, list=self.parent_goal.list_id, goal=self.parent_goal.goal_data.get('id'),
+            step=self.step_data.get('id'), completed=button.get_active()
+        )
 
     def on_edit_clicked(self, button):
         """Handle edit button click"""
-        current_position = self.parent_goal.goal_data['steps'].index(self.step_data) + 1
+        completed_last = self.parent_goal.parent_window.settings.get('auto_sort_items')
+        current_position = ordering.display_index(
+            self.parent_goal.goal_data['steps'], self.step_data, completed_last
+        ) + 1
         max_position = len(self.parent_goal.goal_data['steps'])
         
+        from ..dialogs import GoalDialog
         dialog = GoalDialog(
             self.parent_goal.parent_window,
             "Edit Step",
@@ -184,65 +235,66 @@ class StepWidget(Gtk.Box):
 
     def on_edit_response(self, dialog, response):
         """Handle response from edit dialog"""
+        started = recording.now()
         if response == Gtk.ResponseType.OK:
             new_text = dialog.entry.get_text()
             new_position = dialog.get_position()
             new_deadline = dialog.get_deadline()
             
             if new_text:
-                self.step_data['text'] = new_text
-                self.step_data['deadline'] = new_deadline
-                
-                parent = self.get_parent()
-                if parent:
-                    parent.remove(self)
-                    new_widget = StepWidget(self.step_data, self.parent_goal)
-                    parent.append(new_widget)
+                moved_to = None
+                list_manager = self.parent_goal.parent_window.list_manager
+                with list_manager.batch():
+                    list_manager.update_step(
+                        self.parent_goal.list_id, self.parent_goal.goal_data, self.step_data,
+                        text=new_text, deadline=new_deadline
+                    )
+                    
+                    self.label.set_text(new_text)
+                    self.update_deadline_display()
                     
                     if new_position:
-                        current_position = self.parent_goal.goal_data['steps'].index(self.step_data)
+                        completed_last = self.parent_goal.parent_window.settings.get('auto_sort_items')
+                        current_position = ordering.display_index(
+                            self.parent_goal.goal_data['steps'], self.step_data, completed_last
+                        )
                         target_position = new_position - 1
                         
                         if current_position != target_position:
-                            self.handle_position_change(current_position, target_position, new_widget)
-                    
-                    # Update numbers for all steps
-                    self.parent_goal.update_step_numbers()
-                    
-                self.parent_goal.parent_window.list_manager.save_lists()
+                            self.handle_position_change(target_position)
+                            moved_to = target_position
+                recording.record(
+                    'edit_step', started, list=self.parent_goal.list_id, goal=self.parent_goal.goal_data.get('id'),
+                    step=self.step_data.get('id'), text=new_text, deadline=new_deadline, position=moved_to
+                )
         dialog.destroy()
 
-    def handle_position_change(self, current_position, target_position, widget):
+    def handle_position_change(self, target_position):
         """Handle changing the position of the step in the list"""
-        steps = self.parent_goal.goal_data['steps']
-        parent = widget.get_parent()
-        
-        # Update data
-        steps.pop(current_position)
-        steps.insert(target_position, self.step_data)
-        
-        # Update UI
-        parent.remove(widget)
+        completed_last = self.parent_goal.parent_window.settings.get('auto_sort_items')
+        self.parent_goal.parent_window.list_manager.move_step_to(
+            self.parent_goal.list_id, self.parent_goal.goal_data, self.step_data,
+            target_position, completed_last
+        )
         
-        if target_position == 0:
-            parent.prepend(widget)
-        else:
-            prev_widget = None
-            widget_count = 0
-            for child in parent:
-                if isinstance(child, StepWidget):
-                    if widget_count == target_position - 1:
-                        prev_widget = child
-                        break
-                    widget_count += 1
-                    
-            if prev_widget:
-                parent.insert_child_after(widget, prev_widget)
-            else:
-                parent.append(widget)
+        self.parent_goal.position_step_widget(self)
+        self.parent_goal.update_step_numbers()
+
+    def on_transfer(self, target_list_id, copy):
+        """Handle moving or copying the step to a list"""
+        started = recording.now()
+        # Moving the step tears this widget down
+        parent_goal = self.parent_goal
+        new_goal = parent_goal.parent_window.transfer_step(self, target_list_id, copy)
+        recording.record(
+            'transfer_step', started, list=parent_goal.list_id, goal=parent_goal.goal_data.get('id'),
+            step=self.step_data.get('id'), target=target_list_id, copy=copy,
+            new_goal=new_goal.get('id') if new_goal else None
+        )
 
     def on_delete_clicked(self, button):
         """Handle delete button click"""
+        from ..dialogs import ConfirmDialog
         dialog = ConfirmDialog(
             self.parent_goal.parent_window,
             "Delete Step",
@@ -254,8 +306,14 @@ class StepWidget(Gtk.Box):
     def on_delete_confirmed(self, dialog, response):
         """Handle confirmation of step deletion"""
         if response == Gtk.ResponseType.OK:
-            self.parent_goal.goal_data['steps'].remove(self.step_data)
-            self.parent_goal.steps_box.remove(self)
-            self.parent_goal.parent_window.list_manager.save_lists()
-            self.parent_goal.update_step_numbers()
+            started = recording.now()
+            parent_goal = self.parent_goal
+            parent_goal.parent_window.list_manager.remove_step(
+                parent_goal.list_id, parent_goal.goal_data, self.step_data
+            )
+            parent_goal.remove_step_widget(self)
+            recording.record(
+                'delete_step', started, list=parent_goal.list_id,
+                goal=parent_goal.goal_data.get('id'), step=self.step_data.get('id')
+            )
         dialog.destroy()
\ No newline at end of file
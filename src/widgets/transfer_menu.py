@@ -0,0 +1,71 @@
+from gi.repository import Gtk
+
+class TransferMenuButton(Gtk.MenuButton):
+    """Menu button offering to move or copy an item to another list"""
+
+    def __init__(self, list_manager, list_id, on_transfer, copy_to_same_list=True):
+        super().__init__()
+        self.list_manager = list_manager
+        self.list_id = list_id
+        self.on_transfer = on_transfer
+        self.copy_to_same_list = copy_to_same_list
+
+        self.set_icon_name('view-more-symbolic')
+        self.set_tooltip_text("Move or copy to another list")
+        self.add_css_class('flat')
+
+        popover = Gtk.Popover()
+        self.menu_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        self.menu_box.set_margin_top(6)
+        self.menu_box.set_margin_bottom(6)
+        popover.set_child(self.menu_box)
+        self.show_handler = popover.connect('show', self.on_popover_show)
+        self.set_popover(popover)
+
+    def teardown(self):
+        """Drop the destinations and the callback once the item left the view"""
+        self.get_popover().disconnect(self.show_handler)
+        self.clear_menu()
+        self.on_transfer = None
+        self.list_manager = None
+
+    def clear_menu(self):
+        """Remove the destination buttons"""
+        while True:
+            child = self.menu_box.get_first_child()
+            if child is None:
+                break
+            self.menu_box.remove(child)
+
+    def create_section(self, title, copy):
+        """Add a titled section with one button per destination list"""
+        title_label = Gtk.Label(label=title)
+        title_label.add_css_class('transfer-menu-title')
+        title_label.set_halign(Gtk.Align.START)
+        self.menu_box.append(title_label)
+
+        has_destinations = False
+        for list_data in self.list_manager.lists.values():
+            if list_data['id'] == self.list_id and not (copy and self.copy_to_same_list):
+                continue
+            button = Gtk.Button(label=list_data['name'])
+            button.add_css_class('flat')
+            button.connect('clicked', self.on_list_clicked, list_data['id'], copy)
+            self.menu_box.append(button)
+            has_destinations = True
+
+        if not has_destinations:
+            empty_label = Gtk.Label(label="No other lists")
+            empty_label.add_css_class('dim-label')
+            self.menu_box.append(empty_label)
+
+    def on_popover_show(self, popover):
+        """Rebuild the destinations since lists may have changed"""
+        self.clear_menu()
+        self.create_section("Move to", copy=False)
+        self.create_section("Copy to", copy=True)
+
+    def on_list_clicked(self, button, target_list_id, copy):
+        """Handle choosing a destination list"""
+        self.popdown()
+        self.on_transfer(target_list_id, copy)
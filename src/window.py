@@ -1,14 +1,15 @@
+import os
 from gi.repository import Gtk, GLib, Adw
 
-from .services.settings import Settings
-from .services.list_manager import ListManager
-from .services.daily_quote import DailyQuote
-from .widgets.goal import GoalWidget
-from .dialogs.about_dialog import AboutDialog
-from .dialogs.settings_dialog import SettingsDialog
-from .dialogs.goal_dialog import GoalDialog
-from .dialogs import ConfirmDialog
-from .widgets import GoalWidget, StepWidget
+from .core import Settings, ListManager, DailyQuote, metrics, model, ordering, recording, tracing
+from .services import ListsFileWatcher, MainLoopWatchdog
+from .config import FIRST_FRAME_BUDGET_MS
+from . import startup
+from .widgets import ArchiveSection, GoalWidget
+
+LIST_SWITCH_SECONDS = metrics.histogram(
+    'goaltracker_list_switch_seconds', "Time to show the goals of another list"
+)
 
 class GoalWindow(Adw.ApplicationWindow):
     """The main window of the application"""
@@ -16,16 +17,45 @@ class GoalWindow(Adw.ApplicationWindow):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
+        # Goal widgets of the current list, by id() of their goal data
+        self.goal_widgets = {}
+        
+        # Done/total badges of the sidebar rows, by list ID
+        self.list_badges = {}
+        
+        # Multi-selection of goals for bulk actions
+        self.selection_mode = False
+        self.selected_goal_ids = set()
+        
+        # Work left for after the first frame, to show the window sooner
+        self.deferred_tasks = []
+        self.first_frame_handler = None
+        self.startup_done = False
+        self.connect('realize', self.on_realize)
+        
         # Initialize services
-        self.settings = Settings()
+        with startup.phase('settings'):
+            self.settings = Settings()
         self.daily_quote = DailyQuote()
         self.list_manager = ListManager()
+        self.list_manager.history.set_memory_limit(
+            self.settings.get('undo_memory_limit_mb') * 1024 * 1024
+        )
+
+        # Debugging aid logging handlers that block the main loop, started
+        # after the first frame so startup itself is not reported
+        self.watchdog = None
+        stall_threshold = MainLoopWatchdog.requested_threshold()
+        if stall_threshold is not None:
+            self.watchdog = MainLoopWatchdog(stall_threshold)
+            self.deferred_tasks.append(self.watchdog.start)
 
         # Set up window properties
         self.setup_window()
         
         # Create UI components
-        self.create_layout()
+        with startup.phase('create-layout'):
+            self.create_layout()
         
         # Load initial data
         self.load_initial_data()
@@ -41,7 +71,11 @@ class GoalWindow(Adw.ApplicationWindow):
         # Main layout box
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         main_box.set_size_request(800, -1)
-        self.set_content(main_box)
+        
+        # Toast overlay for notifications
+        self.toast_overlay = Adw.ToastOverlay()
+        self.toast_overlay.set_child(main_box)
+        self.set_content(self.toast_overlay)
         
         # HeaderBar
         header_bar = self.create_header_bar()
@@ -76,6 +110,10 @@ class GoalWindow(Adw.ApplicationWindow):
         # Goals section
         self.create_goals_section()
         
+        # Bulk actions for selected goals
+        self.selection_bar = self.create_selection_bar()
+        self.content_box.append(self.selection_bar)
+        
     def create_header_bar(self):
         """Create the header bar with its buttons"""
         header_bar = Adw.HeaderBar()
@@ -92,6 +130,24 @@ class GoalWindow(Adw.ApplicationWindow):
         settings_button.connect('clicked', self.on_settings_clicked)
         header_bar.pack_start(settings_button)
         
+        # Statistics button
+        statistics_button = Gtk.Button(label="Statistics")
+        statistics_button.set_tooltip_text("Goals and steps completed over time")
+        statistics_button.connect('clicked', self.on_statistics_clicked)
+        header_bar.pack_start(statistics_button)
+        
+        # Import button
+        import_button = Gtk.Button(label="Import")
+        import_button.set_tooltip_text("Import goals from CSV, todo.txt, Markdown or JSON")
+        import_button.connect('clicked', self.on_import_clicked)
+        header_bar.pack_start(import_button)
+        
+        # Export button
+        self.export_button = Gtk.Button(label="Export")
+        self.export_button.set_tooltip_text("Export to Markdown, CSV, HTML or iCalendar")
+        self.export_button.connect('clicked', self.on_export_clicked)
+        header_bar.pack_start(self.export_button)
+        
         # Add goal button
         self.add_goal_button = Gtk.Button(label="Add Goal")
         self.add_goal_button.add_css_class('suggested-action')
@@ -99,7 +155,79 @@ class GoalWindow(Adw.ApplicationWindow):
         self.add_goal_button.set_sensitive(False)  # Initially disabled
         header_bar.pack_end(self.add_goal_button)
         
+        # Select goals button
+        self.select_button = Gtk.ToggleButton(label="Select")
+        self.select_button.connect('toggled', self.on_select_toggled)
+        self.select_button.set_sensitive(False)  # Initially disabled
+        header_bar.pack_end(self.select_button)
+        
         return header_bar
+
+    def create_selection_bar(self):
+        """Create the action bar with bulk actions for selected goals"""
+        action_bar = Gtk.ActionBar()
+        action_bar.set_revealed(False)
+        
+        self.selection_label = Gtk.Label(label="No goals selected")
+        action_bar.set_center_widget(self.selection_label)
+        
+        select_all_button = Gtk.Button(label="Select All")
+        select_all_button.connect('clicked', self.on_select_all_clicked)
+        action_bar.pack_start(select_all_button)
+        
+        complete_button = Gtk.Button(label="Complete")
+        complete_button.connect('clicked', self.on_bulk_complete_clicked, True)
+        action_bar.pack_start(complete_button)
+        
+        uncomplete_button = Gtk.Button(label="Uncomplete")
+        uncomplete_button.connect('clicked', self.on_bulk_complete_clicked, False)
+        action_bar.pack_start(uncomplete_button)
+        
+        delete_button = Gtk.Button(label="Delete")
+        delete_button.add_css_class('delete-button')
+        delete_button.connect('clicked', self.on_bulk_delete_clicked)
+        action_bar.pack_end(delete_button)
+        
+        # Move to another list
+        move_popover = Gtk.Popover()
+        self.move_lists_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        move_popover.set_child(self.move_lists_box)
+        move_popover.connect('show', self.on_move_popover_show)
+        
+        move_button = Gtk.MenuButton(label="Move to…")
+        move_button.set_popover(move_popover)
+        action_bar.pack_end(move_button)
+        
+        # Set or clear the deadline
+        deadline_popover = Gtk.Popover()
+        deadline_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        deadline_popover.set_child(deadline_box)
+        
+        self.bulk_calendar = Gtk.Calendar()
+        deadline_box.append(self.bulk_calendar)
+        
+        deadline_buttons = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        deadline_buttons.set_halign(Gtk.Align.END)
+        deadline_box.append(deadline_buttons)
+        
+        clear_deadline_button = Gtk.Button(label="Clear")
+        clear_deadline_button.connect('clicked', self.on_bulk_deadline_clicked, deadline_popover, True)
+        deadline_buttons.append(clear_deadline_button)
+        
+        set_deadline_button = Gtk.Button(label="Set Deadline")
+        set_deadline_button.add_css_class('suggested-action')
+        set_deadline_button.connect('clicked', self.on_bulk_deadline_clicked, deadline_popover, False)
+        deadline_buttons.append(set_deadline_button)
+        
+        deadline_button = Gtk.MenuButton(label="Deadline…")
+        deadline_button.set_popover(deadline_popover)
+        action_bar.pack_end(deadline_button)
+        
+        self.bulk_action_buttons = [
+            complete_button, uncomplete_button, delete_button, move_button, deadline_button
+        ]
+        
+        return action_bar
     
     def create_sidebar(self):
             """Create the sidebar for list management"""
@@ -143,12 +271,14 @@ class GoalWindow(Adw.ApplicationWindow):
     
     def on_add_list_clicked(self, button):
         """Handle adding a new list"""
+        from .dialogs import ListDialog
         dialog = ListDialog(self, "Add New List", "")
         dialog.connect('response', self.on_add_list_response)
         dialog.present()
 
     def on_add_list_response(self, dialog, response):
         """Handle response from add list dialog"""
+        started = recording.now()
         if response == Gtk.ResponseType.OK:
             list_name = dialog.entry.get_text()
             if list_name:
@@ -156,6 +286,7 @@ class GoalWindow(Adw.ApplicationWindow):
                 self.update_lists_sidebar()
                 # Select the new list
                 self.select_list(list_id)
+                recording.record('add_list', started, list=list_id, name=list_name)
         dialog.destroy()
 
     def create_list_row(self, list_data):
@@ -171,6 +302,14 @@ class GoalWindow(Adw.ApplicationWindow):
         label.set_hexpand(True)
         box.append(label)
         
+        # Completed goals out of all, and whether any are overdue, kept up
+        # to date by on_lists_changed
+        badge = Gtk.Label()
+        badge.add_css_class('list-badge')
+        self.list_badges[list_data['id']] = badge
+        self.update_list_badge(list_data['id'])
+        box.append(badge)
+        
         # Edit and delete buttons
         button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=4)
         button_box.set_halign(Gtk.Align.END)
@@ -192,6 +331,21 @@ class GoalWindow(Adw.ApplicationWindow):
         row.set_child(box)
         
         return row
+
+    def update_list_badge(self, list_id):
+        """Show the completed and total goals of a list in its sidebar row"""
+        badge = self.list_badges.get(list_id)
+        if badge is not None:
+            done, total = self.list_manager.progress.list_progress(list_id)
+            overdue = self.list_manager.overdue.get(list_id, 0)
+            badge.set_text(f"{done}/{total}")
+            tooltip = f"{done} of {total} goals completed"
+            if overdue:
+                badge.add_css_class('list-badge-overdue')
+                tooltip += f", {overdue} overdue"
+            else:
+                badge.remove_css_class('list-badge-overdue')
+            badge.set_tooltip_text(tooltip)
         
     def on_list_selected(self, list_box, row):
         """Handle list selection in sidebar"""
@@ -199,16 +353,22 @@ class GoalWindow(Adw.ApplicationWindow):
             return
         
         list_id = row.list_id
+        if getattr(self, 'current_list', None) is not None and self.current_list['id'] == list_id:
+            return
+        started = recording.now()
         self.select_list(list_id)
+        recording.record('select_list', started, list=list_id)
 
     def on_edit_list_clicked(self, button, list_data):
         """Handle editing a list"""
+        from .dialogs import ListDialog
         dialog = ListDialog(self, "Edit List", list_data['name'])
         dialog.connect('response', lambda d, r: self.on_edit_list_response(d, r, list_data['id']))
         dialog.present()
 
     def on_edit_list_response(self, dialog, response, list_id):
         """Handle response from edit list dialog"""
+        started = recording.now()
         if response == Gtk.ResponseType.OK:
             new_name = dialog.entry.get_text()
             if new_name:
@@ -216,10 +376,12 @@ class GoalWindow(Adw.ApplicationWindow):
                 self.update_lists_sidebar()
                 if hasattr(self, 'current_list') and self.current_list['id'] == list_id:
                     self.goals_title.set_text(f"{new_name} goals:")
+                recording.record('edit_list', started, list=list_id, name=new_name)
         dialog.destroy()
 
     def on_delete_list_clicked(self, button, list_data):
         """Handle deleting a list"""
+        from .dialogs import ConfirmDialog
         dialog = ConfirmDialog(
             self,
             "Delete List",
@@ -230,20 +392,27 @@ class GoalWindow(Adw.ApplicationWindow):
 
     def on_delete_list_confirmed(self, dialog, response, list_id):
         """Handle confirmation of list deletion"""
+        started = recording.now()
         if response == Gtk.ResponseType.OK:
+            list_name = self.list_manager.lists[list_id]['name']
             self.list_manager.delete_list(list_id)
             self.update_lists_sidebar()
+            self.show_undo_toast(f"Deleted list “{list_name}”")
             
             # Select first available list or clear goals
             if self.list_manager.lists:
                 first_list = next(iter(self.list_manager.lists.values()))
                 self.select_list(first_list['id'])
             else:
+                self.select_button.set_active(False)
                 self.current_list = None
                 self.goals = []
                 self.clear_goals()
+                self.archive_section.show_list(None)
                 self.update_empty_state()
                 self.add_goal_button.set_sensitive(False)
+                self.select_button.set_sensitive(False)
+            recording.record('delete_list', started, list=list_id)
         
         dialog.destroy()
     
@@ -252,22 +421,30 @@ class GoalWindow(Adw.ApplicationWindow):
         quote_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         quote_box.add_css_class('quote-section')
         
-        quote_data = self.daily_quote.get_daily_quote()
-        
-        quote_text = Gtk.Label()
-        quote_text.set_markup(f'<span font_size="large">\"{quote_data["text"]}\"</span>')
-        quote_text.add_css_class('quote-text')
-        quote_text.set_wrap(True)
-        quote_text.set_max_width_chars(60)
+        # Filled in after the first frame by show_daily_quote()
+        self.quote_text = Gtk.Label()
+        self.quote_text.add_css_class('quote-text')
+        self.quote_text.set_wrap(True)
+        self.quote_text.set_max_width_chars(60)
         
-        quote_author = Gtk.Label()
-        quote_author.set_markup(f'<span font_size="small">— {quote_data["author"]}</span>')
-        quote_author.add_css_class('quote-author')
+        self.quote_author = Gtk.Label()
+        self.quote_author.add_css_class('quote-author')
         
-        quote_box.append(quote_text)
-        quote_box.append(quote_author)
+        quote_box.append(self.quote_text)
+        quote_box.append(self.quote_author)
         
+        self.deferred_tasks.append(self.show_daily_quote)
         return quote_box
+
+    def show_daily_quote(self):
+        """Load today's quote and show it"""
+        quote_data = self.daily_quote.get_daily_quote()
+        self.quote_text.set_markup(
+            f'<span font_size="large">"{GLib.markup_escape_text(quote_data["text"])}"</span>'
+        )
+        self.quote_author.set_markup(
+            f'<span font_size="small">— {GLib.markup_escape_text(quote_data["author"])}</span>'
+        )
     
     def create_goals_section(self):
         """Create the goals section with its container and empty state"""
@@ -277,9 +454,16 @@ class GoalWindow(Adw.ApplicationWindow):
         scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         self.content_box.append(scrolled)
         
+        scrolled_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        scrolled.set_child(scrolled_box)
+        
         # Goals container
         self.goals_container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        scrolled.set_child(self.goals_container)
+        scrolled_box.append(self.goals_container)
+        
+        # Archived goals of the list, below the goals
+        self.archive_section = ArchiveSection(self)
+        scrolled_box.append(self.archive_section)
         
         # Goals section header
         self.goals_header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
@@ -304,142 +488,238 @@ class GoalWindow(Adw.ApplicationWindow):
         self.empty_state_box = self.create_empty_state()
         self.goals_container.append(self.empty_state_box)
 
+    @tracing.traced()
     def load_goals(self):
             """Load goals for the current list"""
             if not hasattr(self, 'current_list'):
                 return
                 
-            for goal_data in self.goals:
-                self.goals_box.append(GoalWidget(goal_data, self, self.current_list['id']))
+            completed_last = self.settings.get('auto_sort_items')
+            for goal_data in ordering.sorted_items(self.goals, completed_last):
+                self.goals_box.append(self.create_goal_widget(goal_data))
             self.update_goal_numbers()
+
+    def create_goal_widget(self, goal_data):
+        """Create a widget for a goal and remember it by its data"""
+        goal_widget = GoalWidget(goal_data, self, self.current_list['id'])
+        self.goal_widgets[id(goal_data)] = goal_widget
+        if self.selection_mode:
+            goal_widget.set_selection_mode(True)
+        return goal_widget
+
+    def position_goal_widget(self, goal_widget):
+        """Place a goal widget right after the goal displayed before it"""
+        completed_last = self.settings.get('auto_sort_items')
+        prev_goal = ordering.preceding_item(self.goals, goal_widget.goal_data, completed_last)
+        prev_widget = self.goal_widgets.get(id(prev_goal)) if prev_goal is not None else None
+        
+        if goal_widget.get_parent() is None:
+            self.goals_box.insert_child_after(goal_widget, prev_widget)
+        else:
+            self.goals_box.reorder_child_after(goal_widget, prev_widget)
+
+    def move_goal_widget(self, goal_widget, target_widget, after):
+        """Move a goal next to another one, e.g. after a drag and drop"""
+        if after:
+            prev_widget = target_widget
+            next_widget = target_widget.get_next_sibling()
+            if next_widget is goal_widget:
+                next_widget = goal_widget.get_next_sibling()
+        else:
+            next_widget = target_widget
+            prev_widget = target_widget.get_prev_sibling()
+            if prev_widget is goal_widget:
+                prev_widget = goal_widget.get_prev_sibling()
+        
+        self.list_manager.place_goal(
+            self.current_list['id'],
+            goal_widget.goal_data,
+            prev_widget.goal_data if prev_widget else None,
+            next_widget.goal_data if next_widget else None
+        )
+        self.position_goal_widget(goal_widget)
+        self.update_goal_numbers()
     
     def add_goal(self, goal_data):
         """Add a new goal to the current list"""
         if not hasattr(self, 'current_list'):
             return
         
-        # Add original_position field if not present
-        if 'original_position' not in goal_data:
-            goal_data['original_position'] = len(self.goals)
-            
-        # Find insertion position - before completed items if auto-sort is enabled
-        if self.settings.get('auto_sort_items'):
-            # Find first completed item
-            insertion_index = 0
-            for i, goal in enumerate(self.goals):
-                if goal['completed']:
-                    insertion_index = i
-                    break
-                insertion_index = len(self.goals)
-            self.goals.insert(insertion_index, goal_data)
-        else:
-            self.goals.append(goal_data)
-        
-        self.list_manager.save_lists()
-        goal_widget = GoalWidget(goal_data, self, self.current_list['id'])
-        
-        # Insert widget at correct position
-        if self.settings.get('auto_sort_items'):
-            # Find first completed goal widget
-            completed_found = False
-            for child in self.goals_box:
-                if isinstance(child, GoalWidget) and child.goal_data['completed']:
-                    # Use insert_after for the previous widget instead of insert_before
-                    prev_widget = child.get_prev_sibling()
-                    if prev_widget:
-                        self.goals_box.insert_child_after(goal_widget, prev_widget)
-                    else:
-                        self.goals_box.prepend(goal_widget)
-                    completed_found = True
-                    break
-            if not completed_found:
-                self.goals_box.append(goal_widget)
-        else:
-            self.goals_box.append(goal_widget)
+        # New goals go to the end; with auto-sort they still show up
+        # before the completed ones
+        self.list_manager.add_goal_to_list(self.current_list['id'], goal_data)
+        self.position_goal_widget(self.create_goal_widget(goal_data))
         
         self.update_empty_state()
         self.update_goal_numbers()
 
     def on_add_goal_response(self, dialog, response):
         """Handle response from add goal dialog"""
+        started = recording.now()
         if response == Gtk.ResponseType.OK:
             goal_text = dialog.entry.get_text()
             if goal_text:
-                self.add_goal({'title': goal_text, 'completed': False, 'steps': []})
+                goal_data = model.Goal(title=goal_text, completed=False, steps=[])
+                self.add_goal(goal_data)
+                recording.record(
+                    'add_goal', started, list=self.current_list['id'], goal=goal_data.get('id'), title=goal_text
+                )
         dialog.destroy()
 
     def remove_goal(self, goal_widget):
         """Remove a goal from the current list"""
-        self.goals.remove(goal_widget.goal_data)
-        self.list_manager.save_lists()
+        self.list_manager.remove_goal(self.current_list['id'], goal_widget.goal_data)
+        self.detach_goal_widget(goal_widget)
+        self.show_undo_toast(f"Deleted “{goal_widget.goal_data['title']}”")
+
+    def detach_goal_widget(self, goal_widget):
+        """Take a goal widget out of the view once its goal left the list"""
+        self.goal_widgets.pop(id(goal_widget.goal_data), None)
+        self.selected_goal_ids.discard(id(goal_widget.goal_data))
         self.goals_box.remove(goal_widget)
+        goal_widget.teardown()
         self.update_empty_state()
         self.update_goal_numbers()
 
-    def handle_completion(self, completed_widget, is_goal=True):
-        """Handle sorting of completed items"""
-        if not self.settings.get('auto_sort_items'):
+    def show_new_goals(self, list_id, goals):
+        """Add widgets for goals that arrived in a list, if it is on screen"""
+        if getattr(self, 'current_list', None) is None or self.current_list['id'] != list_id:
             return
-            
-        container = self.goals_box if is_goal else completed_widget.parent_goal.steps_box
-        items = self.goals if is_goal else completed_widget.parent_goal.goal_data['steps']
         
-        # Get current position and completion status
-        current_item = completed_widget.goal_data if is_goal else completed_widget.step_data
-        current_position = items.index(current_item)
-        is_completed = current_item['completed']
-        
-        # Store original position when completing if not already stored
-        if is_completed and 'original_position' not in current_item:
-            current_item['original_position'] = current_position
-        
-        # Remove item from current position
-        items.pop(current_position)
+        for goal_data in goals:
+            self.position_goal_widget(self.create_goal_widget(goal_data))
+        self.update_empty_state()
+        self.update_goal_numbers()
+
+    def transfer_goal(self, goal_widget, target_list_id, copy=False):
+        """Move or copy a goal with its steps to another list
+
+        Returns the copies made.
+        """
+        list_id = self.current_list['id']
+        goal_data = goal_widget.goal_data
         
-        if is_completed:
-            # When completing, move to end of list
-            target_position = len(items)
-            items.insert(target_position, current_item)
-        else:
-            # When uncompleting, restore to original position
-            target_position = current_item.get('original_position', 0)
-            # Ensure we don't insert beyond list bounds
-            target_position = min(target_position, len(items))
-            items.insert(target_position, current_item)
-            # Clear the original position as it's no longer needed
-            current_item.pop('original_position', None)
-        
-        # Update GUI
-        container.remove(completed_widget)
-        
-        # Reinsert widget at the correct position
-        if target_position == 0:
-            container.prepend(completed_widget)
-        else:
-            # Find the widget that should be before our target position
-            prev_widget = None
-            widget_count = 0
-            for child in container:
-                if isinstance(child, GoalWidget if is_goal else StepWidget):
-                    if widget_count == target_position - 1:
-                        prev_widget = child
-                        break
-                    widget_count += 1
-            
-            if prev_widget:
-                container.insert_child_after(completed_widget, prev_widget)
-            else:
-                container.append(completed_widget)
+        if copy:
+            new_goals = self.list_manager.copy_goals_to_list(list_id, [goal_data], target_list_id)
+            self.show_new_goals(target_list_id, new_goals)
+            return new_goals
+        if target_list_id != list_id:
+            self.list_manager.move_goals_to_list(list_id, [goal_data], target_list_id)
+            self.detach_goal_widget(goal_widget)
+        return []
+
+    def transfer_step(self, step_widget, target_list_id, copy=False):
+        """Move or copy a step to a list, where it becomes a goal, and return it"""
+        goal_widget = step_widget.parent_goal
+        new_goal = self.list_manager.transfer_step(
+            self.current_list['id'],
+            goal_widget.goal_data,
+            step_widget.step_data,
+            target_list_id,
+            copy=copy
+        )
+        if new_goal is None:
+            return None
         
-        # Save changes
-        self.list_manager.save_lists()
+        if not copy:
+            goal_widget.remove_step_widget(step_widget)
+        self.show_new_goals(target_list_id, [new_goal])
+        return new_goal
+
+    @tracing.traced()
+    def handle_completion(self, completed_widget, is_goal=True):
+        """Handle sorting of completed items
+
+        Completion does not touch the order keys: with auto-sort enabled
+        completed items are simply displayed after the others, so an item
+        that gets uncompleted goes back to where it was.
+        """
+        if not self.settings.get('auto_sort_items'):
+            return
         
-        # Update numbers
         if is_goal:
+            self.position_goal_widget(completed_widget)
             self.update_goal_numbers()
         else:
+            completed_widget.parent_goal.position_step_widget(completed_widget)
             completed_widget.parent_goal.update_step_numbers()
     
+    def reconcile_goals(self, changed_goals=()):
+        """Bring the goal widgets in line with the current list in one pass
+
+        Widgets of goals that left the list are dropped, widgets of changed
+        goals are refreshed and every widget is put at its sorted position.
+        """
+        present = {id(goal) for goal in self.goals}
+        for key in [key for key in self.goal_widgets if key not in present]:
+            goal_widget = self.goal_widgets.pop(key)
+            self.goals_box.remove(goal_widget)
+            goal_widget.teardown()
+        self.selected_goal_ids &= present
+        
+        for goal in changed_goals:
+            goal_widget = self.goal_widgets.get(id(goal))
+            if goal_widget is not None:
+                goal_widget.refresh()
+        
+        completed_last = self.settings.get('auto_sort_items')
+        prev_widget = None
+        for goal in ordering.sorted_items(self.goals, completed_last):
+            goal_widget = self.goal_widgets.get(id(goal))
+            if goal_widget is None:
+                goal_widget = self.create_goal_widget(goal)
+                self.goals_box.insert_child_after(goal_widget, prev_widget)
+            elif goal_widget.get_prev_sibling() is not prev_widget:
+                self.goals_box.reorder_child_after(goal_widget, prev_widget)
+            prev_widget = goal_widget
+        
+        self.update_goal_numbers()
+        self.update_empty_state()
+        self.update_selection_label()
+
+    def set_selection_mode(self, active):
+        """Enter or leave the mode for selecting several goals"""
+        self.selection_mode = active
+        self.selected_goal_ids.clear()
+        for goal_widget in self.goal_widgets.values():
+            goal_widget.set_selection_mode(active)
+        
+        self.selection_bar.set_revealed(active)
+        self.add_goal_button.set_sensitive(not active and getattr(self, 'current_list', None) is not None)
+        self.update_selection_label()
+
+    def toggle_goal_selection(self, goal_widget):
+        """Add a goal to the selection or remove it"""
+        key = id(goal_widget.goal_data)
+        if key in self.selected_goal_ids:
+            self.selected_goal_ids.discard(key)
+            goal_widget.set_selected(False)
+        else:
+            self.selected_goal_ids.add(key)
+            goal_widget.set_selected(True)
+        self.update_selection_label()
+
+    def get_selected_goals(self):
+        """Get the data of the selected goals"""
+        return [
+            self.goal_widgets[key].goal_data
+            for key in self.selected_goal_ids
+            if key in self.goal_widgets
+        ]
+
+    def update_selection_label(self):
+        """Show how many goals are selected"""
+        count = len(self.selected_goal_ids)
+        if count == 0:
+            self.selection_label.set_text("No goals selected")
+        elif count == 1:
+            self.selection_label.set_text("1 goal selected")
+        else:
+            self.selection_label.set_text(f"{count} goals selected")
+        
+        for button in self.bulk_action_buttons:
+            button.set_sensitive(count > 0)
+
     def update_goal_numbers(self):
         """Update the display numbers for all goals"""
         for i, child in enumerate(self.goals_box):
@@ -448,33 +728,425 @@ class GoalWindow(Adw.ApplicationWindow):
     
     def load_initial_data(self):
         """Load initial data for the window"""
-        # Load lists and select first list if exists
-        self.list_manager.load_lists()
-        self.update_lists_sidebar()
+        with startup.phase('load-lists'):
+            self.list_manager.load_lists()
+        self.list_manager.add_listener(self.on_lists_changed)
+        if recording.enabled:
+            recording.start(self.list_manager.data_dir)
         
-        # Select first list if exists and load its goals
+        # Select first list if exists and load its goals. The sidebar rows
+        # of the other lists are added after the first frame.
         if self.list_manager.lists:
             first_list = next(iter(self.list_manager.lists.values()))
-            self.select_list(first_list['id'])
+            with startup.phase('update-lists-sidebar'):
+                self.lists_box.append(self.create_list_row(first_list))
+            with startup.phase('select-list'):
+                self.select_list(first_list['id'])
+            self.select_sidebar_row(first_list['id'])
+            self.deferred_tasks.append(self.load_other_lists)
         else:
             # No lists exist yet, update empty state
             self.update_empty_state()
+        
+        # Move old completed goals out of the lists, so the next start
+        # loads less
+        self.deferred_tasks.append(self.archive_old_goals)
+        
+        # Pick up changes made to the lists file by other programs
+        self.deferred_tasks.append(self.start_file_watcher)
+        
+        # Mark the lists with overdue goals or steps
+        self.deferred_tasks.append(self.show_overdue)
+
+    def load_other_lists(self):
+        """Add the sidebar rows of all lists"""
+        self.update_lists_sidebar()
+        current_list = getattr(self, 'current_list', None)
+        if current_list is not None:
+            self.select_sidebar_row(current_list['id'])
+
+    def archive_old_goals(self):
+        """Archive the goals completed longer ago than the setting allows"""
+        max_age_days = self.settings.get('archive_after_days')
+        if not max_age_days:
+            return
+        count = self.list_manager.archive_completed(max_age_days)
+        if count:
+            if getattr(self, 'current_list', None) is not None:
+                self.reconcile_goals()
+                self.archive_section.update_title()
+            self.add_toast(Adw.Toast.new(f"Archived {count} completed goal{'s' if count != 1 else ''}"))
+
+    def show_overdue(self):
+        """Build the columns for the overdue counts and update the badges
+
+        Without NumPy there are no columns and the badges only show the
+        progress.
+        """
+        if self.list_manager.column_store() is not None:
+            for list_id in self.list_badges:
+                self.update_list_badge(list_id)
+
+    def start_file_watcher(self):
+        """Start watching the lists file for changes by other programs"""
+        self.file_watcher = ListsFileWatcher(self.list_manager)
+
+    def on_realize(self, window):
+        """Wait for the first frame to run the deferred startup work"""
+        self.first_frame_handler = self.get_frame_clock().connect('after-paint', self.on_first_frame)
+
+    def on_first_frame(self, frame_clock):
+        """Check the startup time and run the work that could wait"""
+        frame_clock.disconnect(self.first_frame_handler)
+        self.first_frame_handler = None
+        
+        startup.mark('first-frame')
+        elapsed = startup.elapsed_ms()
+        if elapsed > FIRST_FRAME_BUDGET_MS:
+            print(f"First frame after {elapsed:.0f} ms, over the {FIRST_FRAME_BUDGET_MS} ms budget")
+        GLib.idle_add(self.run_deferred_tasks)
+
+    def run_deferred_tasks(self):
+        """Run the work deferred until after the first frame"""
+        self.startup_done = True
+        tasks, self.deferred_tasks = self.deferred_tasks, []
+        with startup.phase('deferred-tasks'):
+            for task in tasks:
+                task()
+        startup.write_report()
+        return GLib.SOURCE_REMOVE
+
+    def run_after_first_frame(self, task):
+        """Run a callback once the window has been drawn for the first time"""
+        if self.startup_done:
+            GLib.idle_add(task)
+        else:
+            self.deferred_tasks.append(task)
     
+    def on_lists_changed(self, event, details):
+        """Handle changes reported by the list manager"""
+        if event == 'progress':
+            # Only the counts that changed, so cheap enough to show right away
+            self.show_progress(details)
+        elif event in ('external-change', 'undo', 'redo'):
+            # May be reported in the middle of a save, so update the UI
+            # once the current handler is done
+            GLib.idle_add(self.apply_list_changes, details)
+
+    def show_progress(self, progress):
+        """Update the badges and step progress bars whose counts changed"""
+        for list_id in progress['lists']:
+            self.update_list_badge(list_id)
+        for goal in progress['goals']:
+            goal_widget = self.goal_widgets.get(id(goal))
+            if goal_widget is not None:
+                goal_widget.update_progress()
+
+    def apply_list_changes(self, changes):
+        """Update only the parts of the UI affected by changes to the lists
+
+        Used for changes made by other programs and by undo and redo.
+        """
+        self.update_lists_sidebar()
+        
+        current_list = getattr(self, 'current_list', None)
+        if current_list is not None:
+            list_id = current_list['id']
+            if list_id not in self.list_manager.lists:
+                # The list on screen was deleted
+                self.current_list = None
+                if self.list_manager.lists:
+                    self.select_list(next(iter(self.list_manager.lists)))
+                else:
+                    self.select_button.set_active(False)
+                    self.goals = []
+                    self.clear_goals()
+                    self.archive_section.show_list(None)
+                    self.update_empty_state()
+                    self.add_goal_button.set_sensitive(False)
+                    self.select_button.set_sensitive(False)
+            else:
+                if list_id in changes['changed'] or changes['added']:
+                    self.goals_title.set_text(f"{current_list['name']} goals:")
+                    self.reconcile_goals(changes['changed'].get(list_id, ()))
+                self.select_sidebar_row(list_id)
+        elif self.list_manager.lists:
+            self.select_list(next(iter(self.list_manager.lists)))
+        
+        for list_id in changes['conflicts']:
+            toast = Adw.Toast.new(
+                f"Conflicting changes were kept as “{self.list_manager.lists[list_id]['name']}”"
+            )
+            toast.set_timeout(5)
+            self.add_toast(toast)
+        return GLib.SOURCE_REMOVE
+
+    def add_toast(self, toast):
+        """Show a toast notification"""
+        self.toast_overlay.add_toast(toast)
+
+    def show_undo_toast(self, title):
+        """Show a toast offering to undo the change that was just made"""
+        toast = Adw.Toast.new(title)
+        toast.set_button_label("Undo")
+        toast.set_action_name('app.undo')
+        toast.set_timeout(5)
+        self.add_toast(toast)
+
+    def undo(self):
+        """Revert the most recent change to the lists"""
+        started = recording.now()
+        if self.list_manager.undo() is None:
+            self.add_toast(Adw.Toast.new("Nothing to undo"))
+        recording.record('undo', started)
+
+    def redo(self):
+        """Apply the most recently undone change again"""
+        started = recording.now()
+        if self.list_manager.redo() is None:
+            self.add_toast(Adw.Toast.new("Nothing to redo"))
+        recording.record('redo', started)
+
     # Event handlers
     def on_about_clicked(self, button):
         """Handle about button click"""
+        from .dialogs import AboutDialog
         dialog = AboutDialog(self)
         dialog.connect('response', lambda d, r: d.destroy())
         dialog.present()
 
     def on_settings_clicked(self, button):
         """Handle settings button click"""
+        from .dialogs import SettingsDialog
         dialog = SettingsDialog(self, self.settings)
         dialog.connect('response', lambda d, r: d.destroy())
         dialog.present()
 
+    def on_statistics_clicked(self, button):
+        """Show what was completed over time, from the completion log"""
+        from .dialogs import StatisticsDialog
+        summary = self.list_manager.completions.summarize()
+        summary.update(self.list_manager.count_due())
+        dialog = StatisticsDialog(self, summary)
+        dialog.connect('response', lambda d, r: d.destroy())
+        dialog.present()
+
+    def on_import_clicked(self, button):
+        """Let the user pick a file to import goals from"""
+        from .core.importer import FORMATS
+        
+        chooser = Gtk.FileChooserNative.new(
+            "Import Goals", self, Gtk.FileChooserAction.OPEN, "Import", "Cancel"
+        )
+        file_filter = Gtk.FileFilter()
+        file_filter.set_name("Supported files")
+        for import_format in FORMATS.values():
+            for extension in import_format.extensions:
+                file_filter.add_suffix(extension[1:])
+        chooser.add_filter(file_filter)
+        chooser.connect('response', self.on_import_file_chosen)
+        # Keep a reference, native choosers are not owned by the window
+        self.import_chooser = chooser
+        chooser.show()
+
+    def on_import_file_chosen(self, chooser, response):
+        """Import goals from the chosen file into the current list"""
+        self.import_chooser = None
+        if response != Gtk.ResponseType.ACCEPT:
+            return
+        
+        from .core.importer import BulkImporter
+        from .dialogs import ImportDialog
+        
+        current_list = getattr(self, 'current_list', None)
+        dialog = ImportDialog(
+            self,
+            BulkImporter(self.list_manager),
+            chooser.get_file().get_path(),
+            current_list['id'] if current_list else None
+        )
+        dialog.connect('response', self.on_import_response)
+        dialog.present()
+        dialog.start()
+
+    def on_import_response(self, dialog, response):
+        """Show the imported goals and what was skipped"""
+        if response == Gtk.ResponseType.OK:
+            result = dialog.result
+            self.update_lists_sidebar()
+            current_list = getattr(self, 'current_list', None)
+            if current_list is None and result.list_ids:
+                self.select_list(result.list_ids[0])
+            elif current_list is not None and current_list['id'] in result.list_ids:
+                self.reconcile_goals()
+                self.select_sidebar_row(current_list['id'])
+            for error in result.errors:
+                print(f"Skipped while importing: {error}")
+            self.show_undo_toast(result.summary())
+        elif dialog.error:
+            toast = Adw.Toast.new(f"Import failed: {dialog.error}")
+            toast.set_timeout(5)
+            self.add_toast(toast)
+        dialog.destroy()
+
+    def on_export_clicked(self, button):
+        """Let the user pick where to export lists to"""
+        from .core import exporter
+        from .core.exporter import Exporter
+        
+        if not self.list_manager.lists:
+            self.add_toast(Adw.Toast.new("There are no lists to export"))
+            return
+        
+        chooser = Gtk.FileChooserNative.new(
+            "Export Goals", self, Gtk.FileChooserAction.SAVE, "Export", "Cancel"
+        )
+        formats = list(exporter.FORMATS.values())
+        chooser.add_choice(
+            'format', "Format",
+            [export_format.name for export_format in formats],
+            [export_format.label for export_format in formats]
+        )
+        chooser.set_choice('format', formats[0].name)
+        chooser.add_choice('lists', "Lists", ['current', 'all'], ["Current list", "All lists"])
+        chooser.set_choice('lists', 'current' if getattr(self, 'current_list', None) else 'all')
+        # Only used by iCalendar, for calendars that do not show to-dos
+        chooser.add_choice('deadline_events', "Add deadlines as calendar events", None, None)
+        
+        current_list = getattr(self, 'current_list', None)
+        name = current_list['name'] if current_list else "Goals"
+        chooser.set_current_name(Exporter.file_name({'id': 'goals', 'name': name}, formats[0].extension))
+        chooser.connect('response', self.on_export_file_chosen)
+        # Keep a reference, native choosers are not owned by the window
+        self.export_chooser = chooser
+        chooser.show()
+
+    def on_export_file_chosen(self, chooser, response):
+        """Export the current list or all lists to the chosen file"""
+        from .core import exporter
+        from .core.exporter import Exporter
+        
+        self.export_chooser = None
+        if response != Gtk.ResponseType.ACCEPT:
+            return
+        
+        # A typed extension wins over the format choice
+        path = chooser.get_file().get_path()
+        export_format = exporter.format_for_path(path)
+        if export_format is None:
+            export_format = exporter.FORMATS[chooser.get_choice('format')]()
+            path += export_format.extension
+        if isinstance(export_format, exporter.ICalendarFormat):
+            export_format.deadline_events = chooser.get_choice('deadline_events') == 'true'
+        
+        current_list = getattr(self, 'current_list', None)
+        list_ids = None
+        if chooser.get_choice('lists') == 'current' and current_list is not None:
+            list_ids = [current_list['id']]
+        
+        try:
+            # Overwriting is confirmed by the chooser, so always write
+            Exporter(self.list_manager).export_to_file(path, list_ids, export_format, force=True)
+            message = f"Exported to {os.path.basename(path)}"
+        except Exception as e:
+            print(f"Error exporting to {path}: {e}")
+            message = f"Export failed: {e}"
+        self.add_toast(Adw.Toast.new(message))
+
+    def on_select_toggled(self, button):
+        """Handle select button toggle"""
+        self.set_selection_mode(button.get_active())
+
+    def on_select_all_clicked(self, button):
+        """Select every goal of the current list"""
+        for key, goal_widget in self.goal_widgets.items():
+            self.selected_goal_ids.add(key)
+            goal_widget.set_selected(True)
+        self.update_selection_label()
+
+    def on_bulk_complete_clicked(self, button, completed):
+        """Complete or uncomplete all selected goals"""
+        started = recording.now()
+        goals = self.get_selected_goals()
+        self.list_manager.set_goals_completed(self.current_list['id'], goals, completed)
+        self.reconcile_goals(goals)
+        recording.record(
+            'bulk_complete', started, list=self.current_list['id'],
+            goals=[goal.get('id') for goal in goals], completed=completed
+        )
+
+    def on_bulk_delete_clicked(self, button):
+        """Ask once before deleting all selected goals"""
+        count = len(self.selected_goal_ids)
+        from .dialogs import ConfirmDialog
+        dialog = ConfirmDialog(
+            self,
+            "Delete Goals",
+            f"Are you sure you want to delete {count} goal{'s' if count != 1 else ''} and all their steps?"
+        )
+        dialog.connect('response', self.on_bulk_delete_confirmed)
+        dialog.present()
+
+    def on_bulk_delete_confirmed(self, dialog, response):
+        """Handle confirmation of bulk deletion"""
+        started = recording.now()
+        if response == Gtk.ResponseType.OK:
+            goals = self.get_selected_goals()
+            self.list_manager.remove_goals(self.current_list['id'], goals)
+            self.reconcile_goals()
+            self.show_undo_toast(f"Deleted {len(goals)} goal{'s' if len(goals) != 1 else ''}")
+            recording.record(
+                'bulk_delete', started, list=self.current_list['id'], goals=[goal.get('id') for goal in goals]
+            )
+        dialog.destroy()
+
+    def on_move_popover_show(self, popover):
+        """Offer the other lists as destinations for the selected goals"""
+        while True:
+            child = self.move_lists_box.get_first_child()
+            if child is None:
+                break
+            self.move_lists_box.remove(child)
+        
+        for list_data in self.list_manager.lists.values():
+            if list_data['id'] == self.current_list['id']:
+                continue
+            button = Gtk.Button(label=list_data['name'])
+            button.add_css_class('flat')
+            button.connect('clicked', self.on_bulk_move_clicked, list_data['id'], popover)
+            self.move_lists_box.append(button)
+        
+        if self.move_lists_box.get_first_child() is None:
+            self.move_lists_box.append(Gtk.Label(label="No other lists"))
+
+    def on_bulk_move_clicked(self, button, target_list_id, popover):
+        """Move all selected goals to another list"""
+        started = recording.now()
+        popover.popdown()
+        goals = self.get_selected_goals()
+        self.list_manager.move_goals_to_list(self.current_list['id'], goals, target_list_id)
+        self.reconcile_goals()
+        recording.record(
+            'bulk_move', started, list=self.current_list['id'],
+            goals=[goal.get('id') for goal in goals], target=target_list_id
+        )
+
+    def on_bulk_deadline_clicked(self, button, popover, clear):
+        """Set or clear the deadline of all selected goals"""
+        started = recording.now()
+        popover.popdown()
+        deadline = None if clear else self.bulk_calendar.get_date().format("%Y-%m-%d")
+        goals = self.get_selected_goals()
+        self.list_manager.set_goals_deadline(self.current_list['id'], goals, deadline)
+        self.reconcile_goals(goals)
+        recording.record(
+            'bulk_deadline', started, list=self.current_list['id'],
+            goals=[goal.get('id') for goal in goals], deadline=deadline
+        )
+
     def on_add_goal_clicked(self, button):
         """Handle add goal button click"""
+        from .dialogs import GoalDialog
         dialog = GoalDialog(self, "Add New Goal", "")
         dialog.connect('response', self.on_add_goal_response)
         dialog.present()
@@ -551,6 +1223,7 @@ class GoalWindow(Adw.ApplicationWindow):
     def update_lists_sidebar(self):
         """Update the sidebar with current lists"""
         # Clear existing list items
+        self.list_badges = {}
         while True:
             row = self.lists_box.get_first_child()
             if row is None:
@@ -562,25 +1235,45 @@ class GoalWindow(Adw.ApplicationWindow):
             row = self.create_list_row(list_data)
             self.lists_box.append(row)
         
+    def select_sidebar_row(self, list_id):
+        """Highlight the row of a list in the sidebar"""
+        row = self.lists_box.get_first_child()
+        while row is not None:
+            if row.list_id == list_id:
+                self.lists_box.select_row(row)
+                return
+            row = row.get_next_sibling()
+
+    @tracing.traced()
     def select_list(self, list_id):
         """Load and display the selected list's goals"""
         if list_id not in self.list_manager.lists:
             return
         
+        # Leave selection mode before switching lists
+        self.select_button.set_active(False)
+        
         self.current_list = self.list_manager.lists[list_id]
         self.goals = self.current_list['goals']
         
         # Update UI
-        self.goals_title.set_text(f"{self.current_list['name']} goals:")
-        self.clear_goals()
-        self.load_goals()
-        self.update_empty_state()
-        self.add_goal_button.set_sensitive(True)
+        with LIST_SWITCH_SECONDS.time():
+            self.goals_title.set_text(f"{self.current_list['name']} goals:")
+            self.clear_goals()
+            self.load_goals()
+            self.archive_section.show_list(list_id)
+            self.update_empty_state()
+            self.add_goal_button.set_sensitive(True)
+            self.select_button.set_sensitive(True)
 
     def clear_goals(self):
         """Clear all goals from the display"""
+        goal_widgets = self.goal_widgets
+        self.goal_widgets = {}
         while True:
             child = self.goals_box.get_first_child()
             if child is None:
                 break
-            self.goals_box.remove(child)
\ No newline at end of file
+            self.goals_box.remove(child)
+        for goal_widget in goal_widgets.values():
+            goal_widget.teardown()
\ No newline at end of file
@@ -0,0 +1,56 @@
+import json
+
+from src.core import ordering
+from src.core.list_manager import ListManager
+
+
+def make_goal(title, completed, order):
+    return {'title': title, 'completed': completed, 'steps': [], 'order': order}
+
+
+def display_titles(goals):
+    return [goal['title'] for goal in ordering.sorted_items(goals, completed_last=True)]
+
+
+def test_move_among_open_goals_with_completed_last(tmp_path):
+    """Neighbours from both completion groups used to leave a None key"""
+    list_manager = ListManager(str(tmp_path))
+    list_id = list_manager.add_list('Work')
+    a, b, c = list_manager.add_goals_to_list(list_id, [
+        make_goal('A', False, 1024.0), make_goal('B', True, 2048.0), make_goal('C', False, 3072.0)
+    ])
+
+    list_manager.move_goal_to(list_id, a, 1, completed_last=True)
+
+    goals = list_manager.lists[list_id]['goals']
+    assert all(goal['order'] is not None for goal in goals)
+    assert display_titles(goals) == ['C', 'A', 'B']
+    with open(tmp_path / 'lists.json') as f:
+        stored = json.load(f)[list_id]['goals']
+    assert all(goal['order'] is not None for goal in stored)
+
+
+def test_move_completed_goal_within_its_group():
+    goals = [make_goal('A', False, 1024.0), make_goal('B', True, 2048.0), make_goal('C', True, 3072.0)]
+
+    ordering.move_to_index(goals, goals[2], 1, completed_last=True)
+
+    assert display_titles(goals) == ['A', 'C', 'B']
+
+
+def test_place_between_inverted_neighbours():
+    """A drop between the last open goal and the first completed one"""
+    goals = [make_goal('A', False, 1024.0), make_goal('B', True, 2048.0), make_goal('C', False, 3072.0)]
+    a, b, c = goals
+
+    ordering.place_between(goals, a, c, b)
+
+    assert a['order'] is not None
+    assert display_titles(goals) == ['C', 'A', 'B']
+
+
+def test_null_keys_are_renumbered():
+    goals = [make_goal('A', False, 1024.0), make_goal('B', True, None), make_goal('C', False, 3072.0)]
+
+    assert ordering.ensure_order(goals)
+    assert [goal['order'] for goal in goals] == [1024.0, 2048.0, 3072.0]